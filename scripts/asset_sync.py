@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Sincronización incremental de recursos (vendors, css, js, imágenes...)
+Al final de cada traducción los directorios de recursos se borraban y se
+volvían a copiar completos en cada idioma. Aquí se copian solo los archivos que
+cambiaron y se eliminan los que ya no existen en el origen.
+
+Un archivo se considera igual si coincide tamaño y fecha de modificación (la
+copia conserva la fecha del origen). Si coincide el tamaño pero no la fecha se
+comparan los digests antes de copiar; si el contenido es el mismo solo se
+actualiza la fecha, para que la próxima vez alcance con el stat.
+
+Con ASSET_STORE_CONFIG['enabled'] los recursos se guardan una sola vez en un
+almacén direccionado por contenido (CACHE_DIR/assets/<ab>/<md5>.<ext>) y en cada
+idioma se crea un hardlink (o un reflink) al objeto del almacén: los 12 árboles
+traducidos comparten los mismos bytes en disco. Los archivos enlazados no se
+deben editar en el lugar; la sincronización siempre los reemplaza.
+
+Uso:
+    python3 scripts/asset_sync.py open_aula_back en        # sincroniza los recursos de un idioma
+    python3 scripts/asset_sync.py open_aula_back en --dry-run
+    python3 scripts/asset_sync.py open_aula_back all --store   # todos los idiomas, con almacén compartido
+    python3 scripts/asset_sync.py open_aula_back all --store --prune
+"""
+
+import sys
+import os
+import shutil
+import hashlib
+import time
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import ASSET_STORE_CONFIG
+
+# ioctl de Linux para clonar un archivo (reflink) en btrfs/xfs
+FICLONE = 0x40049409
+
+# Directorios de recursos de una exportación de HelpNDoc
+RESOURCE_DIRS = ('lib', 'css', 'js', 'images', 'vendors', 'context')
+# Scripts críticos en la raíz del HTML
+RESOURCE_FILES = '_*.js'
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """md5 del contenido de un archivo"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SyncReport:
+    """Contadores de una sincronización"""
+
+    def __init__(self):
+        self.copied = 0
+        self.bytes_copied = 0
+        self.unchanged = 0
+        self.touched = 0             # Mismo contenido, solo se actualizó la fecha
+        self.deleted = 0
+        self.linked = 0              # Enlazados desde el almacén compartido
+
+    def summary(self):
+        linked = f", {self.linked} enlazados" if self.linked else ""
+        return (f"{self.copied} copiados ({self.bytes_copied / 1024:.0f} KB){linked}, {self.unchanged} sin cambios, "
+                f"{self.deleted} eliminados")
+
+
+class AssetStore:
+    """Almacén de recursos direccionado por contenido, enlazado en cada árbol de idioma"""
+
+    def __init__(self, store_dir=None, link=None):
+        self.store_dir = Path(store_dir or ASSET_STORE_CONFIG['store_dir'])
+        self.link = link or ASSET_STORE_CONFIG['link']
+        self._digests = {}           # {(ruta, tamaño, mtime): md5} de los archivos de origen
+        self.fallbacks = 0           # Enlaces que no se pudieron crear y se copiaron
+
+    def digest(self, source, source_stat):
+        key = (str(source), source_stat.st_size, source_stat.st_mtime_ns)
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = self._digests[key] = file_digest(source)
+        return digest
+
+    def object_path(self, source, source_stat):
+        digest = self.digest(source, source_stat)
+        return self.store_dir / digest[:2] / f"{digest}{source.suffix.lower()}"
+
+    def is_linked(self, target_stat, source_stat):
+        """Si la copia de un idioma ya apunta al almacén (sin calcular digests)"""
+        if target_stat.st_size != source_stat.st_size or target_stat.st_mtime_ns != source_stat.st_mtime_ns:
+            return False
+        return self.link != 'hardlink' or target_stat.st_nlink > 1
+
+    def add(self, source, source_stat, report):
+        """Guarda un archivo en el almacén si no está; retorna la ruta del objeto"""
+        object_path = self.object_path(source, source_stat)
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_object = object_path.with_name(f".{object_path.name}.tmp")
+            shutil.copy2(source, tmp_object)
+            os.replace(tmp_object, object_path)
+            report.bytes_copied += source_stat.st_size
+        return object_path
+
+    def place(self, object_path, tmp_target):
+        """Crea tmp_target como enlace al objeto (o copia si el sistema de archivos no lo permite)"""
+        try:
+            if self.link == 'reflink':
+                import fcntl
+                with open(object_path, 'rb') as src, open(tmp_target, 'wb') as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                shutil.copystat(object_path, tmp_target)
+            else:
+                os.link(object_path, tmp_target)
+            return True
+        except (OSError, ImportError):
+            self.fallbacks += 1
+            if tmp_target.exists():
+                tmp_target.unlink()
+            shutil.copy2(object_path, tmp_target)
+            return False
+
+    def objects(self):
+        return [path for path in self.store_dir.glob('*/*') if not path.name.startswith('.')] if self.store_dir.exists() else []
+
+    def prune(self):
+        """Elimina los objetos que ningún árbol usa (solo con hardlinks: nlink == 1)"""
+        if self.link != 'hardlink':
+            return 0
+        removed = 0
+        for object_path in self.objects():
+            if object_path.stat().st_nlink == 1:
+                object_path.unlink()
+                removed += 1
+        return removed
+
+
+def sync_file(source, target, report, dry_run=False, store=None):
+    """Copia (o enlaza desde el almacén) un archivo solo si difiere de la copia existente"""
+    source_stat = source.stat()
+    try:
+        target_stat = target.stat()
+    except FileNotFoundError:
+        target_stat = None
+
+    if store is not None:
+        if target_stat is not None and target.is_file() and store.is_linked(target_stat, source_stat):
+            report.unchanged += 1
+            return
+        report.linked += 1
+        if dry_run:
+            return
+        object_path = store.add(source, source_stat, report)
+        if target_stat is not None and target.is_dir():
+            shutil.rmtree(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_target = target.with_name(f".{target.name}.tmp")
+        if tmp_target.exists():
+            tmp_target.unlink()
+        store.place(object_path, tmp_target)
+        os.replace(tmp_target, target)
+        return
+
+    if target_stat is not None and target.is_file() and target_stat.st_size == source_stat.st_size:
+        if target_stat.st_mtime_ns == source_stat.st_mtime_ns:
+            report.unchanged += 1
+            return
+        if file_digest(source) == file_digest(target):
+            report.unchanged += 1
+            report.touched += 1
+            if not dry_run:
+                shutil.copystat(source, target)
+            return
+
+    report.copied += 1
+    report.bytes_copied += source_stat.st_size
+    if dry_run:
+        return
+
+    if target_stat is not None and target.is_dir():
+        shutil.rmtree(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Copia a un temporal y reemplazo: un servidor leyendo el árbol nunca ve un archivo a medias
+    tmp_target = target.with_name(f".{target.name}.tmp")
+    shutil.copy2(source, tmp_target)
+    os.replace(tmp_target, target)
+
+
+def sync_tree(source_dir, target_dir, report, dry_run=False, store=None):
+    """Sincroniza un directorio: copia lo que cambió y elimina lo que ya no está en el origen"""
+    source_dir = Path(source_dir)
+    target_dir = Path(target_dir)
+
+    if target_dir.exists() and not target_dir.is_dir():
+        report.deleted += 1
+        if not dry_run:
+            target_dir.unlink()
+
+    expected = set()
+    for root, dirs, files in os.walk(source_dir):
+        relative = Path(root).relative_to(source_dir)
+        expected.add(relative)
+        for name in files:
+            expected.add(relative / name)
+            sync_file(Path(root) / name, target_dir / relative / name, report, dry_run, store)
+
+    if not target_dir.exists():
+        return
+
+    # Eliminar lo que sobra (de abajo hacia arriba, para poder quitar directorios vacíos)
+    for root, dirs, files in os.walk(target_dir, topdown=False):
+        relative = Path(root).relative_to(target_dir)
+        for name in files:
+            if relative / name not in expected:
+                report.deleted += 1
+                if not dry_run:
+                    (Path(root) / name).unlink()
+        if relative not in expected:
+            if not dry_run:
+                shutil.rmtree(root)
+
+
+def sync_resources(source_path, target_path, dry_run=False, store=None):
+    """
+    Sincroniza los recursos de una exportación HTML con un directorio destino
+
+    Args:
+        store: AssetStore para enlazar los archivos en lugar de copiarlos
+
+    Returns:
+        SyncReport
+    """
+    source_path = Path(source_path)
+    target_path = Path(target_path)
+    report = SyncReport()
+
+    for resource_dir in RESOURCE_DIRS:
+        if (source_path / resource_dir).is_dir():
+            sync_tree(source_path / resource_dir, target_path / resource_dir, report, dry_run, store)
+
+    for resource_file in sorted(source_path.glob(RESOURCE_FILES)):
+        sync_file(resource_file, target_path / resource_file.name, report, dry_run, store)
+
+    return report
+
+
+def disk_usage(paths):
+    """Bytes ocupados por varios árboles, contando una sola vez cada inodo"""
+    inodes = {}
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            for name in files:
+                file_stat = os.stat(os.path.join(root, name))
+                inodes[(file_stat.st_dev, file_stat.st_ino)] = file_stat.st_size
+    return sum(inodes.values())
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+    from system_config import get_manual_path
+    from languages_config import get_available_languages
+
+    parser = argparse.ArgumentParser(description='Sincronización incremental de recursos HTML')
+    parser.add_argument('manual', help='Nombre del manual (ej: open_aula_back)')
+    parser.add_argument('lang', help='Código de idioma destino (ej: en) o "all" para todos')
+    parser.add_argument('--dry-run', action='store_true', help='Solo mostrar qué se copiaría')
+    parser.add_argument('--store', action='store_true', help='Usar el almacén compartido aunque esté desactivado en la configuración')
+    parser.add_argument('--prune', action='store_true', help='Eliminar del almacén los objetos que ya no se usan')
+
+    args = parser.parse_args()
+
+    source_path = get_manual_path(args.manual) / 'html'
+    langs = [lang for lang in get_available_languages() if lang != 'es'] if args.lang == 'all' else [args.lang]
+    targets = [get_manual_path(args.manual, lang, 'html') for lang in langs]
+    if not source_path.exists() or None in targets:
+        print(f"❌ No se encontró el manual {args.manual} o el idioma {args.lang}")
+        sys.exit(1)
+
+    store = AssetStore() if args.store or ASSET_STORE_CONFIG['enabled'] else None
+    start = time.perf_counter()
+    for lang, target_path in zip(langs, targets):
+        report = sync_resources(source_path, target_path, args.dry_run, store)
+        label = "🔍 Se copiarían" if args.dry_run else "📁 Recursos"
+        print(f"{label} [{lang}]: {report.summary()}")
+    print(f"⏱️ {len(langs)} idiomas en {time.perf_counter() - start:.2f}s")
+
+    if not args.dry_run:
+        existing = [target_path for target_path in targets if target_path.exists()]
+        print(f"💾 Espacio en disco de los árboles: {disk_usage(existing) / 1024 / 1024:.1f} MB")
+    if store is not None:
+        if store.fallbacks:
+            print(f"⚠️ {store.fallbacks} archivos copiados: no se pudo crear el enlace ({store.link})")
+        if args.prune and not args.dry_run:
+            print(f"🗑️ {store.prune()} objetos sin uso eliminados del almacén")
+
+
+if __name__ == "__main__":
+    main()
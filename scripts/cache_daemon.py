@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+Servicio de caché de traducciones
+Mantiene la memoria de traducción en RAM una sola vez y la comparte por un socket Unix
+
+Protocolo: una petición JSON por línea, una respuesta JSON por línea y en el mismo orden.
+Cada operación acepta lotes de claves, y el cliente puede encadenar varias peticiones
+sin esperar respuesta (pipelining):
+
+    {"op": "get", "keys": [...]}                 -> {"ok": true, "values": {clave: valor}}
+    {"op": "put", "entries": {clave: valor}}     -> {"ok": true, "stored": n}
+    {"op": "claim", "keys": [...]}               -> {"ok": true, "values": {...}, "owned": [...]}
+    {"op": "release", "keys": [...]}             -> {"ok": true}
+    {"op": "delete", "keys": [...]}              -> {"ok": true, "deleted": n}
+    {"op": "stats"} / {"op": "save"} / {"op": "shutdown"}
+
+`claim` coalesce fallos de caché concurrentes: la primera conexión que pide una clave
+ausente queda como responsable de traducirla; las demás esperan a que llegue el `put`
+y reciben el valor sin llamar a la API.
+
+Uso:
+    python3 scripts/cache_daemon.py start
+    python3 scripts/cache_daemon.py status
+    python3 scripts/cache_daemon.py stop
+"""
+
+import sys
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import CACHE_FILE, CACHE_DAEMON_CONFIG
+from cache_stats import CacheStatsIndex
+
+
+class TranslationMemory:
+    """Memoria de traducción en RAM con control de traducciones en curso"""
+
+    def __init__(self, cache_file=CACHE_FILE, autosave_every=None):
+        self.cache_file = Path(cache_file)
+        self.autosave_every = autosave_every or CACHE_DAEMON_CONFIG['autosave_every']
+        self.data = {}
+        self.index = CacheStatsIndex()
+        self.inflight = {}  # clave -> conexión responsable de traducirla
+        self.cond = threading.Condition()
+        self.save_lock = threading.Lock()  # Un solo guardado a la vez (put y la operación save)
+        self.unsaved = 0
+        self.stats = {
+            'gets': 0,
+            'hits': 0,
+            'puts': 0,
+            'deletes': 0,
+            'claims': 0,
+            'coalesced': 0,
+            'started_at': time.time()
+        }
+
+    def load(self):
+        """Carga el caché JSON completo en memoria"""
+        if self.cache_file.exists():
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        self.index = CacheStatsIndex.load_for(self.data, self.cache_file)
+        return len(self.data)
+
+    def save(self):
+        """Guarda el caché en JSON (escritura atómica)"""
+        # La copia se toma dentro del lock de guardado: el último en escribir tiene la más nueva
+        with self.save_lock:
+            with self.cond:
+                snapshot = dict(self.data)
+                index_snapshot = json.loads(json.dumps(self.index.data))
+                self.unsaved = 0
+
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_name(f".{self.cache_file.name}.{os.getpid()}")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.cache_file)
+
+            index = CacheStatsIndex(self.index.stats_file)
+            index.data = index_snapshot
+            index.save(self.cache_file)
+            return len(snapshot)
+
+    def get(self, keys):
+        """Retorna los valores presentes para un lote de claves"""
+        with self.cond:
+            values = {key: self.data[key] for key in keys if key in self.data}
+            self.stats['gets'] += len(keys)
+            self.stats['hits'] += len(values)
+        return values
+
+    def put(self, entries):
+        """Guarda un lote de entradas y despierta a quien las esté esperando"""
+        with self.cond:
+            for key, value in entries.items():
+                if key in self.data:
+                    self.index.record_remove(key, self.data[key])
+                self.index.record_insert(key, value)
+                self.data[key] = value
+                self.inflight.pop(key, None)
+            self.stats['puts'] += len(entries)
+            self.unsaved += len(entries)
+            needs_save = self.unsaved >= self.autosave_every
+            self.cond.notify_all()
+
+        if needs_save:
+            self.save()
+        return len(entries)
+
+    def delete(self, keys):
+        """Elimina un lote de entradas (traducciones descartadas por un cliente)"""
+        with self.cond:
+            deleted = 0
+            for key in keys:
+                if key in self.data:
+                    self.index.record_remove(key, self.data.pop(key))
+                    deleted += 1
+            self.stats['deletes'] += deleted
+            self.unsaved += deleted
+            needs_save = self.unsaved >= self.autosave_every
+
+        if needs_save:
+            self.save()
+        return deleted
+
+    def claim(self, keys, owner, timeout=None):
+        """
+        Reclama un lote de claves para traducirlas
+
+        Args:
+            keys: Claves buscadas
+            owner: Identificador de la conexión que reclama
+            timeout: Segundos máximos de espera por una traducción en curso
+
+        Returns:
+            tuple: (valores encontrados, claves que debe traducir el llamador)
+        """
+        if timeout is None:
+            timeout = CACHE_DAEMON_CONFIG['claim_timeout']
+        deadline = time.monotonic() + timeout
+
+        values = {}
+        owned = []
+
+        with self.cond:
+            self.stats['claims'] += len(keys)
+            for key in keys:
+                waited = False
+                while True:
+                    if key in self.data:
+                        values[key] = self.data[key]
+                        break
+
+                    holder = self.inflight.get(key)
+                    remaining = deadline - time.monotonic()
+                    if holder is None or holder == owner or remaining <= 0:
+                        # Libre, propia o el responsable tardó demasiado: tomar el relevo
+                        self.inflight[key] = owner
+                        owned.append(key)
+                        break
+
+                    if not waited:
+                        self.stats['coalesced'] += 1
+                        waited = True
+                    self.cond.wait(remaining)
+
+        return values, owned
+
+    def release(self, keys, owner):
+        """Libera claves reclamadas que no se pudieron traducir"""
+        with self.cond:
+            for key in keys:
+                if self.inflight.get(key) == owner:
+                    del self.inflight[key]
+            self.cond.notify_all()
+
+    def release_owner(self, owner):
+        """Libera todas las claves de una conexión que se cerró"""
+        with self.cond:
+            for key in [k for k, holder in self.inflight.items() if holder == owner]:
+                del self.inflight[key]
+            self.cond.notify_all()
+
+    def get_stats(self):
+        """Retorna estadísticas del servicio"""
+        with self.cond:
+            stats = dict(self.stats)
+            stats['entries'] = len(self.data)
+            stats['inflight'] = len(self.inflight)
+            stats['unsaved'] = self.unsaved
+            index = self.index.summary()
+        index['languages'] = sorted(index['languages'])
+        stats['index'] = index
+        stats['uptime'] = time.time() - stats['started_at']
+        return stats
+
+
+class CacheRequestHandler(socketserver.StreamRequestHandler):
+    """Atiende una conexión: procesa peticiones en orden, una por línea"""
+
+    def handle(self):
+        memory = self.server.memory
+        owner = id(self)
+
+        try:
+            for raw_line in self.rfile:
+                if not raw_line.strip():
+                    continue
+
+                request = {}
+                try:
+                    request = json.loads(raw_line)
+                    response = self.dispatch(memory, owner, request)
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+                if request.get('op') == 'shutdown':
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    break
+        finally:
+            memory.release_owner(owner)
+
+    def dispatch(self, memory, owner, request):
+        """Ejecuta una operación del protocolo"""
+        op = request.get('op')
+
+        if op == 'get':
+            return {'ok': True, 'values': memory.get(request.get('keys', []))}
+        elif op == 'put':
+            return {'ok': True, 'stored': memory.put(request.get('entries', {}))}
+        elif op == 'claim':
+            values, owned = memory.claim(request.get('keys', []), owner, request.get('timeout'))
+            return {'ok': True, 'values': values, 'owned': owned}
+        elif op == 'release':
+            memory.release(request.get('keys', []), owner)
+            return {'ok': True}
+        elif op == 'delete':
+            return {'ok': True, 'deleted': memory.delete(request.get('keys', []))}
+        elif op == 'stats':
+            return {'ok': True, 'stats': memory.get_stats()}
+        elif op in ('save', 'shutdown'):
+            return {'ok': True, 'saved': memory.save()}
+        else:
+            return {'ok': False, 'error': f"Operación desconocida: {op}"}
+
+
+class CacheDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor del caché sobre socket Unix"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path=None, cache_file=CACHE_FILE):
+        self.socket_path = Path(socket_path or CACHE_DAEMON_CONFIG['socket_path'])
+        self.memory = TranslationMemory(cache_file)
+
+        # Eliminar socket huérfano de una ejecución anterior
+        if self.socket_path.exists():
+            if CacheClient.is_running(self.socket_path):
+                raise RuntimeError(f"Ya hay un servicio de caché escuchando en {self.socket_path}")
+            self.socket_path.unlink()
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(str(self.socket_path), CacheRequestHandler)
+
+    def run(self):
+        """Carga el caché y atiende conexiones hasta recibir 'shutdown'"""
+        start = time.time()
+        count = self.memory.load()
+        print(f"💾 Caché cargado en memoria: {count} entradas en {time.time() - start:.2f}s")
+        print(f"🔌 Escuchando en {self.socket_path}")
+
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            print("\n⏹️ Deteniendo servicio...")
+        finally:
+            saved = self.memory.save()
+            self.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+            print(f"💾 Caché guardado: {saved} entradas")
+
+
+class CacheClient:
+    """Cliente del servicio de caché (usado por HTMLTranslator y scripts ad-hoc)"""
+
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = Path(socket_path or CACHE_DAEMON_CONFIG['socket_path'])
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout or CACHE_DAEMON_CONFIG['connect_timeout'])
+        self.sock.connect(str(self.socket_path))
+        # Las esperas de 'claim' pueden superar el timeout de conexión
+        self.sock.settimeout(None)
+        self.rfile = self.sock.makefile('rb')
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def is_running(socket_path=None):
+        """Verifica si hay un servicio escuchando en el socket"""
+        socket_path = Path(socket_path or CACHE_DAEMON_CONFIG['socket_path'])
+        if not socket_path.exists():
+            return False
+        try:
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            probe.settimeout(CACHE_DAEMON_CONFIG['connect_timeout'])
+            probe.connect(str(socket_path))
+            probe.close()
+            return True
+        except OSError:
+            return False
+
+    @classmethod
+    def connect_if_running(cls, socket_path=None):
+        """Retorna un cliente conectado, o None si el servicio no está disponible"""
+        if not CACHE_DAEMON_CONFIG['enabled']:
+            return None
+        try:
+            return cls(socket_path)
+        except OSError:
+            return None
+
+    def pipeline(self, requests_list):
+        """Envía varias peticiones seguidas y luego lee todas las respuestas"""
+        payload = b''.join(
+            json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n'
+            for request in requests_list
+        )
+
+        with self.lock:
+            self.sock.sendall(payload)
+            responses = []
+            for _ in requests_list:
+                line = self.rfile.readline()
+                if not line:
+                    raise ConnectionError("El servicio de caché cerró la conexión")
+                responses.append(json.loads(line))
+
+        for response in responses:
+            if not response.get('ok'):
+                raise RuntimeError(f"Error del servicio de caché: {response.get('error')}")
+        return responses
+
+    def request(self, op, **kwargs):
+        """Envía una única petición"""
+        return self.pipeline([dict(op=op, **kwargs)])[0]
+
+    def get_many(self, keys):
+        return self.request('get', keys=list(keys))['values']
+
+    def put_many(self, entries):
+        return self.request('put', entries=entries)['stored']
+
+    def claim(self, keys, timeout=None):
+        response = self.request('claim', keys=list(keys), timeout=timeout)
+        return response['values'], response['owned']
+
+    def release(self, keys):
+        self.request('release', keys=list(keys))
+
+    def delete_many(self, keys):
+        return self.request('delete', keys=list(keys))['deleted']
+
+    def stats(self):
+        return self.request('stats')['stats']
+
+    def save(self):
+        return self.request('save')['saved']
+
+    def shutdown(self):
+        return self.request('shutdown')['saved']
+
+    def close(self):
+        try:
+            self.rfile.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class DaemonCache(dict):
+    """
+    Vista local del caché respaldada por el servicio
+
+    Se comporta como el dict que usa HTMLTranslator: las claves consultadas se traen
+    del servicio bajo demanda (o por lote con prefetch) y las entradas nuevas se
+    acumulan hasta flush(). Solo contiene lo que este proceso usó, no el caché completo.
+    """
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+        self.pending = {}
+        self.known_missing = set()
+
+    def prefetch(self, keys):
+        """Trae del servicio un lote de claves en una sola petición"""
+        wanted = [k for k in dict.fromkeys(keys) if not dict.__contains__(self, k) and k not in self.known_missing]
+        if not wanted:
+            return 0
+        values = self.client.get_many(wanted)
+        dict.update(self, values)
+        self.known_missing.update(k for k in wanted if k not in values)
+        return len(values)
+
+    def __contains__(self, key):
+        if dict.__contains__(self, key):
+            return True
+        if key in self.known_missing:
+            return False
+        self.prefetch([key])
+        return dict.__contains__(self, key)
+
+    def __getitem__(self, key):
+        if not dict.__contains__(self, key):
+            self.prefetch([key])
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self.known_missing.discard(key)
+        self.pending[key] = value
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.pending.pop(key, None)
+        # Sin esto el próximo 'in' volvería a traer la entrada descartada
+        self.known_missing.add(key)
+        self.client.delete_many([key])
+
+    def claim(self, key):
+        """
+        Reclama una clave ausente antes de traducirla
+
+        Returns:
+            El valor si otro proceso la tradujo mientras tanto, o None si
+            este proceso quedó como responsable de traducirla
+        """
+        values, _owned = self.client.claim([key])
+        if key in values:
+            dict.__setitem__(self, key, values[key])
+            self.known_missing.discard(key)
+            return values[key]
+        return None
+
+    def release(self, key):
+        """Libera una clave reclamada cuya traducción falló"""
+        try:
+            self.client.release([key])
+        except (OSError, RuntimeError):
+            pass
+
+    def flush(self, keys=None):
+        """Envía al servicio las entradas nuevas (todas o solo las indicadas)"""
+        if keys is None:
+            batch = self.pending
+            self.pending = {}
+        else:
+            batch = {k: self.pending.pop(k) for k in keys if k in self.pending}
+        if batch:
+            self.client.put_many(batch)
+        return len(batch)
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servicio de caché de traducciones')
+    parser.add_argument('action', choices=['start', 'stop', 'status', 'save'], help='Acción a ejecutar')
+    parser.add_argument('--socket', default=None, help='Ruta del socket Unix')
+
+    args = parser.parse_args()
+
+    if args.action == 'start':
+        try:
+            daemon = CacheDaemon(args.socket)
+        except RuntimeError as e:
+            print(f"⚠️ {e}")
+            sys.exit(1)
+        daemon.run()
+        sys.exit(0)
+
+    if not CacheClient.is_running(args.socket):
+        print("ℹ️ El servicio de caché no está corriendo")
+        sys.exit(1 if args.action != 'stop' else 0)
+
+    client = CacheClient(args.socket)
+    try:
+        if args.action == 'status':
+            stats = client.stats()
+            print("📊 SERVICIO DE CACHÉ")
+            print("=" * 40)
+            print(f"📝 Entradas en memoria: {stats['entries']}")
+            print(f"🔍 Consultas: {stats['gets']} ({stats['hits']} aciertos)")
+            print(f"💾 Escrituras: {stats['puts']} ({stats['unsaved']} sin guardar)")
+            print(f"🗑️ Eliminaciones: {stats['deletes']}")
+            print(f"🔗 Fallos coalescidos: {stats['coalesced']}")
+            print(f"⏳ Traducciones en curso: {stats['inflight']}")
+            print(f"⏱️ Activo hace: {stats['uptime']/60:.1f} minutos")
+        elif args.action == 'save':
+            print(f"💾 Caché guardado: {client.save()} entradas")
+        elif args.action == 'stop':
+            print(f"⏹️ Servicio detenido, caché guardado: {client.shutdown()} entradas")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
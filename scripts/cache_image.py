@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Imagen de solo lectura del caché de traducciones, para abrir con mmap
+Varios procesos trabajadores comparten las mismas páginas del archivo (page cache)
+en lugar de cargar cada uno su copia del JSON
+
+El proceso que reparte el trabajo llama a ensure_image() (regenera la imagen si
+el JSON es más nuevo) y cada trabajador abre open_shared_cache(): la imagen más
+una capa propia con las traducciones nuevas, que drain() entrega para fusionarlas
+en el caché del proceso principal.
+
+Estructura del archivo (little-endian):
+    MAGIC (8 bytes) | cantidad N (uint64)
+    digests: N x 16 bytes, MD5 de las claves ordenados
+    offsets: (N + 1) x uint64, posición de cada traducción en el blob
+    blob:    traducciones UTF-8 concatenadas
+
+Solo se incluyen las entradas de traducción (claves MD5); FILE_METADATA y los
+contadores de uso quedan en el caché JSON del proceso principal.
+
+Uso:
+    python3 scripts/cache_image.py build
+    python3 scripts/cache_image.py lookup "Texto original" --lang en
+    python3 scripts/cache_image.py benchmark
+    python3 scripts/cache_image.py check       # verificación con un caché sintético
+"""
+
+import sys
+import json
+import mmap
+import os
+import time
+from array import array
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import CACHE_FILE, CACHE_IMAGE_CONFIG
+
+MAGIC = b'TMCIMG\x00\x01'
+HEADER_SIZE = len(MAGIC) + 8
+DIGEST_SIZE = 16
+
+
+def _translated_text(value):
+    """Extrae la traducción de una entrada (formato nuevo o antiguo)"""
+    if isinstance(value, dict):
+        return value.get('translated')
+    if isinstance(value, str):
+        return value
+    return None
+
+
+def build_image(cache, image_file):
+    """
+    Escribe la imagen de solo lectura a partir del caché
+
+    Returns:
+        int: Cantidad de traducciones incluidas
+    """
+    entries = []
+    for key, value in cache.items():
+        if len(key) != 32:
+            continue
+        translated = _translated_text(value)
+        if translated is None:
+            continue
+        try:
+            digest = bytes.fromhex(key)
+        except ValueError:
+            continue
+        entries.append((digest, translated.encode('utf-8')))
+    entries.sort()
+
+    offsets = array('Q', [0])
+    for _, text in entries:
+        offsets.append(offsets[-1] + len(text))
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+
+    image_file = Path(image_file)
+    image_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = image_file.with_name(f".{image_file.name}.{os.getpid()}")
+    with open(tmp_file, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(entries).to_bytes(8, 'little'))
+        f.write(b''.join(digest for digest, _ in entries))
+        f.write(offsets.tobytes())
+        for _, text in entries:
+            f.write(text)
+    # Reemplazo atómico: los procesos que ya tienen abierta la imagen anterior la siguen viendo
+    os.replace(tmp_file, image_file)
+    return len(entries)
+
+
+class CacheImage:
+    """Vista mmap de la imagen del caché: búsqueda binaria sin copiar el archivo"""
+
+    def __init__(self, image_file):
+        self.image_file = Path(image_file)
+        self._offsets = None
+        self._file = open(self.image_file, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Imagen de caché vacía: {self.image_file}")
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{self.image_file} no es una imagen de caché")
+
+        self.count = int.from_bytes(self._mmap[len(MAGIC):HEADER_SIZE], 'little')
+        self._digests_start = HEADER_SIZE
+        self._offsets_start = self._digests_start + self.count * DIGEST_SIZE
+        self._blob_start = self._offsets_start + (self.count + 1) * 8
+
+        # Offsets leídos directo de las páginas mapeadas (sin copiar) en plataformas little-endian
+        if sys.byteorder == 'little':
+            self._offsets = memoryview(self._mmap)[self._offsets_start:self._blob_start].cast('Q')
+
+    def __len__(self):
+        return self.count
+
+    def _offset(self, index):
+        if self._offsets is not None:
+            return self._offsets[index]
+        start = self._offsets_start + index * 8
+        return int.from_bytes(self._mmap[start:start + 8], 'little')
+
+    def _find(self, digest):
+        """Búsqueda binaria del digest; retorna el índice o -1"""
+        data = self._mmap
+        base = self._digests_start
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = base + middle * DIGEST_SIZE
+            current = data[start:start + DIGEST_SIZE]
+            if current < digest:
+                low = middle + 1
+            elif current > digest:
+                high = middle
+            else:
+                return middle
+        return -1
+
+    def get(self, key, default=None):
+        """Retorna la traducción para una clave MD5 del caché"""
+        if len(key) != 32:
+            return default
+        try:
+            index = self._find(bytes.fromhex(key))
+        except ValueError:
+            return default
+        if index < 0:
+            return default
+        start = self._blob_start + self._offset(index)
+        end = self._blob_start + self._offset(index + 1)
+        return str(self._mmap[start:end], 'utf-8')
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def close(self):
+        if self._offsets is not None:
+            self._offsets.release()
+            self._offsets = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LayeredCache:
+    """
+    Caché de un proceso trabajador: imagen compartida de solo lectura más
+    una capa propia con las traducciones nuevas de esta ejecución
+    """
+
+    def __init__(self, image=None):
+        self.image = image
+        self.overlay = {}
+
+    def get(self, key, default=None):
+        """Retorna la traducción (primero la capa propia, después la imagen)"""
+        value = self.overlay.get(key)
+        if value is not None:
+            return _translated_text(value)
+        if self.image is not None:
+            return self.image.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        return key in self.overlay or (self.image is not None and key in self.image)
+
+    def put(self, key, value):
+        """Guarda una traducción nueva en la capa propia"""
+        self.overlay[key] = value
+
+    def drain(self):
+        """Retorna y vacía las entradas nuevas, para fusionarlas en el proceso principal"""
+        entries, self.overlay = self.overlay, {}
+        return entries
+
+    def close(self):
+        if self.image is not None:
+            self.image.close()
+            self.image = None
+
+
+def ensure_image(source_file=CACHE_FILE, image_file=None):
+    """
+    Regenera la imagen si no existe o si el caché JSON es más nuevo (antes de lanzar trabajadores)
+
+    Returns:
+        bool: True si la imagen quedó disponible
+    """
+    source_file = Path(source_file)
+    image_file = Path(image_file or CACHE_IMAGE_CONFIG['image_file'])
+    if not source_file.exists():
+        return image_file.exists()
+    if image_file.exists() and image_file.stat().st_mtime_ns >= source_file.stat().st_mtime_ns:
+        return True
+    with open(source_file, 'r', encoding='utf-8') as f:
+        build_image(json.load(f), image_file)
+    return True
+
+
+def open_shared_cache(image_file=None):
+    """Abre la imagen del caché para un proceso trabajador (capa vacía si no existe)"""
+    image_file = Path(image_file or CACHE_IMAGE_CONFIG['image_file'])
+    image = None
+    if image_file.exists():
+        try:
+            image = CacheImage(image_file)
+        except ValueError as e:
+            print(f"⚠️ {e}")
+    return LayeredCache(image)
+
+
+def _worker_lookup(image_file, key):
+    """Búsqueda desde un proceso trabajador (para run_check)"""
+    shared = open_shared_cache(image_file)
+    try:
+        return shared.get(key)
+    finally:
+        shared.close()
+
+
+def run_check():
+    """Verifica imagen, capa propia y regeneración con un caché sintético en un directorio temporal"""
+    import hashlib
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    def key(text):
+        return hashlib.md5(f"{text}:en".encode('utf-8')).hexdigest()
+
+    cache = {key(f"Texto {i}"): {'translated': f"Text {i} ✓", 'usage_count': i} for i in range(500)}
+    cache[key('Antiguo')] = 'Old format'
+    cache[key('Vacío')] = {'usage_count': 1}
+    cache['FILE_METADATA'] = {'files': {}}
+
+    failures = []
+
+    def expect(label, condition):
+        print(f"   {'✅' if condition else '❌'} {label}")
+        if not condition:
+            failures.append(label)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_file = Path(tmp_dir) / 'translations.json'
+        image_file = Path(tmp_dir) / 'translations.img'
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+
+        expect("ensure_image genera la imagen", ensure_image(json_file, image_file) and image_file.exists())
+        shared = open_shared_cache(image_file)
+        expect("la imagen tiene solo traducciones", len(shared.image) == 501)
+        expect("formato nuevo", shared.get(key('Texto 7')) == 'Text 7 ✓')
+        expect("formato antiguo", shared.get(key('Antiguo')) == 'Old format')
+        expect("sin traducción ni metadatos", key('Vacío') not in shared and 'FILE_METADATA' not in shared)
+        expect("clave ausente", shared.get(key('Nuevo'), 'x') == 'x')
+
+        shared.put(key('Nuevo'), {'translated': 'New'})
+        shared.put(key('Texto 7'), {'translated': 'Text 7 (v2)'})
+        expect("la capa propia tiene prioridad", shared.get(key('Texto 7')) == 'Text 7 (v2)')
+        expect("la capa propia agrega claves", key('Nuevo') in shared and shared.get(key('Nuevo')) == 'New')
+        drained = shared.drain()
+        expect("drain entrega y vacía la capa", set(drained) == {key('Nuevo'), key('Texto 7')}
+               and key('Nuevo') not in shared and shared.get(key('Texto 7')) == 'Text 7 ✓')
+        shared.close()
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(_worker_lookup, [image_file] * 2, [key('Texto 3'), key('Texto 4')]))
+        expect("procesos trabajadores abren la imagen", results == ['Text 3 ✓', 'Text 4 ✓'])
+
+        cache.update(drained)
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.utime(json_file, ns=(image_file.stat().st_mtime_ns + 1, image_file.stat().st_mtime_ns + 1))
+        ensure_image(json_file, image_file)
+        with CacheImage(image_file) as image:
+            expect("JSON más nuevo: la imagen se regenera", image.get(key('Nuevo')) == 'New')
+
+        expect("sin imagen: solo capa propia", open_shared_cache(Path(tmp_dir) / 'no.img').get(key('Texto 1')) is None)
+
+    print(f"🔍 {'Verificación correcta' if not failures else f'{len(failures)} verificaciones fallidas'}")
+    return not failures
+
+
+def run_benchmark(json_file, image_file, samples=20000):
+    """Compara abrir la imagen con cargar el JSON, y mide búsquedas"""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        cache = json.load(f)
+    start = time.perf_counter()
+    count = build_image(cache, image_file)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with open(json_file, 'r', encoding='utf-8') as f:
+        json.load(f)
+    json_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    image = CacheImage(image_file)
+    open_time = time.perf_counter() - start
+
+    keys = [key for key in cache if len(key) == 32][:samples]
+    start = time.perf_counter()
+    mismatches = sum(1 for key in keys if image.get(key) != _translated_text(cache[key]))
+    lookup_time = time.perf_counter() - start
+    image.close()
+
+    print("⏱️ BENCHMARK DE IMAGEN DEL CACHÉ")
+    print("=" * 50)
+    print(f"📝 Traducciones en imagen: {count} ({Path(image_file).stat().st_size / (1024 * 1024):.2f} MB,"
+          f" generada en {build_time * 1000:.0f} ms)")
+    print(f"📄 Carga JSON por proceso: {json_time * 1000:.1f} ms")
+    print(f"🗺️ Apertura mmap por proceso: {open_time * 1000:.3f} ms")
+    if keys:
+        print(f"🔍 Búsqueda: {lookup_time / len(keys) * 1e6:.1f} µs por clave ({len(keys)} claves)")
+    if mismatches:
+        print(f"❌ {mismatches} traducciones no coinciden con el JSON")
+        return False
+    print("✅ Traducciones idénticas al JSON")
+    return True
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+    import hashlib
+
+    parser = argparse.ArgumentParser(description='Imagen mmap de solo lectura del caché de traducciones')
+    parser.add_argument('action', choices=['build', 'lookup', 'benchmark', 'check'], help='Acción a ejecutar')
+    parser.add_argument('text', nargs='?', help='Texto original a buscar (lookup)')
+    parser.add_argument('--lang', default='en', help='Código de idioma (lookup)')
+    parser.add_argument('--json', default=str(CACHE_FILE), help='Ruta del caché JSON')
+    parser.add_argument('--image', default=str(CACHE_IMAGE_CONFIG['image_file']), help='Ruta de la imagen')
+
+    args = parser.parse_args()
+
+    if args.action == 'build':
+        with open(args.json, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        count = build_image(cache, args.image)
+        print(f"🗺️ Imagen generada: {count} traducciones → {args.image}")
+    elif args.action == 'lookup':
+        if not args.text:
+            parser.error("lookup requiere el texto original")
+        key = hashlib.md5(f"{args.text}:{args.lang}".encode('utf-8')).hexdigest()
+        with CacheImage(args.image) as image:
+            translated = image.get(key)
+        print(translated if translated is not None else "ℹ️ No está en la imagen")
+    elif args.action == 'benchmark':
+        sys.exit(0 if run_benchmark(args.json, args.image) else 1)
+    elif args.action == 'check':
+        sys.exit(0 if run_check() else 1)
+
+
+if __name__ == "__main__":
+    main()
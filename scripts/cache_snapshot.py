@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Snapshot binario del caché de traducciones
+Formato columnar comprimido (~1/5 del JSON) que carga ~1.5x más rápido que
+json.load del JSON con indentación. No llega a "varias veces": descomprimir y
+armar un dict y dos textos por entrada cuesta casi lo mismo que el parser de
+JSON en C, y el traductor necesita las entradas completas (las vuelve a guardar
+en el JSON).
+
+Estructura del archivo:
+    MAGIC (8 bytes) | largo de cabecera (uint32 LE) | cabecera JSON | columnas zlib
+
+Cada columna guarda un campo de todas las entradas con formato nuevo:
+    - textos: UTF-8 unidos por '\\x00' (se separan con un solo split)
+    - números: arreglos int64/float64 little-endian
+    - order: posición de cada entrada en el caché original
+
+Las entradas se agrupan por conjunto de campos presentes (máscara de bits), así cada
+grupo ocupa un tramo contiguo de las columnas y sus dicts se arman en bloque.
+
+Las entradas que no encajan en las columnas (formato antiguo, FILE_METADATA,
+campos extra o en otro orden) van tal cual en la columna 'extras' como JSON,
+de modo que JSON -> snapshot -> JSON es exacto.
+
+Uso:
+    python3 scripts/cache_snapshot.py pack        # translations.json -> snapshot
+    python3 scripts/cache_snapshot.py unpack      # snapshot -> translations.json
+    python3 scripts/cache_snapshot.py benchmark   # compara tiempos de arranque
+"""
+
+import sys
+import gc
+import json
+import os
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import CACHE_FILE, CACHE_SNAPSHOT_CONFIG
+
+MAGIC = b'TMCSNAP\x01'
+SNAPSHOT_VERSION = 1
+
+# Campos de una entrada de traducción, en el orden en que HTMLTranslator los inserta
+FIELDS = (
+    ('original', 'str'),
+    ('translated', 'str'),
+    ('element_type', 'str'),
+    ('lang', 'str'),
+    ('manual', 'str'),
+    ('timestamp', 'float'),
+    ('usage_count', 'int'),
+    ('input_tokens', 'int'),
+    ('output_tokens', 'int'),
+    ('cost', 'float'),
+)
+FIELD_NAMES = tuple(name for name, _ in FIELDS)
+FIELD_INDEX = {name: i for i, name in enumerate(FIELD_NAMES)}
+EXTRA_MASK = 0  # Entrada guardada en la columna 'extras'
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+FIELD_TYPES = {'str': str, 'int': int, 'float': float}
+
+
+def _layout(names):
+    """
+    Retorna (máscara, tipos esperados) para un orden de campos dado,
+    o (EXTRA_MASK, None) si la entrada no se puede reconstruir exacta desde columnas
+    """
+    mask = 0
+    last_index = -1
+    types = []
+    for name in names:
+        index = FIELD_INDEX.get(name)
+        # Campos desconocidos o en otro orden
+        if index is None or index <= last_index:
+            return EXTRA_MASK, None
+        last_index = index
+        mask |= 1 << index
+        types.append(FIELD_TYPES[FIELDS[index][1]])
+    if not mask:
+        return EXTRA_MASK, None
+    return mask, tuple(types)
+
+
+def _entry_builder(names):
+    """
+    Función que arma el dict de una entrada a partir de sus valores
+    Un literal {campo: valor, ...} se arma bastante más rápido que dict(zip(names, fila))
+    """
+    builder = _entry_builders.get(names)
+    if builder is None:
+        # Los nombres salen de FIELD_NAMES (identificadores fijos), no del archivo
+        arguments = ', '.join(f"v{i}" for i in range(len(names)))
+        fields = ', '.join(f"{name!r}: v{i}" for i, name in enumerate(names))
+        builder = _entry_builders[names] = eval(f"lambda {arguments}: {{{fields}}}")
+    return builder
+
+
+_entry_builders = {}
+
+
+def _fits_columns(value):
+    """Verificación completa de una entrada (caracteres NUL y rango int64)"""
+    for name, field_value in value.items():
+        if isinstance(field_value, str) and '\x00' in field_value:
+            return False
+        if type(field_value) is int and not INT64_MIN <= field_value <= INT64_MAX:
+            return False
+    return True
+
+
+def _group_entries(cache, strict=False):
+    """Agrupa las entradas por máscara de campos (cada orden de campos se analiza una sola vez)"""
+    layouts = {}
+    groups = {}
+    for position, (key, value) in enumerate(cache.items()):
+        mask = EXTRA_MASK
+        if type(value) is dict:
+            names = tuple(value)
+            layout = layouts.get(names)
+            if layout is None:
+                layout = layouts[names] = _layout(names)
+            mask, types = layout
+            if mask != EXTRA_MASK and (tuple(map(type, value.values())) != types or
+                                       (strict and not _fits_columns(value))):
+                mask = EXTRA_MASK
+        groups.setdefault(mask, []).append((position, key, value))
+    return groups
+
+
+def _int_array(values, typecode):
+    data = array(typecode, values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _read_array(raw, typecode):
+    data = array(typecode)
+    data.frombytes(raw)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tolist()
+
+
+def _split_strings(raw, count):
+    if count == 0:
+        return []
+    return raw.decode('utf-8').split('\x00')
+
+
+def _join_strings(values):
+    text = '\x00'.join(values)
+    if values and text.count('\x00') != len(values) - 1:
+        raise ValueError("Texto con carácter NUL")
+    return text.encode('utf-8')
+
+
+def _build_columns(cache, strict):
+    """Arma las columnas crudas: [(nombre, cantidad de valores, bytes)]"""
+    groups = _group_entries(cache, strict)
+
+    keys = []
+    order = [0] * len(cache)
+    columns = {name: [] for name in FIELD_NAMES}
+    extras = []
+
+    for mask, entries in groups.items():
+        for position, key, value in entries:
+            order[position] = len(keys)
+            keys.append(key)
+        if mask == EXTRA_MASK:
+            extras.extend(value for _, _, value in entries)
+            continue
+        for index, name in enumerate(FIELD_NAMES):
+            if mask & (1 << index):
+                columns[name].extend([value[name] for _, _, value in entries])
+
+    raw_columns = [
+        ('keys', len(keys), '\x00'.join(keys).encode('utf-8')),
+        ('order', len(order), _int_array(order, 'q')),
+    ]
+    for name, kind in FIELDS:
+        values = columns[name]
+        try:
+            if kind == 'str':
+                raw = _join_strings(values)
+            elif kind == 'int':
+                raw = _int_array(values, 'q')
+            else:
+                raw = _int_array(values, 'd')
+        except OverflowError as e:
+            raise ValueError(str(e))
+        raw_columns.append((name, len(values), raw))
+    raw_columns.append(('extras', len(extras),
+                        json.dumps(extras, ensure_ascii=False, separators=(',', ':')).encode('utf-8')))
+    return groups, raw_columns
+
+
+def write_snapshot(cache, snapshot_file, source_file=None, compress_level=None):
+    """
+    Escribe el caché en formato snapshot
+
+    Args:
+        cache: Diccionario del caché
+        snapshot_file: Ruta del snapshot
+        source_file: JSON del que proviene (se guarda su tamaño/fecha para detectar cambios)
+        compress_level: Nivel zlib (por defecto el de CACHE_SNAPSHOT_CONFIG)
+
+    Returns:
+        int: Tamaño del snapshot en bytes
+    """
+    if compress_level is None:
+        compress_level = CACHE_SNAPSHOT_CONFIG['compress_level']
+
+    keys = list(cache)
+    if any('\x00' in key for key in keys):
+        raise ValueError("Clave de caché inválida: contiene el carácter NUL")
+
+    try:
+        groups, raw_columns = _build_columns(cache, strict=False)
+    except ValueError:
+        # Algún texto con NUL o entero fuera de rango: esas entradas van a 'extras'
+        groups, raw_columns = _build_columns(cache, strict=True)
+
+    header = {
+        'version': SNAPSHOT_VERSION,
+        'entries': len(cache),
+        'fields': [list(field) for field in FIELDS],
+        'groups': [[mask, len(entries)] for mask, entries in groups.items()],
+        'columns': [],
+        'extras': len(groups.get(EXTRA_MASK, [])),
+        'source_size': None,
+        'source_mtime': None,
+        'created_at': time.time()
+    }
+    if source_file is not None and Path(source_file).exists():
+        stat = Path(source_file).stat()
+        header['source_size'] = stat.st_size
+        header['source_mtime'] = stat.st_mtime_ns
+
+    blobs = []
+    for name, count, raw in raw_columns:
+        blob = zlib.compress(raw, compress_level)
+        header['columns'].append({'name': name, 'count': count, 'size': len(blob), 'raw_size': len(raw)})
+        blobs.append(blob)
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+
+    snapshot_file = Path(snapshot_file)
+    snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = snapshot_file.with_suffix(snapshot_file.suffix + '.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(4, 'little'))
+        f.write(header_bytes)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_file, snapshot_file)
+    return snapshot_file.stat().st_size
+
+
+def read_snapshot_header(snapshot_file):
+    """Lee solo la cabecera del snapshot (None si no es un snapshot válido)"""
+    try:
+        with open(snapshot_file, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            header_size = int.from_bytes(f.read(4), 'little')
+            header = json.loads(f.read(header_size))
+    except (OSError, ValueError):
+        return None
+    if header.get('version') != SNAPSHOT_VERSION:
+        return None
+    return header
+
+
+def load_snapshot(snapshot_file):
+    """Carga el snapshot y retorna el diccionario del caché"""
+    # La carga crea cientos de miles de objetos de una vez: sin pausas del GC mientras tanto
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _load_snapshot(snapshot_file)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _load_snapshot(snapshot_file):
+    with open(snapshot_file, 'rb') as f:
+        data = f.read()
+
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{snapshot_file} no es un snapshot de caché")
+    offset = len(MAGIC)
+    header_size = int.from_bytes(data[offset:offset + 4], 'little')
+    offset += 4
+    header = json.loads(data[offset:offset + header_size])
+    offset += header_size
+
+    if header.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Versión de snapshot no soportada: {header.get('version')}")
+    if [tuple(field) for field in header['fields']] != list(FIELDS):
+        raise ValueError("Campos del snapshot no coinciden con esta versión")
+
+    raw = {}
+    for column in header['columns']:
+        end = offset + column['size']
+        raw[column['name']] = (zlib.decompress(data[offset:end]), column['count'])
+        offset = end
+
+    keys = _split_strings(raw['keys'][0], header['entries'])
+    order = _read_array(raw['order'][0], 'q')
+    extras = json.loads(raw['extras'][0])
+
+    columns = {}
+    for name, kind in FIELDS:
+        column_raw, column_count = raw[name]
+        if kind == 'str':
+            columns[name] = _split_strings(column_raw, column_count)
+        else:
+            columns[name] = _read_array(column_raw, 'q' if kind == 'int' else 'd')
+
+    # Cada grupo comparte los mismos campos: los dicts se arman en bloque con map
+    values = []
+    offsets = dict.fromkeys(FIELD_NAMES, 0)
+    extras_offset = 0
+    for mask, count in header['groups']:
+        if mask == EXTRA_MASK:
+            values.extend(extras[extras_offset:extras_offset + count])
+            extras_offset += count
+            continue
+        names = tuple(name for index, name in enumerate(FIELD_NAMES) if mask & (1 << index))
+        slices = []
+        for name in names:
+            start = offsets[name]
+            column = columns[name]
+            slices.append(column if start == 0 and count == len(column) else column[start:start + count])
+            offsets[name] = start + count
+        values.extend(map(_entry_builder(names), *slices))
+
+    # Restaurar el orden original de las claves (con un solo grupo ya está en orden)
+    if len(header['groups']) == 1:
+        return dict(zip(keys, values))
+    return {keys[i]: values[i] for i in order}
+
+
+def snapshot_is_fresh(snapshot_file, source_file):
+    """Indica si el snapshot corresponde a la versión actual del JSON"""
+    header = read_snapshot_header(snapshot_file)
+    if header is None or not Path(source_file).exists():
+        return False
+    stat = Path(source_file).stat()
+    return header['source_size'] == stat.st_size and header['source_mtime'] == stat.st_mtime_ns
+
+
+def load_json(json_file):
+    with open(json_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_json(cache, json_file):
+    json_file = Path(json_file)
+    json_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+
+def run_benchmark(json_file, snapshot_file, repeat=3):
+    """Compara el arranque con JSON y con snapshot sobre el caché real"""
+    json_file = Path(json_file)
+    if not json_file.exists():
+        print(f"❌ No existe el caché: {json_file}")
+        return False
+
+    print("⏱️ BENCHMARK DE CARGA DEL CACHÉ")
+    print("=" * 50)
+
+    cache = load_json(json_file)
+    start = time.perf_counter()
+    write_snapshot(cache, snapshot_file, json_file)
+    write_time = time.perf_counter() - start
+
+    def best_of(loader, path):
+        times = []
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = loader(path)
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    json_time, from_json = best_of(load_json, json_file)
+    snapshot_time, from_snapshot = best_of(load_snapshot, snapshot_file)
+
+    json_size = json_file.stat().st_size
+    snapshot_size = Path(snapshot_file).stat().st_size
+    header = read_snapshot_header(snapshot_file)
+
+    print(f"📝 Entradas: {len(from_json)}")
+    print(f"📏 JSON:     {json_size / (1024 * 1024):8.2f} MB | carga {json_time * 1000:8.1f} ms")
+    print(f"📦 Snapshot: {snapshot_size / (1024 * 1024):8.2f} MB | carga {snapshot_time * 1000:8.1f} ms"
+          f" | escritura {write_time * 1000:.1f} ms")
+    print(f"🚀 Carga {json_time / snapshot_time:.1f}x más rápida, {snapshot_size / json_size:.1%} del tamaño")
+    print(f"ℹ️ Entradas fuera de columnas (extras): {header['extras']}")
+
+    if from_json == from_snapshot and list(from_json) == list(from_snapshot):
+        print("✅ Contenido idéntico al JSON")
+        return True
+    print("❌ El snapshot no reproduce el JSON")
+    return False
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Snapshot binario del caché de traducciones')
+    parser.add_argument('action', choices=['pack', 'unpack', 'benchmark'], help='Acción a ejecutar')
+    parser.add_argument('--json', default=str(CACHE_FILE), help='Ruta del caché JSON')
+    parser.add_argument('--snapshot', default=str(CACHE_SNAPSHOT_CONFIG['snapshot_file']), help='Ruta del snapshot')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones del benchmark')
+
+    args = parser.parse_args()
+
+    if args.action == 'pack':
+        cache = load_json(args.json)
+        size = write_snapshot(cache, args.snapshot, args.json)
+        print(f"📦 Snapshot generado: {len(cache)} entradas, {size / (1024 * 1024):.2f} MB → {args.snapshot}")
+    elif args.action == 'unpack':
+        cache = load_snapshot(args.snapshot)
+        save_json(cache, args.json)
+        print(f"📄 JSON generado: {len(cache)} entradas → {args.json}")
+    elif args.action == 'benchmark':
+        sys.exit(0 if run_benchmark(args.json, args.snapshot, args.repeat) else 1)
+
+
+if __name__ == "__main__":
+    main()
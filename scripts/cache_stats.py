@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Índice de estadísticas del caché de traducciones
+Contadores agregados mantenidos en cada inserción, guardados junto al caché
+para que los reportes no tengan que recorrer el JSON completo
+"""
+
+import sys
+import json
+import hashlib
+import os
+import time
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import CACHE_FILE, CACHE_STATS_FILE
+# La clave del caché se calcula sobre el texto con los emails protegidos
+from text_patterns import protect_email_addresses
+
+STATS_VERSION = 1
+UNKNOWN = 'desconocido'
+
+
+def _empty_bucket():
+    return {'entries': 0, 'hits': 0, 'input_tokens': 0, 'output_tokens': 0, 'cost': 0.0}
+
+
+class CacheStatsIndex:
+    """Contadores del caché por idioma y por manual, actualizados de forma incremental"""
+
+    def __init__(self, stats_file=CACHE_STATS_FILE):
+        self.stats_file = Path(stats_file)
+        self.data = self._empty()
+
+    @staticmethod
+    def _empty():
+        return {
+            'version': STATS_VERSION,
+            'translation_entries': 0,
+            'file_metadata_entries': 0,
+            'legacy_entries': 0,
+            'hits': 0,
+            'input_tokens': 0,
+            'output_tokens': 0,
+            'cost': 0.0,
+            'oldest_entry': None,
+            'newest_entry': None,
+            'languages': {},
+            'manuals': {},
+            'cache_file_size': None,
+            'cache_file_mtime': None,
+            'updated_at': None
+        }
+
+    @classmethod
+    def load(cls, stats_file=CACHE_STATS_FILE):
+        """Carga el índice guardado (vacío si no existe o es de otra versión)"""
+        index = cls(stats_file)
+        if index.stats_file.exists():
+            try:
+                with open(index.stats_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == STATS_VERSION:
+                    index.data = data
+            except Exception as e:
+                print(f"⚠️ Error cargando estadísticas del caché: {e}")
+        return index
+
+    @classmethod
+    def load_for(cls, cache, cache_file=CACHE_FILE, stats_file=CACHE_STATS_FILE):
+        """Carga el índice y lo reconstruye si no corresponde al archivo de caché actual"""
+        index = cls.load(stats_file)
+        if not index.matches(cache_file):
+            index.rebuild(cache)
+            if Path(cache_file).exists():
+                index.save(cache_file)
+        return index
+
+    def matches(self, cache_file=CACHE_FILE):
+        """Verifica si el índice se guardó junto con la versión actual del caché"""
+        cache_file = Path(cache_file)
+        if not cache_file.exists():
+            return self.data['translation_entries'] == 0 and self.data['file_metadata_entries'] == 0
+        stat = cache_file.stat()
+        return (self.data['cache_file_size'] == stat.st_size and
+                self.data['cache_file_mtime'] == stat.st_mtime_ns)
+
+    def save(self, cache_file=CACHE_FILE):
+        """Guarda el índice asociándolo a la versión actual del archivo de caché"""
+        cache_file = Path(cache_file)
+        if cache_file.exists():
+            stat = cache_file.stat()
+            self.data['cache_file_size'] = stat.st_size
+            self.data['cache_file_mtime'] = stat.st_mtime_ns
+        self.data['updated_at'] = time.time()
+
+        self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.stats_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.stats_file)
+
+    def _bucket(self, group, name):
+        return self.data[group].setdefault(name or UNKNOWN, _empty_bucket())
+
+    def _touch_timestamp(self, timestamp):
+        if timestamp is None:
+            return
+        if self.data['oldest_entry'] is None or timestamp < self.data['oldest_entry']:
+            self.data['oldest_entry'] = timestamp
+        if self.data['newest_entry'] is None or timestamp > self.data['newest_entry']:
+            self.data['newest_entry'] = timestamp
+
+    def record_insert(self, key, value):
+        """Registra una entrada nueva del caché"""
+        if key.startswith('FILE_METADATA:'):
+            self.data['file_metadata_entries'] += 1
+            if isinstance(value, dict):
+                self._touch_timestamp(value.get('translated_at'))
+            return
+
+        self.data['translation_entries'] += 1
+        if not isinstance(value, dict):
+            self.data['legacy_entries'] += 1
+            self._bucket('languages', None)['entries'] += 1
+            self._bucket('manuals', None)['entries'] += 1
+            return
+
+        input_tokens = value.get('input_tokens', 0) or 0
+        output_tokens = value.get('output_tokens', 0) or 0
+        cost = value.get('cost', 0.0) or 0.0
+        # La primera traducción cuenta como uso 1; los usos extra son aciertos de caché
+        hits = max(0, (value.get('usage_count', 1) or 1) - 1)
+
+        self.data['input_tokens'] += input_tokens
+        self.data['output_tokens'] += output_tokens
+        self.data['cost'] += cost
+        self.data['hits'] += hits
+        self._touch_timestamp(value.get('timestamp'))
+
+        for group, name in (('languages', value.get('lang')), ('manuals', value.get('manual'))):
+            bucket = self._bucket(group, name)
+            bucket['entries'] += 1
+            bucket['hits'] += hits
+            bucket['input_tokens'] += input_tokens
+            bucket['output_tokens'] += output_tokens
+            bucket['cost'] += cost
+
+    def record_remove(self, key, value):
+        """
+        Descuenta una entrada eliminada del caché
+
+        Las fechas extremas no se recalculan: pueden quedar más amplias que el
+        caché real hasta la próxima reconstrucción completa.
+        """
+        if key.startswith('FILE_METADATA:'):
+            self.data['file_metadata_entries'] = max(0, self.data['file_metadata_entries'] - 1)
+            return
+
+        self.data['translation_entries'] = max(0, self.data['translation_entries'] - 1)
+        if not isinstance(value, dict):
+            self.data['legacy_entries'] = max(0, self.data['legacy_entries'] - 1)
+            self._bucket('languages', None)['entries'] -= 1
+            self._bucket('manuals', None)['entries'] -= 1
+            return
+
+        input_tokens = value.get('input_tokens', 0) or 0
+        output_tokens = value.get('output_tokens', 0) or 0
+        cost = value.get('cost', 0.0) or 0.0
+        hits = max(0, (value.get('usage_count', 1) or 1) - 1)
+
+        self.data['input_tokens'] -= input_tokens
+        self.data['output_tokens'] -= output_tokens
+        self.data['cost'] -= cost
+        self.data['hits'] -= hits
+
+        for group, name in (('languages', value.get('lang')), ('manuals', value.get('manual'))):
+            bucket = self._bucket(group, name)
+            bucket['entries'] -= 1
+            bucket['hits'] -= hits
+            bucket['input_tokens'] -= input_tokens
+            bucket['output_tokens'] -= output_tokens
+            bucket['cost'] -= cost
+
+    def record_hit(self, value, count=1):
+        """Registra un acierto de caché sobre una entrada existente"""
+        self.data['hits'] += count
+        if isinstance(value, dict):
+            self._bucket('languages', value.get('lang'))['hits'] += count
+            self._bucket('manuals', value.get('manual'))['hits'] += count
+        else:
+            self._bucket('languages', None)['hits'] += count
+            self._bucket('manuals', None)['hits'] += count
+
+    def rebuild(self, cache, language_codes=None):
+        """
+        Reconstruye el índice recorriendo el caché una vez
+
+        A las entradas antiguas sin idioma se les asigna el idioma exacto
+        recalculando su clave MD5 para cada idioma configurado.
+        """
+        if language_codes is None:
+            from languages_config import LANGUAGES
+            language_codes = list(LANGUAGES.keys())
+
+        start = time.time()
+        self.data = self._empty()
+        backfilled = 0
+
+        for key, value in cache.items():
+            if isinstance(value, dict) and not key.startswith('FILE_METADATA:') and 'lang' not in value:
+                lang = detect_entry_language(key, value, language_codes)
+                if lang:
+                    value['lang'] = lang
+                    backfilled += 1
+            self.record_insert(key, value)
+
+        print(f"📊 Índice de estadísticas reconstruido: {len(cache)} entradas en {time.time() - start:.1f}s"
+              + (f" ({backfilled} con idioma recuperado)" if backfilled else ""))
+        return backfilled
+
+    def summary(self):
+        """Retorna los contadores con el formato de HTMLTranslator.validate_cache()"""
+        languages = {name for name, bucket in self.data['languages'].items()
+                     if name != UNKNOWN and bucket['entries'] > 0}
+        return {
+            'total_entries': self.data['translation_entries'] + self.data['file_metadata_entries'],
+            'translation_entries': self.data['translation_entries'],
+            'file_metadata_entries': self.data['file_metadata_entries'],
+            'languages': languages,
+            'corrupted_entries': [],
+            'oldest_entry': self.data['oldest_entry'],
+            'newest_entry': self.data['newest_entry'],
+            # Cada traducción cuenta como un uso, más sus aciertos posteriores
+            'total_usage': self.data['translation_entries'] + self.data['hits'],
+            'total_cost': self.data['cost'],
+            'input_tokens': self.data['input_tokens'],
+            'output_tokens': self.data['output_tokens'],
+            'legacy_entries': self.data['legacy_entries'],
+            'by_language': {name: dict(bucket) for name, bucket in self.data['languages'].items()},
+            'by_manual': {name: dict(bucket) for name, bucket in self.data['manuals'].items()}
+        }
+
+
+def detect_entry_language(key, value, language_codes):
+    """Determina el idioma de una entrada comparando su clave con MD5(texto:idioma)"""
+    original = value.get('original')
+    if not original:
+        return None
+
+    protected, _ = protect_email_addresses(original)
+
+    for lang in language_codes:
+        if hashlib.md5(f"{protected}:{lang}".encode('utf-8')).hexdigest() == key:
+            return lang
+        if protected != original and hashlib.md5(f"{original}:{lang}".encode('utf-8')).hexdigest() == key:
+            return lang
+    return None
+
+
+def read_cache_stats(stats_file=CACHE_STATS_FILE, cache_file=CACHE_FILE):
+    """
+    Lee las estadísticas sin cargar el caché
+
+    Returns:
+        tuple: (resumen o None si no hay índice, bool índice al día)
+    """
+    index = CacheStatsIndex.load(stats_file)
+    if index.data.get('updated_at') is None:
+        return None, False
+    return index.summary(), index.matches(cache_file)
+
+
+def print_cache_stats_report(stats, up_to_date=True):
+    """Imprime un reporte del caché a partir del resumen del índice"""
+    from languages_config import get_language_display_name
+
+    print("📊 REPORTE DEL CACHÉ")
+    print("=" * 50)
+    print(f"📝 Total entradas: {stats['total_entries']}")
+    print(f"🔤 Traducciones: {stats['translation_entries']}")
+    print(f"📄 Metadata archivos: {stats['file_metadata_entries']}")
+    print(f"🌍 Idiomas: {', '.join(sorted(stats['languages'])) or 'Ninguno'}")
+    print(f"🔄 Uso total: {stats['total_usage']} reutilizaciones")
+    print(f"🧮 Tokens: {stats['input_tokens']:,} entrada / {stats['output_tokens']:,} salida")
+    print(f"💰 Costo acumulado: ${stats['total_cost']:.4f}")
+
+    if stats['oldest_entry']:
+        oldest_date = time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['oldest_entry']))
+        print(f"📅 Entrada más antigua: {oldest_date}")
+
+    if stats['newest_entry']:
+        newest_date = time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['newest_entry']))
+        print(f"📅 Entrada más reciente: {newest_date}")
+
+    if stats['legacy_entries']:
+        print(f"ℹ️ Entradas en formato antiguo (sin metadata): {stats['legacy_entries']}")
+
+    if stats['by_language']:
+        print("\n🌍 Por idioma:")
+        for lang, bucket in sorted(stats['by_language'].items(), key=lambda item: -item[1]['entries']):
+            if bucket['entries'] <= 0:
+                continue
+            name = get_language_display_name(lang) if lang != UNKNOWN else '❓ Desconocido'
+            print(f"   {name:<20} {bucket['entries']:>7} entradas | {bucket['hits']:>7} aciertos | ${bucket['cost']:.4f}")
+
+    if stats['by_manual']:
+        print("\n📚 Por manual:")
+        for manual, bucket in sorted(stats['by_manual'].items(), key=lambda item: -item[1]['entries']):
+            if bucket['entries'] <= 0:
+                continue
+            print(f"   {manual:<20} {bucket['entries']:>7} entradas | {bucket['hits']:>7} aciertos | ${bucket['cost']:.4f}")
+
+    # Análisis de eficiencia
+    if stats['translation_entries'] > 0:
+        avg_usage = stats['total_usage'] / stats['translation_entries']
+        print(f"\n📈 Eficiencia promedio: {avg_usage:.1f} reutilizaciones por traducción")
+
+        if avg_usage < 1.5:
+            print("⚠️ Baja reutilización del caché (< 1.5x)")
+        elif avg_usage > 3.0:
+            print("🎯 Excelente reutilización del caché (> 3.0x)")
+        else:
+            print("✅ Reutilización normal del caché")
+
+    if not up_to_date:
+        print("\n⚠️ El caché cambió desde la última actualización del índice;"
+              " se reconstruirá en la próxima traducción")
@@ -15,12 +15,19 @@ PROJECT_ROOT = BASE_DIR.parent
 sys.path.append(str(Path(__file__).parent))
 
 from languages_config import LANGUAGES
-from system_config import DOCX_CONFIG, get_manual_path
+from system_config import (DOCX_CONFIG, DOCX_PARALLEL_CONFIG, DOCX_SKELETON_CONFIG, DOCX_STREAM_CONFIG,
+                           DOCX_FRAGMENT_CACHE_CONFIG, DOCX_STYLES_CONFIG, IMAGE_INDEX_CONFIG, get_manual_path)
 from html_to_docx import (
     setup_enhanced_document, load_css_styles_from_spanish, get_all_html_files_structured,
     create_bookmark_mapping, process_html_file_with_real_links, create_title_page_and_index,
     DOCXLogger, DOCXProgressDisplay
 )
+from docx_fragments import FragmentMerger, iter_fragments
+from docx_fragment_cache import FragmentCache
+from docx_skeleton import DocxSkeleton, prune_unused_relationships
+from docx_stream import DocxStreamWriter
+from docx_styles import add_character_styles
+from image_index import get_image_index
 
 from docx import Document
 from docx.shared import Inches, Pt
@@ -761,6 +768,89 @@ td, th {
             section.left_margin = Inches(1.25)
             section.right_margin = Inches(1.25)
 
+    def process_html_files(self, doc, html_files, html_input_path, css_styles, bookmark_mapping, progress, logger,
+                           skeleton=None, stream=None):
+        """
+        Agrega al documento el contenido de los archivos HTML en orden del TOC
+
+        Con DOCX_PARALLEL_CONFIG cada archivo se convierte como fragmento en un pool de
+        procesos y los fragmentos se unen en orden; si no, se procesan uno a uno.
+        Con un esqueleto DOCX, las imágenes ya registradas se referencian sin embeberlas
+        y las nuevas se suman al esqueleto. Con stream, cada tema se escribe en el
+        DOCX de salida apenas se une. Con DOCX_FRAGMENT_CACHE_CONFIG solo se
+        convierten los temas que cambiaron desde la última conversión.
+
+        Returns:
+            int: Archivos procesados correctamente
+        """
+        processed_files = 0
+
+        if DOCX_PARALLEL_CONFIG['enabled']:
+            merger = FragmentMerger(doc)
+            pictures = skeleton.pictures if skeleton is not None else None
+            cache = None
+            if DOCX_FRAGMENT_CACHE_CONFIG['enabled']:
+                # Sin imágenes en el esqueleto los fragmentos no referencian sus rId; además su
+                # generación no se guarda hasta que se suma la primera imagen
+                generation = skeleton.generation if skeleton is not None and skeleton.pictures else None
+                cache = FragmentCache(html_input_path, css_styles, bookmark_mapping, generation)
+            fragments = iter_fragments(html_files, html_input_path, css_styles, bookmark_mapping,
+                                       pictures=pictures, cache=cache)
+            for i, fragment in enumerate(fragments):
+                progress.show_file_progress(i+1, len(html_files), fragment['name'])
+                try:
+                    merger.append(fragment)
+                except Exception as e:
+                    logger.log_step(f"ERROR_PROCESSING: {fragment['name']} - {str(e)}")
+                    continue
+
+                if fragment['success']:
+                    processed_files += 1
+                logger.log_file_processed(fragment['name'], fragment['success'])
+
+                # Salto de página entre archivos
+                if i < len(html_files) - 1:
+                    doc.add_page_break()
+                if stream is not None:
+                    stream.flush()
+
+            if cache is not None:
+                print(f"   🧩 Temas reutilizados: {cache.hits}, convertidos: {len(html_files) - cache.hits}")
+                logger.log_step(f"FRAGMENT_CACHE: {cache.hits} reused, {cache.stored} stored")
+            if skeleton is not None:
+                for key, (r_id, info) in merger.new_pictures.items():
+                    skeleton.register(key, r_id, info)
+                if skeleton.added:
+                    logger.log_step(f"DOCX_SKELETON: {skeleton.added} new images")
+                skeleton.save(doc)
+            return processed_files
+
+        bookmark_id_counter = 1
+
+        for i, html_file in enumerate(html_files):
+            try:
+                progress.show_file_progress(i+1, len(html_files), html_file.name)
+
+                success, bookmark_id_counter = process_html_file_with_real_links(
+                    doc, html_file, html_input_path, css_styles, bookmark_mapping, bookmark_id_counter
+                )
+
+                if success:
+                    processed_files += 1
+                    logger.log_file_processed(html_file.name, True)
+                else:
+                    logger.log_file_processed(html_file.name, False)
+
+                # Salto de página entre archivos
+                if i < len(html_files) - 1:
+                    doc.add_page_break()
+
+            except Exception as e:
+                logger.log_step(f"ERROR_PROCESSING: {html_file.name} - {str(e)}")
+                continue
+
+        return processed_files
+
     def convert_html_to_docx(self, lang_code, force_regenerate=False):
         """
         Convierte HTML de un idioma específico a DOCX
@@ -824,13 +914,19 @@ td, th {
 
             # Crear documento DOCX
             progress.show_step("Configurando documento")
-            doc = Document()
+            skeleton = None
+            if DOCX_PARALLEL_CONFIG['enabled'] and DOCX_SKELETON_CONFIG['enabled']:
+                skeleton = DocxSkeleton(self.manual_name)
+                logger.log_step(f"DOCX_SKELETON: {len(skeleton.pictures)} images")
+            doc = skeleton.new_document() if skeleton is not None else Document()
             self.setup_document_multilang(doc, lang_code)
             logger.log_step("DOCUMENT_SETUP: Complete")
 
             # Cargar estilos CSS
             progress.show_step("Cargando estilos CSS")
             css_styles = load_css_styles_from_spanish(manual_type_full)
+            if DOCX_STYLES_CONFIG['enabled']:
+                add_character_styles(doc, css_styles)
             logger.log_step(f"CSS_STYLES_LOADED: {len(css_styles)} classes")
 
             # Aplicar parche de traducciones antes de crear la página de título
@@ -848,31 +944,24 @@ td, th {
             bookmark_mapping = create_bookmark_mapping(html_files_structured)
             logger.log_step(f"BOOKMARKS_CREATED: {len(bookmark_mapping)} bookmarks")
 
-            # Procesar archivos HTML
-            processed_files = 0
-            bookmark_id_counter = 1
-
-            for i, html_file in enumerate(html_files_structured):
-                try:
-                    progress.show_file_progress(i+1, len(html_files_structured), html_file.name)
-
-                    success, bookmark_id_counter = process_html_file_with_real_links(
-                        doc, html_file, html_input_path, css_styles, bookmark_mapping, bookmark_id_counter
-                    )
+            # Indexar imágenes (dimensiones compartidas entre idiomas; antes de levantar el pool)
+            if IMAGE_INDEX_CONFIG['enabled']:
+                progress.show_step("Indexando imágenes")
+                image_index = get_image_index()
+                images_found, images_probed = image_index.scan(html_input_path)
+                image_index.save()
+                logger.log_step(f"IMAGE_INDEX: {images_found} images, {images_probed} probed")
 
-                    if success:
-                        processed_files += 1
-                        logger.log_file_processed(html_file.name, True)
-                    else:
-                        logger.log_file_processed(html_file.name, False)
-
-                    # Salto de página entre archivos
-                    if i < len(html_files_structured) - 1:
-                        doc.add_page_break()
+            # document.xml en streaming: la portada y el índice se escriben con el primer tema
+            stream = None
+            if DOCX_PARALLEL_CONFIG['enabled'] and DOCX_STREAM_CONFIG['enabled']:
+                stream = DocxStreamWriter(doc, output_file)
 
-                except Exception as e:
-                    logger.log_step(f"ERROR_PROCESSING: {html_file.name} - {str(e)}")
-                    continue
+            # Procesar archivos HTML
+            processed_files = self.process_html_files(
+                doc, html_files_structured, html_input_path, css_styles, bookmark_mapping, progress, logger,
+                skeleton, stream
+            )
 
             # Configurar pie de página
             progress.show_step("Configurando pie de página")
@@ -881,7 +970,17 @@ td, th {
 
             # Guardar documento
             progress.show_step("Guardando documento")
-            doc.save(str(output_file))
+            if stream is not None:
+                stream.flush()
+                if skeleton is not None:
+                    # Imágenes del esqueleto que este idioma no usa
+                    prune_unused_relationships(doc, used=stream.used)
+                stream.close()
+                logger.log_step(f"DOCX_STREAM: {stream.bytes_written} bytes in document.xml")
+            else:
+                if skeleton is not None:
+                    prune_unused_relationships(doc)
+                doc.save(str(output_file))
 
             # Obtener tamaño del archivo
             file_size = None
@@ -906,6 +1005,8 @@ td, th {
             error_msg = f"Error generando DOCX para {LANGUAGES[lang_code]['name']}: {str(e)}"
             if 'logger' in locals():
                 logger.log_step(f"DOCX_ERROR: {str(e)}")
+            if locals().get('stream') is not None:
+                stream.abort()
             print(f"❌ {error_msg}")
             return False, None, error_msg
 
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Caché de fragmentos DOCX por tema
+convert_html_to_docx(force_regenerate=True) reconvertía los ~200 temas de un
+manual aunque solo hubiera cambiado uno. Aquí se guarda el fragmento de cada
+tema (XML del cuerpo, enlaces externos e imágenes por referencia) y al regenerar
+solo se reconvierten los temas cuya clave cambió; el resto se lee del disco y se
+une igual que un fragmento recién armado.
+
+La clave combina:
+- el nombre y el md5 del HTML traducido y el tamaño/fecha de las imágenes que
+  referencia (el nombre define el bookmark del tema)
+- CONVERTER_VERSION y el md5 del código del conversor (html_to_docx y los
+  módulos que arman el XML), de modo que un cambio en el conversor invalida todo
+- los estilos CSS (y si se aplican como estilos de carácter), el mapeo de
+  bookmarks (depende del TOC), la configuración de optimización de imágenes y
+  la generación del esqueleto DOCX si tiene imágenes (los fragmentos
+  referencian sus rId)
+
+Las imágenes embebidas se guardan una sola vez por sha1, compartidas por todos
+los temas e idiomas.
+
+Archivos: CACHE_DIR/docx_fragments/<ab>/<clave>.json y media/<ab>/<sha1>.<ext>
+
+Uso:
+    python3 scripts/docx_fragment_cache.py stats
+    python3 scripts/docx_fragment_cache.py clear
+"""
+
+import sys
+import os
+import re
+import json
+import hashlib
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import DOCX_FRAGMENT_CACHE_CONFIG, DOCX_STYLES_CONFIG, IMAGE_OPTIMIZATION_CONFIG
+from asset_sync import file_digest
+
+# Cambiar al modificar el formato de las entradas o la conversión (invalida la caché)
+CONVERTER_VERSION = 1
+# Módulos cuyo código define el XML de un fragmento (y las imágenes que embebe)
+CONVERTER_MODULES = ('html_to_docx.py', 'docx_hyperlinks.py', 'docx_skeleton.py', 'docx_fragments.py', 'docx_styles.py',
+                     'image_index.py', 'image_optimizer.py')
+IMG_SRC = re.compile(r'<img\b[^>]*?\bsrc="([^"]+)"', re.IGNORECASE)
+
+
+def _converter_digest():
+    digest = hashlib.md5(str(CONVERTER_VERSION).encode('utf-8'))
+    scripts_dir = Path(__file__).parent
+    for name in CONVERTER_MODULES:
+        digest.update(file_digest(scripts_dir / name).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class FragmentCache:
+    """Fragmentos convertidos de los temas de un manual en un idioma"""
+
+    def __init__(self, base_path, css_styles, bookmark_mapping, skeleton_generation=None, cache_dir=None):
+        self.base_path = Path(base_path)
+        self.cache_dir = Path(cache_dir or DOCX_FRAGMENT_CACHE_CONFIG['cache_dir'])
+        self.media_dir = self.cache_dir / 'media'
+        self.hits = 0                    # Fragmentos leídos de la caché
+        self.stored = 0                  # Fragmentos convertidos y guardados
+
+        context = {
+            'converter': _converter_digest(),
+            'css': css_styles,
+            'character_styles': DOCX_STYLES_CONFIG['enabled'],
+            'bookmarks': bookmark_mapping,
+            'images': [IMAGE_OPTIMIZATION_CONFIG['enabled'], IMAGE_OPTIMIZATION_CONFIG['dpi'],
+                       IMAGE_OPTIMIZATION_CONFIG['jpeg_quality']],
+            'skeleton': skeleton_generation
+        }
+        self._context = hashlib.md5(json.dumps(context, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def key(self, html_file):
+        """Clave del fragmento de un tema (None si el HTML no se puede leer)"""
+        try:
+            with open(html_file, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        digest = hashlib.md5(self._context.encode('utf-8'))
+        # El nombre define el bookmark del tema: dos temas con el mismo HTML no comparten entrada
+        digest.update(Path(html_file).name.encode('utf-8') + b'\x00')
+        digest.update(content)
+        for src in IMG_SRC.findall(content.decode('utf-8', errors='replace')):
+            try:
+                file_stat = (self.base_path / src).stat()
+                digest.update(f"{src}:{file_stat.st_size}:{file_stat.st_mtime_ns}".encode('utf-8'))
+            except OSError:
+                digest.update(f"{src}:-".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _media_path(self, sha1, filename):
+        return self.media_dir / sha1[:2] / f"{sha1}{Path(filename).suffix.lower()}"
+
+    def has(self, key):
+        return key is not None and self._entry_path(key).exists()
+
+    def load(self, key):
+        """Fragmento guardado con la clave (mismo formato que build_fragment), o None"""
+        try:
+            with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            rels = {}
+            for r_id, (kind, target) in entry['rels'].items():
+                if kind == 'image':
+                    sha1, filename = target
+                    with open(self._media_path(sha1, filename), 'rb') as f:
+                        rels[r_id] = ('image', (f.read(), filename))
+                else:
+                    rels[r_id] = ('link', target)
+        except (OSError, ValueError, KeyError):
+            return None
+        self.hits += 1
+        return {'name': entry['name'], 'success': True, 'xml': entry['xml'].encode('utf-8'), 'rels': rels,
+                'pictures': {r_id: tuple(picture) for r_id, picture in entry['pictures'].items()}}
+
+    def store(self, key, fragment):
+        """Guarda un fragmento convertido correctamente"""
+        if key is None or not fragment['success']:
+            return
+        try:
+            rels = {}
+            for r_id, (kind, target) in fragment['rels'].items():
+                if kind == 'image':
+                    blob, filename = target
+                    sha1 = hashlib.sha1(blob).hexdigest()
+                    media_path = self._media_path(sha1, filename)
+                    if not media_path.exists():
+                        media_path.parent.mkdir(parents=True, exist_ok=True)
+                        tmp_media = media_path.with_name(f".{media_path.name}.{os.getpid()}")
+                        tmp_media.write_bytes(blob)
+                        os.replace(tmp_media, media_path)
+                    rels[r_id] = ('image', (sha1, filename))
+                else:
+                    rels[r_id] = ('link', target)
+
+            entry_path = self._entry_path(key)
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_entry = entry_path.with_name(f".{entry_path.name}.{os.getpid()}")
+            with open(tmp_entry, 'w', encoding='utf-8') as f:
+                # etree.tostring sin encoding produce ASCII (caracteres como referencias)
+                json.dump({'name': fragment['name'], 'xml': fragment['xml'].decode('utf-8'), 'rels': rels,
+                           'pictures': fragment.get('pictures', {})}, f, separators=(',', ':'))
+            os.replace(tmp_entry, entry_path)
+            self.stored += 1
+        except OSError as e:
+            print(f"      ⚠️ Error guardando fragmento de {fragment['name']}: {e}")
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+    import shutil
+
+    parser = argparse.ArgumentParser(description='Caché de fragmentos DOCX por tema')
+    parser.add_argument('action', choices=['stats', 'clear'], help='Acción a ejecutar')
+
+    args = parser.parse_args()
+    cache_dir = Path(DOCX_FRAGMENT_CACHE_CONFIG['cache_dir'])
+
+    if args.action == 'stats':
+        entries = media = size = 0
+        if cache_dir.exists():
+            for path in cache_dir.rglob('*'):
+                if not path.is_file():
+                    continue
+                size += path.stat().st_size
+                if path.is_relative_to(cache_dir / 'media'):
+                    media += 1
+                elif path.suffix == '.json':
+                    entries += 1
+        print(f"🧩 Fragmentos: {entries}, imágenes: {media}, {size / 1024 / 1024:.1f} MB en {cache_dir}")
+    elif args.action == 'clear':
+        if cache_dir.exists():
+            shutil.rmtree(cache_dir)
+        print(f"🗑️ Fragmentos eliminados de {cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
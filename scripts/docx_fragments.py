@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Construcción de las secciones del DOCX en paralelo
+Cada archivo HTML del manual se convierte en un documento propio (en un pool de
+procesos) y se exporta como fragmento: el XML del cuerpo más las imágenes y
+enlaces externos que referencia. El proceso principal une los fragmentos en el
+orden del TOC renumerando de forma determinista los rId de las relaciones, los
+id de los bookmarks y los id de las imágenes (wp:docPr).
+
+Además del paralelismo, cada fragmento se arma sobre un documento chico: python-docx
+busca imágenes repetidas comparando el sha1 con todas las ya agregadas, lo que en
+un documento de cientos de imágenes hace que cada add_picture sea más lento que
+el anterior. Al unir, las imágenes se registran con un índice por sha1. El
+documento vacío de cada proceso se reutiliza entre fragmentos (la plantilla de
+python-docx se lee una sola vez) y las imágenes del esqueleto DOCX
+(docx_skeleton) viajan como referencias, sin sus bytes.
+
+Uso:
+    python3 scripts/docx_fragments.py open_aula_back en   # compara secuencial vs fragmentos
+"""
+
+import sys
+import os
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from docx import Document
+from docx.image.image import Image
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.oxml.parser import parse_xml
+from docx.oxml.shared import qn
+from docx.parts.image import ImagePart
+from lxml import etree
+
+from system_config import DOCX_PARALLEL_CONFIG
+from html_to_docx import process_html_file_with_real_links
+from docx_skeleton import SKELETON_RID_PREFIX, set_skeleton_pictures, take_embedded_pictures
+
+# Atributos que referencian relaciones del document part
+RELATIONSHIP_ATTRIBUTES = (qn('r:id'), qn('r:embed'), qn('r:link'))
+BOOKMARK_TAGS = (qn('w:bookmarkStart'), qn('w:bookmarkEnd'))
+DOCPR_TAG = qn('wp:docPr')
+
+# Parámetros compartidos por los procesos del pool (se fijan en el inicializador)
+_worker_args = {}
+# Documento vacío del proceso, reutilizado por build_fragment
+_blank_document = None
+
+
+def _init_worker(base_path, css_styles, bookmark_mapping, pictures=None):
+    _worker_args.update(base_path=base_path, css_styles=css_styles, bookmark_mapping=bookmark_mapping)
+    set_skeleton_pictures(pictures)
+
+
+def _fragment_document():
+    """Documento vacío para armar un fragmento (el del fragmento anterior, con el cuerpo y las relaciones limpios)"""
+    global _blank_document
+    if _blank_document is None:
+        _blank_document = Document()
+        return _blank_document
+
+    body = _blank_document.element.body
+    for child in list(body):
+        if child.tag != qn('w:sectPr'):
+            body.remove(child)
+    rels = _blank_document.part.rels
+    for r_id in [r_id for r_id, rel in rels.items() if rel.reltype in (RT.IMAGE, RT.HYPERLINK)]:
+        del rels[r_id]
+    # Sin imágenes registradas los nombres en /word/media vuelven a empezar en image1
+    _blank_document.part.package.image_parts._image_parts.clear()
+    return _blank_document
+
+
+def build_fragment(html_file, base_path=None, css_styles=None, bookmark_mapping=None):
+    """
+    Convierte un archivo HTML en un fragmento de cuerpo DOCX independiente
+
+    Returns:
+        dict: name, success, xml (w:body sin sectPr), rels {rId: ('image', (blob, archivo)) | ('link', url)}
+              y pictures {rId: (clave, metadatos)} de las imágenes embebidas (con esqueleto DOCX)
+    """
+    if base_path is None:
+        base_path = _worker_args['base_path']
+        css_styles = _worker_args['css_styles']
+        bookmark_mapping = _worker_args['bookmark_mapping']
+
+    doc = _fragment_document()
+    try:
+        success, _ = process_html_file_with_real_links(doc, html_file, base_path, css_styles, bookmark_mapping, 1)
+    except Exception as e:
+        print(f"      ❌ Error procesando {html_file.name}: {e}")
+        success = False
+
+    body = doc.element.body
+    sect_pr = body.sectPr
+    if sect_pr is not None:
+        body.remove(sect_pr)
+    xml = etree.tostring(body)
+    if sect_pr is not None:
+        body.append(sect_pr)
+
+    rels = {}
+    for r_id, rel in doc.part.rels.items():
+        if rel.is_external:
+            if rel.reltype == RT.HYPERLINK:
+                rels[r_id] = ('link', rel.target_ref)
+        elif rel.reltype == RT.IMAGE:
+            # El nombre de archivo define la extensión del part en /word/media
+            rels[r_id] = ('image', (rel.target_part.blob, rel.target_part.filename))
+
+    return {'name': html_file.name, 'success': success, 'xml': xml, 'rels': rels,
+            'pictures': take_embedded_pictures()}
+
+
+def iter_fragments(html_files, base_path, css_styles, bookmark_mapping, workers=None, pictures=None, cache=None):
+    """
+    Genera los fragmentos en el orden de html_files
+
+    Args:
+        workers: Procesos del pool (None: DOCX_PARALLEL_CONFIG; 1: en el proceso actual)
+        pictures: Imágenes del esqueleto DOCX que se referencian sin embeber (None: sin esqueleto)
+        cache: FragmentCache; solo se convierten los temas sin fragmento guardado
+    """
+    if cache is None:
+        yield from _build_fragments(html_files, base_path, css_styles, bookmark_mapping, workers, pictures)
+        return
+
+    keys = [cache.key(html_file) for html_file in html_files]
+    pending = [html_file for html_file, key in zip(html_files, keys) if not cache.has(key)]
+    pending_names = {html_file.name for html_file in pending}
+    built = _build_fragments(pending, base_path, css_styles, bookmark_mapping, workers, pictures)
+
+    # Los guardados se leen recién al llegar a su turno (memoria acotada con streaming)
+    for html_file, key in zip(html_files, keys):
+        fragment = None if html_file.name in pending_names else cache.load(key)
+        if fragment is None:
+            if html_file.name in pending_names:
+                fragment = next(built)
+            else:
+                # Entrada ilegible: se convierte en este proceso
+                fragment = next(_build_fragments([html_file], base_path, css_styles, bookmark_mapping, 1, pictures))
+            cache.store(key, fragment)
+        yield fragment
+
+
+def _build_fragments(html_files, base_path, css_styles, bookmark_mapping, workers=None, pictures=None):
+    """Convierte los temas en un pool de procesos (o en este proceso) y los genera en orden"""
+    if workers is None:
+        workers = DOCX_PARALLEL_CONFIG['workers'] or os.cpu_count() or 1
+
+    done = 0
+    if workers > 1 and len(html_files) >= DOCX_PARALLEL_CONFIG['min_files']:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(base_path, css_styles, bookmark_mapping, pictures)) as executor:
+                for fragment in executor.map(build_fragment, html_files, chunksize=4):
+                    done += 1
+                    yield fragment
+            return
+        except (OSError, RuntimeError) as e:
+            # Sin soporte de procesos (o pool roto): el resto se arma en este proceso
+            print(f"      ⚠️ Pool de procesos no disponible ({e}), conversión secuencial")
+
+    previous_pictures = set_skeleton_pictures(pictures)
+    try:
+        for html_file in html_files[done:]:
+            yield build_fragment(html_file, base_path, css_styles, bookmark_mapping)
+    finally:
+        set_skeleton_pictures(previous_pictures)
+
+
+class FragmentMerger:
+    """
+    Une fragmentos al final del cuerpo de un documento, renumerando ids y relaciones
+
+    Las referencias al esqueleto ('@rIdN') ya apuntan a relaciones del documento y
+    solo se les quita el prefijo; new_pictures acumula {clave: (rId, metadatos)} de
+    las imágenes embebidas, para sumarlas al esqueleto.
+    """
+
+    def __init__(self, doc, bookmark_id=1):
+        self.doc = doc
+        self.new_pictures = {}
+        self.part = doc.part
+        self.body = doc.element.body
+        self.bookmark_id = bookmark_id
+        image_parts = self.part.package.image_parts
+        self._images = {image_part.sha1: image_part for image_part in image_parts}
+        self._image_number = max((image_part.partname.idx for image_part in image_parts), default=0)
+        self._docpr_id = max((int(value) for value in self.body.xpath('.//wp:docPr/@id')), default=0)
+
+    def _image_rid(self, blob, filename):
+        image = Image.from_blob(blob)
+        image_part = self._images.get(image.sha1)
+        if image_part is None:
+            self._image_number += 1
+            ext = os.path.splitext(filename)[1][1:] or image.ext
+            image_part = ImagePart(PackURI(f"/word/media/image{self._image_number}.{ext}"), image.content_type, blob, image)
+            self.part.package.image_parts.append(image_part)
+            self._images[image.sha1] = image_part
+        return self.part.relate_to(image_part, RT.IMAGE)
+
+    def append(self, fragment):
+        """Agrega el contenido de un fragmento antes del sectPr del documento"""
+        r_ids = {}
+        for r_id, (kind, target) in fragment['rels'].items():
+            if kind == 'image':
+                r_ids[r_id] = self._image_rid(*target)
+            else:
+                r_ids[r_id] = self.part.relate_to(target, RT.HYPERLINK, is_external=True)
+        for r_id, (key, info) in fragment.get('pictures', {}).items():
+            self.new_pictures.setdefault(key, (r_ids[r_id], info))
+
+        fragment_body = parse_xml(fragment['xml'])
+        bookmark_ids = {}
+        for element in fragment_body.iter():
+            if element.tag in BOOKMARK_TAGS:
+                old_id = element.get(qn('w:id'))
+                if old_id not in bookmark_ids:
+                    bookmark_ids[old_id] = str(self.bookmark_id)
+                    self.bookmark_id += 1
+                element.set(qn('w:id'), bookmark_ids[old_id])
+            elif element.tag == DOCPR_TAG:
+                self._docpr_id += 1
+                element.set('id', str(self._docpr_id))
+                element.set('name', f"Picture {self._docpr_id}")
+            for attribute in RELATIONSHIP_ATTRIBUTES:
+                value = element.get(attribute)
+                if value in r_ids:
+                    element.set(attribute, r_ids[value])
+                elif value is not None and value.startswith(SKELETON_RID_PREFIX):
+                    element.set(attribute, value[len(SKELETON_RID_PREFIX):])
+
+        sect_pr = self.body.sectPr
+        for child in list(fragment_body):
+            if sect_pr is not None:
+                sect_pr.addprevious(child)
+            else:
+                self.body.append(child)
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+    import contextlib
+    import io
+    from system_config import get_manual_path
+    from html_to_docx import get_all_html_files_structured, create_bookmark_mapping, load_css_styles_from_spanish
+
+    parser = argparse.ArgumentParser(description='Conversión DOCX por fragmentos en paralelo')
+    parser.add_argument('manual', help='Nombre del manual (ej: open_aula_back)')
+    parser.add_argument('lang', help='Código de idioma con HTML traducido (ej: en)')
+    parser.add_argument('--workers', type=int, help='Procesos del pool (por defecto, según la configuración)')
+
+    args = parser.parse_args()
+
+    html_path = get_manual_path(args.manual, args.lang, 'html')
+    if html_path is None or not html_path.exists():
+        print(f"❌ No existe HTML traducido de {args.manual} en {args.lang}")
+        sys.exit(1)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        html_files = get_all_html_files_structured(html_path)
+    bookmark_mapping = create_bookmark_mapping(html_files)
+    css_styles = load_css_styles_from_spanish(args.manual)
+
+    timings = {}
+    documents = {}
+    for label in ('secuencial', 'fragmentos'):
+        doc = Document()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if label == 'secuencial':
+                counter = 1
+                for html_file in html_files:
+                    _, counter = process_html_file_with_real_links(doc, html_file, html_path, css_styles,
+                                                                   bookmark_mapping, counter)
+            else:
+                merger = FragmentMerger(doc)
+                for fragment in iter_fragments(html_files, html_path, css_styles, bookmark_mapping, args.workers):
+                    merger.append(fragment)
+        timings[label] = time.perf_counter() - start
+        documents[label] = etree.tostring(doc.element.body)
+
+    print(f"📄 {args.manual} [{args.lang}]: {len(html_files)} archivos")
+    print(f"🐢 Secuencial: {timings['secuencial']:.2f}s")
+    print(f"🚀 Fragmentos: {timings['fragmentos']:.2f}s ({timings['secuencial'] / timings['fragmentos']:.1f}x)")
+    print("✅ XML del cuerpo idéntico" if documents['secuencial'] == documents['fragmentos'] else "❌ El XML del cuerpo difiere")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Hyperlinks del DOCX construidos como elementos
+Cada enlace interno, cada entrada del índice y cada enlace externo se armaba
+como string XML con un f-string y se parseaba con parse_xml. Además de lento,
+un texto con '&' o '<' producía XML inválido y el enlace terminaba como texto
+con formato en lugar de hyperlink. Aquí el hyperlink se arma una vez como
+plantilla y cada enlace es una copia con el destino y el texto asignados por
+lxml, que se encarga del escape.
+
+Uso:
+    python3 scripts/docx_hyperlinks.py benchmark open_aula_back
+"""
+
+import sys
+import time
+from copy import deepcopy
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from docx.oxml.shared import OxmlElement, qn
+
+# Color y subrayado de los enlaces (mismo formato que los hyperlinks XML anteriores)
+LINK_COLOR = '0000FF'
+
+
+def _hyperlink_template():
+    """<w:hyperlink><w:r><w:rPr>color + subrayado</w:rPr><w:t/></w:r></w:hyperlink>"""
+    hyperlink = OxmlElement('w:hyperlink')
+    run = OxmlElement('w:r')
+    run_properties = OxmlElement('w:rPr')
+    color = OxmlElement('w:color')
+    color.set(qn('w:val'), LINK_COLOR)
+    underline = OxmlElement('w:u')
+    underline.set(qn('w:val'), 'single')
+    run_properties.append(color)
+    run_properties.append(underline)
+    run.append(run_properties)
+    run.append(OxmlElement('w:t'))
+    hyperlink.append(run)
+    return hyperlink
+
+
+HYPERLINK_TEMPLATE = _hyperlink_template()
+
+
+def build_hyperlink(text, anchor=None, r_id=None):
+    """
+    Crea un elemento w:hyperlink
+
+    Args:
+        anchor: Bookmark destino (enlace interno)
+        r_id: Relación del enlace externo
+    """
+    hyperlink = deepcopy(HYPERLINK_TEMPLATE)
+    if anchor is not None:
+        hyperlink.set(qn('w:anchor'), anchor)
+    if r_id is not None:
+        hyperlink.set(qn('r:id'), r_id)
+    text_element = hyperlink[0][1]
+    text_element.text = text
+    # Los espacios de borde se conservan a propósito (separan el enlace del texto vecino)
+    if text != text.strip():
+        text_element.set(qn('xml:space'), 'preserve')
+    return hyperlink
+
+
+def run_benchmark(manual_type, rounds=3):
+    """Compara parse_xml por enlace contra la plantilla sobre los enlaces de un manual"""
+    import re
+    import json
+    from docx import Document
+    from docx.oxml.parser import parse_xml
+    from docx.oxml.ns import nsdecls
+    from system_config import get_manual_path
+    from html_backend import parse_html
+    from html_to_docx import clean_bookmark_name
+
+    html_dir = get_manual_path(manual_type) / 'html'
+    links = []
+    for html_file in sorted(html_dir.glob('*.html')):
+        with open(html_file, 'r', encoding='utf-8') as f:
+            soup = parse_html(f.read())
+        for link in soup.select('#topic-content a[href]'):
+            text = re.sub(r'\s+', ' ', link.get_text())
+            if text.strip() and link['href'].endswith('.html'):
+                links.append((text, clean_bookmark_name(link['href'])))
+    # Entradas del índice
+    with open(html_dir / '_toc.json', 'r', encoding='utf-8') as f:
+        for item in json.load(f):
+            href = item.get('a_attr', {}).get('href', '')
+            if item.get('text') and href:
+                links.append((item['text'], clean_bookmark_name(href)))
+    if not links:
+        print("❌ No se encontraron enlaces")
+        return False
+
+    def legacy(paragraph, text, bookmark_name):
+        hyperlink_xml = f'''
+        <w:hyperlink w:anchor="{bookmark_name}" {nsdecls('w')}>
+            <w:r>
+                <w:rPr>
+                    <w:color w:val="0000FF"/>
+                    <w:u w:val="single"/>
+                </w:rPr>
+                <w:t>{text}</w:t>
+            </w:r>
+        </w:hyperlink>
+        '''
+        paragraph.append(parse_xml(hyperlink_xml))
+
+    def current(paragraph, text, bookmark_name):
+        paragraph.append(build_hyperlink(text, anchor=bookmark_name))
+
+    timings = {}
+    failures = 0
+    for name, function in (('antes', legacy), ('después', current)):
+        best = None
+        for _ in range(rounds):
+            paragraph = Document().add_paragraph()._element
+            failures = 0
+            start = time.perf_counter()
+            for text, bookmark_name in links:
+                try:
+                    function(paragraph, text, bookmark_name)
+                except Exception:
+                    failures += 1
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = (best, failures)
+
+    print("⏱️ BENCHMARK DE HYPERLINKS DOCX")
+    print("=" * 50)
+    print(f"🔗 Enlaces: {len(links)}")
+    for name, (elapsed, failed) in timings.items():
+        print(f"   {name:<8} {elapsed * 1000:.1f} ms ({elapsed / len(links) * 1e6:.1f} µs por enlace), {failed} con XML inválido")
+    print(f"🚀 {timings['antes'][0] / timings['después'][0]:.1f}x")
+    return timings['después'][1] == 0
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Hyperlinks DOCX desde plantilla')
+    parser.add_argument('action', choices=['benchmark'], help='Acción a ejecutar')
+    parser.add_argument('manual', nargs='?', default='open_aula_back', help='Nombre del manual')
+
+    args = parser.parse_args()
+
+    if args.action == 'benchmark':
+        sys.exit(0 if run_benchmark(args.manual) else 1)
+
+
+if __name__ == "__main__":
+    main()
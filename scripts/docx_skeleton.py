@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Esqueleto DOCX por manual, reutilizado por todos los idiomas
+Estilos, márgenes, numeración y las imágenes son los mismos en los 12 idiomas
+de un manual; solo cambian los textos, la portada y el pie. El esqueleto es un
+DOCX sin contenido en el cuerpo que ya tiene registradas (con su rId) las
+imágenes usadas por conversiones anteriores, más un mapa de cada imagen a su
+rId y sus dimensiones. Cada idioma parte de ese paquete: los fragmentos
+(docx_fragments) insertan las imágenes conocidas como referencias al rId del
+esqueleto, sin leer el archivo ni copiar sus bytes entre procesos.
+
+Las imágenes nuevas se embeben como siempre y se agregan al esqueleto al
+terminar. Antes de guardar cada idioma se quitan las imágenes que el documento
+no usa, de modo que el DOCX no crece con las de otras versiones del manual.
+
+Archivos: CACHE_DIR/docx_skeletons/<manual>.docx y <manual>.json
+
+Uso:
+    python3 scripts/docx_skeleton.py stats
+    python3 scripts/docx_skeleton.py clear
+"""
+
+import sys
+import os
+import json
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.shape import CT_Inline
+from docx.oxml.shared import qn
+from docx.shared import Emu, Inches
+
+from system_config import DOCX_SKELETON_CONFIG
+
+# Cambiar al modificar el contenido del esqueleto (invalida los anteriores)
+SKELETON_VERSION = 1
+# Prefijo de los rId del esqueleto dentro de los fragmentos (FragmentMerger lo quita)
+SKELETON_RID_PREFIX = '@'
+
+# Referencias del proceso actual: imágenes del esqueleto y las embebidas por archivo
+# (None: conversión sin esqueleto, add_picture se comporta como run.add_picture)
+_skeleton_pictures = None
+_embedded_pictures = {}
+
+
+def picture_key(path):
+    """Clave de una imagen: directorio/nombre + tamaño + mtime (las copias de cada idioma conservan la fecha)"""
+    path = Path(path)
+    file_stat = path.stat()
+    return f"{path.parent.name}/{path.name}:{file_stat.st_size}:{file_stat.st_mtime_ns}"
+
+
+def set_skeleton_pictures(pictures):
+    """
+    Fija las imágenes del esqueleto que se pueden referenciar en este proceso (None: sin esqueleto)
+
+    Returns:
+        dict: Las imágenes fijadas antes (para restaurarlas)
+    """
+    global _skeleton_pictures
+    previous = _skeleton_pictures
+    _skeleton_pictures = pictures
+    _embedded_pictures.clear()
+    return previous
+
+
+def take_embedded_pictures():
+    """Imágenes embebidas por archivo desde la última llamada: {rId del fragmento: (clave, metadatos)}"""
+    pictures = dict(_embedded_pictures)
+    _embedded_pictures.clear()
+    return pictures
+
+
+def _scaled_extent(info, width=None, height=None):
+    """Mismo cálculo que python-docx (Image.scaled_dimensions) a partir de los metadatos"""
+    native_width = Inches(info['px_width'] / info['horz_dpi'])
+    native_height = Inches(info['px_height'] / info['vert_dpi'])
+    if width is None and height is None:
+        return native_width, native_height
+    if width is None:
+        width = round(native_width * (float(height) / float(native_height)))
+    if height is None:
+        height = round(native_height * (float(width) / float(native_width)))
+    return Emu(width), Emu(height)
+
+
+def add_picture(run, path, width=None, height=None):
+    """
+    Agrega una imagen al run: como referencia al esqueleto si ya está registrada,
+    o con run.add_picture (anotando la clave para sumarla al esqueleto)
+    """
+    if _skeleton_pictures is None:
+        run.add_picture(path, width=width, height=height)
+        return
+
+    key = picture_key(path)
+    info = _skeleton_pictures.get(key)
+    if info is not None:
+        cx, cy = _scaled_extent(info, width, height)
+        inline = CT_Inline.new_pic_inline(run.part.next_id, SKELETON_RID_PREFIX + info['rId'],
+                                          info['filename'], cx, cy)
+        run._r.add_drawing(inline)
+        return
+
+    inline_shape = run.add_picture(path, width=width, height=height)
+    r_id = inline_shape._inline.xpath('.//a:blip/@r:embed')[0]
+    image = run.part.related_parts[r_id].image
+    _embedded_pictures[r_id] = (key, {
+        'filename': image.filename,
+        'px_width': image.px_width,
+        'px_height': image.px_height,
+        'horz_dpi': image.horz_dpi,
+        'vert_dpi': image.vert_dpi
+    })
+
+
+class DocxSkeleton:
+    """Paquete base de un manual con las imágenes ya registradas"""
+
+    def __init__(self, manual_name, cache_dir=None):
+        self.manual_name = manual_name
+        cache_dir = Path(cache_dir or DOCX_SKELETON_CONFIG['cache_dir'])
+        self.docx_file = cache_dir / f"{manual_name}.docx"
+        self.map_file = cache_dir / f"{manual_name}.json"
+        self.pictures = {}           # {clave: {rId, filename, px_width, px_height, horz_dpi, vert_dpi}}
+        self.added = 0
+        # Cambia cuando el esqueleto se arma desde cero (los rId anteriores dejan de valer)
+        self.generation = os.urandom(8).hex()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.map_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == SKELETON_VERSION and self.docx_file.exists():
+            self.pictures = data.get('pictures', {})
+            self.generation = data.get('generation', self.generation)
+
+    def new_document(self):
+        """Documento base para un idioma (los enlaces externos del idioma que guardó el esqueleto se descartan)"""
+        if self.pictures:
+            try:
+                doc = Document(str(self.docx_file))
+            except Exception as e:
+                print(f"   ⚠️ Esqueleto DOCX ilegible ({e}), se arma desde cero")
+                self.pictures = {}
+                self.generation = os.urandom(8).hex()
+            else:
+                prune_unused_relationships(doc, (RT.HYPERLINK,))
+                return doc
+        return Document()
+
+    def register(self, key, r_id, info):
+        """Suma al esqueleto una imagen agregada al documento con r_id"""
+        if key not in self.pictures:
+            self.pictures[key] = dict(info, rId=r_id)
+            self.added += 1
+
+    def save(self, doc):
+        """
+        Guarda el esqueleto desde un documento recién armado (antes del pie de página)
+        El cuerpo se vacía solo mientras se guarda
+        """
+        if not self.added:
+            return
+        body = doc.element.body
+        children = [child for child in body if child.tag != qn('w:sectPr')]
+        for child in children:
+            body.remove(child)
+        try:
+            self.docx_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_docx = self.docx_file.with_suffix('.tmp')
+            doc.save(str(tmp_docx))
+            os.replace(tmp_docx, self.docx_file)
+            tmp_map = self.map_file.with_suffix('.tmp')
+            with open(tmp_map, 'w', encoding='utf-8') as f:
+                json.dump({'version': SKELETON_VERSION, 'generation': self.generation, 'pictures': self.pictures},
+                          f, separators=(',', ':'))
+            os.replace(tmp_map, self.map_file)
+            self.added = 0
+        except OSError as e:
+            print(f"   ⚠️ Error guardando esqueleto DOCX: {e}")
+        finally:
+            sect_pr = body.sectPr
+            for child in children:
+                if sect_pr is not None:
+                    sect_pr.addprevious(child)
+                else:
+                    body.append(child)
+
+
+def prune_unused_relationships(doc, reltypes=(RT.IMAGE, RT.HYPERLINK), used=None):
+    """
+    Quita las relaciones (imágenes y enlaces externos) que el cuerpo no referencia
+    Las imágenes sin relación no se escriben al guardar el DOCX
+
+    Args:
+        used: rId referenciados (None: se buscan en el cuerpo; con streaming el cuerpo ya se escribió)
+    """
+    if used is None:
+        body = doc.element.body
+        used = set(body.xpath('.//@r:embed')) | set(body.xpath('.//@r:id'))
+    rels = doc.part.rels
+    unused = [r_id for r_id, rel in rels.items() if rel.reltype in reltypes and r_id not in used]
+    for r_id in unused:
+        del rels[r_id]
+    return len(unused)
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+    import shutil
+
+    parser = argparse.ArgumentParser(description='Esqueletos DOCX por manual')
+    parser.add_argument('action', choices=['stats', 'clear'], help='Acción a ejecutar')
+
+    args = parser.parse_args()
+    cache_dir = Path(DOCX_SKELETON_CONFIG['cache_dir'])
+
+    if args.action == 'stats':
+        skeletons = sorted(cache_dir.glob('*.json')) if cache_dir.exists() else []
+        if not skeletons:
+            print("📦 No hay esqueletos DOCX")
+        for map_file in skeletons:
+            skeleton = DocxSkeleton(map_file.stem, cache_dir)
+            size = skeleton.docx_file.stat().st_size if skeleton.docx_file.exists() else 0
+            print(f"📦 {map_file.stem}: {len(skeleton.pictures)} imágenes, {size / 1024 / 1024:.1f} MB")
+    elif args.action == 'clear':
+        if cache_dir.exists():
+            shutil.rmtree(cache_dir)
+        print(f"🗑️ Esqueletos eliminados de {cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
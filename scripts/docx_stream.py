@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Escritura del DOCX en streaming
+python-docx mantiene en memoria el árbol lxml completo de word/document.xml (miles
+de párrafos, runs e hyperlinks) y lo serializa entero en doc.save. Aquí el
+document.xml se escribe en el zip a medida que se une cada tema: después de cada
+fragmento se serializan los elementos del cuerpo y se quitan del árbol, de modo
+que en memoria queda a lo sumo un tema. El sectPr se escribe al cerrar (incluye
+el pie de página) y el resto de las partes del paquete se escriben después,
+cuando ya se conocen todas las relaciones.
+
+Los bookmarks y los hyperlinks internos (add_heading_with_real_bookmark,
+create_real_internal_hyperlink) no cambian: los ids los renumera FragmentMerger
+con sus propios contadores y los enlaces apuntan al bookmark por nombre. Solo
+se usa con la conversión por fragmentos; en la secuencial python-docx numera las
+imágenes recorriendo el árbol completo.
+
+Uso:
+    python3 scripts/docx_stream.py measure open_aula_back en   # memoria pico árbol vs streaming
+"""
+
+import sys
+import os
+import re
+import zipfile
+from copy import deepcopy
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.pkgwriter import _ContentTypesItem
+from docx.oxml.shared import qn
+from lxml import etree
+
+# Declaraciones de namespace en el primer tag de un elemento serializado
+NAMESPACE_DECLARATION = re.compile(rb'\s+xmlns(?::([\w.-]+))?="([^"]*)"')
+RELATIONSHIP_XPATH = './/@r:id | .//@r:embed | .//@r:link'
+
+
+class DocxStreamWriter:
+    """Escribe word/document.xml en el zip de salida a medida que se vacía el cuerpo del documento"""
+
+    def __init__(self, doc, output_file):
+        self.doc = doc
+        self.output_file = Path(output_file)
+        self.tmp_file = self.output_file.with_name(f".{self.output_file.name}.tmp")
+        self.body = doc.element.body
+        self.used = set()                # rId referenciados por lo ya escrito
+        self.bytes_written = 0
+        self._root_namespaces = {(prefix or '').encode(): uri.encode() for prefix, uri in doc.element.nsmap.items()}
+
+        head, self._tail = self._document_shell()
+        self._zip = zipfile.ZipFile(self.tmp_file, 'w', zipfile.ZIP_DEFLATED)
+        self._stream = self._zip.open(doc.part.partname.membername, 'w')
+        self._write(head)
+
+    def _document_shell(self):
+        """Inicio y fin de document.xml (raíz con sus namespaces y w:body vacío)"""
+        root = self.doc.element
+        shell = etree.Element(root.tag, attrib=dict(root.attrib), nsmap=root.nsmap)
+        for child in root:
+            if child is not self.body:
+                shell.append(deepcopy(child))
+        etree.SubElement(shell, self.body.tag).text = ''
+        data = etree.tostring(shell, encoding='UTF-8', standalone=True)
+        closing = f'</{self.body.prefix}:body>'.encode()
+        head, tail = data.rsplit(closing, 1)
+        return head, closing + tail
+
+    def _write(self, data):
+        self._stream.write(data)
+        self.bytes_written += len(data)
+
+    def _serialize(self, element):
+        """Serializa un elemento del cuerpo sin repetir los namespaces ya declarados en la raíz"""
+        data = etree.tostring(element, encoding='UTF-8', xml_declaration=False)
+        end = data.index(b'>')  # lxml escapa '>' dentro de los atributos
+
+        def declaration(match):
+            if self._root_namespaces.get(match.group(1) or b'') == match.group(2):
+                return b''
+            return match.group(0)
+
+        return NAMESPACE_DECLARATION.sub(declaration, data[:end]) + data[end:]
+
+    def flush(self):
+        """Escribe y quita del árbol todo el cuerpo salvo el sectPr"""
+        for child in list(self.body):
+            if child.tag == qn('w:sectPr'):
+                continue
+            self.used.update(child.xpath(RELATIONSHIP_XPATH))
+            self._write(self._serialize(child))
+            self.body.remove(child)
+
+    def close(self):
+        """Cierra document.xml con el sectPr y escribe el resto del paquete"""
+        self.flush()
+        sect_pr = self.body.sectPr
+        if sect_pr is not None:
+            self._write(self._serialize(sect_pr))
+        self._write(self._tail)
+        self._stream.close()
+
+        # Mismo contenido que OpcPackage.save, con document.xml ya escrito
+        package = self.doc.part.package
+        for part in package.parts:
+            part.before_marshal()
+        parts = list(package.iter_parts())
+        self._zip.writestr(CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(parts).blob)
+        self._zip.writestr(PACKAGE_URI.rels_uri.membername, package.rels.xml)
+        for part in parts:
+            if part is not self.doc.part:
+                self._zip.writestr(part.partname.membername, part.blob)
+            if len(part.rels):
+                self._zip.writestr(part.partname.rels_uri.membername, part.rels.xml)
+        self._zip.close()
+        os.replace(self.tmp_file, self.output_file)
+
+    def abort(self):
+        """Descarta el archivo parcial (el DOCX anterior, si existía, queda intacto)"""
+        try:
+            self._stream.close()
+        except Exception:
+            pass
+        try:
+            self._zip.close()
+        except Exception:
+            pass
+        if self.tmp_file.exists():
+            self.tmp_file.unlink()
+
+
+def _convert_once(manual, lang, streaming):
+    """Convierte un idioma y devuelve la memoria pico del proceso en MB"""
+    import contextlib
+    import io
+    import resource
+    from system_config import DOCX_STREAM_CONFIG
+    from docx_converter import MultiLanguageDocxConverter
+
+    DOCX_STREAM_CONFIG['enabled'] = streaming
+    converter = MultiLanguageDocxConverter(manual)
+    with contextlib.redirect_stdout(io.StringIO()):
+        success, output_file, message = converter.convert_html_to_docx(lang, force_regenerate=True)
+    if not success:
+        print(f"❌ {message}", file=sys.stderr)
+        sys.exit(1)
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+    import subprocess
+
+    parser = argparse.ArgumentParser(description='Escritura del DOCX en streaming')
+    parser.add_argument('action', choices=['measure'], help='Acción a ejecutar')
+    parser.add_argument('manual', help='Nombre del manual (ej: open_aula_back)')
+    parser.add_argument('lang', nargs='?', default='en', help='Idioma con HTML traducido')
+    parser.add_argument('--single', choices=['tree', 'stream'], help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.single:
+        print(f"{_convert_once(args.manual, args.lang, args.single == 'stream'):.1f}")
+        return
+
+    # Cada modo en un proceso propio para que la memoria pico no se mezcle
+    print(f"📏 Memoria pico del proceso principal: {args.manual} [{args.lang}]")
+    for label, mode in (('árbol completo', 'tree'), ('streaming', 'stream')):
+        result = subprocess.run([sys.executable, __file__, 'measure', args.manual, args.lang, '--single', mode],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"   ❌ {label}: {result.stderr.strip()}")
+            sys.exit(1)
+        print(f"   {label:<15} {result.stdout.strip().splitlines()[-1]} MB")
+
+
+if __name__ == "__main__":
+    main()
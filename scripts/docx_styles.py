@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Estilos de carácter DOCX compilados desde las clases rvts del CSS
+Cada conversión volvía a parsear hnd.content.css con tres regex superpuestas y
+cada run recibía como formato directo la fuente, negrita, cursiva, subrayado y
+color de su clase. Aquí las clases se parsean una vez por digest del CSS (caché
+en disco) y se compilan en estilos de carácter de Word: un estilo base con la
+fuente del manual y uno por clase rvts basado en él. Cada run solo referencia
+el id del estilo (w:rStyle), de modo que document.xml es más chico y Word
+resuelve el formato una vez por estilo.
+
+Los estilos toman las mismas propiedades que aplicaba el formato directo
+(negrita, cursiva, subrayado y color). Los spans solo aparecen en párrafos con
+estilo Normal, así que la negrita/cursiva del estilo de carácter no se alterna
+con la del párrafo.
+
+Archivos: CACHE_DIR/docx_styles/<md5 del CSS>.json
+
+Uso:
+    python3 scripts/docx_styles.py show open_aula_back   # estilos compilados de un manual
+"""
+
+import sys
+import os
+import re
+import json
+import hashlib
+from copy import deepcopy
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from docx.oxml.shared import OxmlElement, qn
+from docx.shared import RGBColor
+
+from system_config import DOCX_STYLES_CONFIG
+from asset_sync import file_digest
+
+# Cambiar al modificar el parseo o las propiedades compiladas (invalida la caché)
+STYLES_VERSION = 1
+BASE_FONT = 'Calibri'
+BASE_STYLE_NAME = 'Texto manual'
+CLASS_STYLE_PREFIX = 'HND '
+# Regla de una clase span.rvtsN (el primer span del selector recibe las propiedades)
+RVTS_RULE = re.compile(r'span\.rvts(\d+)[^{]*\{([^}]+)\}')
+
+# Estilos compilados por digest de las clases (se arman una vez por proceso)
+_compiled_styles = {}
+
+
+def style_id(style_name):
+    """Id de estilo que Word (y python-docx) derivan del nombre"""
+    return style_name.replace(' ', '')
+
+
+BASE_STYLE_ID = style_id(BASE_STYLE_NAME)
+
+
+def class_style_id(class_name):
+    return style_id(CLASS_STYLE_PREFIX + class_name)
+
+
+def parse_rvts_styles(css_content):
+    """Parsear clases rvts del CSS"""
+    styles = {}
+    for match in RVTS_RULE.finditer(css_content):
+        style_props = {}
+        for rule in match.group(2).strip().split(';'):
+            if ':' in rule:
+                prop, value = rule.split(':', 1)
+                style_props[prop.strip()] = value.strip()
+        styles[f'rvts{match.group(1)}'] = style_props
+    return styles
+
+
+def parse_css_color(color_str):
+    """Convertir color CSS a RGBColor"""
+
+    color_str = color_str.strip().lower()
+
+    if color_str.startswith('#'):
+        try:
+            if len(color_str) == 7:
+                r = int(color_str[1:3], 16)
+                g = int(color_str[3:5], 16)
+                b = int(color_str[5:7], 16)
+                return RGBColor(r, g, b)
+        except:
+            pass
+
+    color_map = {
+        '#000000': RGBColor(0, 0, 0),
+        '#0000ff': RGBColor(0, 0, 255),
+        '#000080': RGBColor(0, 0, 128),
+        '#800000': RGBColor(128, 0, 0),
+        '#008000': RGBColor(0, 128, 0),
+        '#c0c0c0': RGBColor(192, 192, 192),
+        '#6666ff': RGBColor(102, 102, 255),
+    }
+
+    return color_map.get(color_str)
+
+
+def load_rvts_styles(css_file):
+    """Clases rvts de un CSS, parseadas una sola vez por contenido"""
+    digest = file_digest(css_file)
+    cache_file = Path(DOCX_STYLES_CONFIG['cache_dir']) / f"{digest}.json"
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == STYLES_VERSION:
+            return data['styles']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    with open(css_file, 'r', encoding='utf-8') as f:
+        styles = parse_rvts_styles(f.read())
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(f".{cache_file.name}.{os.getpid()}")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': STYLES_VERSION, 'styles': styles}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"   ⚠️ Error guardando estilos CSS compilados: {e}")
+    return styles
+
+
+def _character_style(name, run_properties, based_on=None):
+    """<w:style w:type="character"> con las propiedades de run en orden del esquema"""
+    style = OxmlElement('w:style')
+    style.set(qn('w:type'), 'character')
+    style.set(qn('w:customStyle'), '1')
+    style.set(qn('w:styleId'), style_id(name))
+    name_element = OxmlElement('w:name')
+    name_element.set(qn('w:val'), name)
+    style.append(name_element)
+    if based_on:
+        based_on_element = OxmlElement('w:basedOn')
+        based_on_element.set(qn('w:val'), style_id(based_on))
+        style.append(based_on_element)
+    rpr = OxmlElement('w:rPr')
+    for tag, attributes in run_properties:
+        element = OxmlElement(tag)
+        for attribute, value in attributes.items():
+            element.set(qn(attribute), value)
+        rpr.append(element)
+    style.append(rpr)
+    return style
+
+
+def compile_character_styles(css_styles):
+    """Estilo base + un estilo por clase rvts (mismas propiedades que apply_css_style_to_run)"""
+    digest = hashlib.md5(json.dumps(css_styles, sort_keys=True).encode('utf-8')).hexdigest()
+    if digest in _compiled_styles:
+        return _compiled_styles[digest]
+
+    styles = [_character_style(BASE_STYLE_NAME, [('w:rFonts', {'w:ascii': BASE_FONT, 'w:hAnsi': BASE_FONT})])]
+    for class_name, style_props in sorted(css_styles.items(), key=lambda item: int(item[0][4:])):
+        run_properties = []
+        if style_props.get('font-weight') == 'bold':
+            run_properties.append(('w:b', {}))
+        if style_props.get('font-style') == 'italic':
+            run_properties.append(('w:i', {}))
+        rgb_color = parse_css_color(style_props.get('color', '')) if style_props.get('color') else None
+        if rgb_color:
+            run_properties.append(('w:color', {'w:val': str(rgb_color)}))
+        if style_props.get('text-decoration') == 'underline':
+            run_properties.append(('w:u', {'w:val': 'single'}))
+        styles.append(_character_style(CLASS_STYLE_PREFIX + class_name, run_properties, based_on=BASE_STYLE_NAME))
+
+    _compiled_styles[digest] = styles
+    return styles
+
+
+def add_character_styles(doc, css_styles):
+    """Agrega (o actualiza) los estilos de carácter del manual en el documento"""
+    styles_element = doc.styles.element
+    for style in compile_character_styles(css_styles):
+        existing = styles_element.get_by_id(style.get(qn('w:styleId')))
+        if existing is not None:
+            styles_element.remove(existing)
+        styles_element.append(deepcopy(style))
+
+
+def set_run_style(run, run_style_id):
+    """Referencia un estilo de carácter desde el run (w:rStyle)"""
+    run._r.get_or_add_rPr().style = run_style_id
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+    from lxml import etree
+    from system_config import get_manual_path
+
+    parser = argparse.ArgumentParser(description='Estilos de carácter DOCX desde el CSS')
+    parser.add_argument('action', choices=['show'], help='Acción a ejecutar')
+    parser.add_argument('manual', help='Nombre del manual (ej: open_aula_back)')
+
+    args = parser.parse_args()
+
+    css_file = get_manual_path(args.manual) / 'html' / 'css' / 'hnd.content.css'
+    if not css_file.exists():
+        print(f"❌ No existe {css_file}")
+        sys.exit(1)
+
+    css_styles = load_rvts_styles(css_file)
+    styles = compile_character_styles(css_styles)
+    print(f"🎨 {args.manual}: {len(css_styles)} clases rvts → {len(styles)} estilos de carácter")
+    for style in styles:
+        rpr = style.find(qn('w:rPr'))
+        properties = ' '.join(etree.QName(child).localname + (f"={child.get(qn('w:val'))}" if child.get(qn('w:val')) else '')
+                              for child in rpr if child.tag != qn('w:rFonts'))
+        print(f"   {style.get(qn('w:styleId')):<14} {properties}")
+
+
+if __name__ == "__main__":
+    main()
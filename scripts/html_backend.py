@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Backend de parseo y serialización HTML
+Permite elegir el constructor de árbol de BeautifulSoup: 'lxml' (C, más rápido)
+o 'html.parser' (Python puro, sin dependencias)
+
+Todo el código que manipula los documentos (fix_html_attributes, fix_pdf_links,
+html_to_docx) sigue trabajando sobre la API de BeautifulSoup; solo cambia el parser.
+
+Uso:
+    python3 scripts/html_backend.py benchmark              # tiempos por manual y backend
+    python3 scripts/html_backend.py check                  # verifica extracción y round-trip
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import ORIGINAL_DIR, HTML_BACKEND_CONFIG
+
+BACKENDS = ('lxml', 'html.parser')
+
+_warned_fallback = False
+
+
+def lxml_available():
+    """Indica si lxml está instalado"""
+    try:
+        import lxml  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_backend(name=None):
+    """Retorna el parser a usar (el configurado si no se indica otro), con fallback a html.parser"""
+    global _warned_fallback
+
+    name = name or HTML_BACKEND_CONFIG['parser']
+    if name not in BACKENDS:
+        raise ValueError(f"Backend HTML desconocido: {name} (opciones: {', '.join(BACKENDS)})")
+
+    if name == 'lxml' and not lxml_available():
+        if not _warned_fallback:
+            print("⚠️ lxml no está instalado, se usa html.parser (pip install lxml)")
+            _warned_fallback = True
+        return 'html.parser'
+    return name
+
+
+def parse_html(content, backend=None):
+    """Parsea un documento o fragmento HTML con el backend configurado"""
+    return BeautifulSoup(content, get_backend(backend))
+
+
+def serialize_html(soup, pretty=True):
+    """Serializa el árbol (prettify() como hasta ahora, o compacto)"""
+    if pretty:
+        return soup.prettify()
+    return str(soup)
+
+
+def _manual_files():
+    """Archivos HTML de cada manual original: {manual: [archivos]}"""
+    manuals = {}
+    for html_dir in sorted(ORIGINAL_DIR.glob('*_es/html')):
+        files = sorted(html_dir.glob('*.html'))
+        if files:
+            manuals[html_dir.parent.name] = files
+    return manuals
+
+
+def _extraction_signature(soup):
+    """Extracción de elementos traducibles reducida a (tipo, texto), igual a HTMLTranslator"""
+    from html_translator import HTMLTranslator
+    return [(element['type'], element['text'])
+            for element in HTMLTranslator.extract_translatable_elements(None, soup)]
+
+
+def run_benchmark(backends=BACKENDS):
+    """Mide parseo y serialización por manual para cada backend"""
+    print("⏱️ BENCHMARK DE BACKENDS HTML")
+    print("=" * 70)
+    print(f"{'Manual':<22} {'Backend':<12} {'Archivos':>8} {'Parseo':>10} {'prettify':>10} {'str':>10}")
+
+    for manual, files in _manual_files().items():
+        contents = [f.read_text(encoding='utf-8') for f in files]
+        for backend in backends:
+            if get_backend(backend) != backend:
+                continue
+            parse_time = pretty_time = plain_time = 0.0
+            for content in contents:
+                start = time.perf_counter()
+                soup = parse_html(content, backend)
+                parse_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                serialize_html(soup, pretty=True)
+                pretty_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                serialize_html(soup, pretty=False)
+                plain_time += time.perf_counter() - start
+
+            print(f"{manual:<22} {backend:<12} {len(files):>8} {parse_time:>9.2f}s {pretty_time:>9.2f}s {plain_time:>9.2f}s")
+
+
+def run_check(backend='lxml'):
+    """
+    Verifica que el backend extraiga lo mismo que html.parser y que el HTML
+    serializado vuelva a dar la misma extracción (round-trip)
+    """
+    backend = get_backend(backend)
+    total = 0
+    problems = []
+
+    for manual, files in _manual_files().items():
+        for html_file in files:
+            content = html_file.read_text(encoding='utf-8')
+            total += 1
+
+            reference = _extraction_signature(parse_html(content, 'html.parser'))
+            soup = parse_html(content, backend)
+            if _extraction_signature(soup) != reference:
+                problems.append(f"{manual}/{html_file.name}: extracción distinta a html.parser")
+                continue
+
+            reparsed = parse_html(serialize_html(soup), backend)
+            if _extraction_signature(reparsed) != reference:
+                problems.append(f"{manual}/{html_file.name}: round-trip altera la extracción")
+
+    print(f"🔍 Backend '{backend}': {total} archivos verificados")
+    if problems:
+        print(f"❌ {len(problems)} problemas:")
+        for problem in problems[:10]:
+            print(f"   - {problem}")
+        return False
+    print("✅ Extracción idéntica a html.parser y round-trip correcto")
+    return True
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Backend de parseo HTML')
+    parser.add_argument('action', choices=['benchmark', 'check'], help='Acción a ejecutar')
+    parser.add_argument('--backend', default='lxml', choices=BACKENDS, help='Backend a verificar (check)')
+
+    args = parser.parse_args()
+
+    if args.action == 'benchmark':
+        run_benchmark()
+    elif args.action == 'check':
+        sys.exit(0 if run_check(args.backend) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,677 @@
+#!/usr/bin/env python3
+"""
+Renderizado por empalme (splice) de documentos HTML traducidos
+Registra la posición en el archivo fuente de cada texto y atributo traducible
+y escribe la salida reemplazando solo esos tramos; el resto del documento se
+copia tal cual (sin re-indentar ni re-serializar el árbol)
+
+Las posiciones son índices de caracteres sobre el texto decodificado del archivo,
+que se vuelve a escribir con la misma codificación.
+
+El mismo recorrido sirve para planificar sin construir ningún árbol:
+iter_segments() lee el archivo por bloques y entrega los segmentos a medida
+que el tokenizador los encuentra.
+
+Con blocks=True los elementos de bloque (p, li, td, títulos) cuyo contenido es
+texto con etiquetas en línea se entregan como un solo segmento 'block', con las
+etiquetas reemplazadas por marcadores numerados:
+    <p><span class="rvts6">Se seleccionan</span><span class="rvts15"> las aulas</span></p>
+    → "<1>Se seleccionan</1><2> las aulas</2>"
+Al empalmar la traducción cada marcador vuelve a ser la etiqueta original; si
+falta o sobra alguno, el bloque se traduce por partes (sus segmentos de texto).
+
+Uso:
+    python3 scripts/html_splice.py check       # verifica contra la extracción de BeautifulSoup
+    python3 scripts/html_splice.py benchmark   # compara con soup.prettify()
+"""
+
+import sys
+import re
+import time
+from bisect import bisect_left
+from html import escape, unescape
+from html.parser import HTMLParser, tagfind_tolerant, attrfind_tolerant
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+# Atributos traducibles (mismos que HTMLTranslator.extract_translatable_elements)
+TRANSLATABLE_ATTRIBUTES = ('alt', 'title')
+SKIP_CONTENT_TAGS = ('script', 'style')
+# Región con el contenido propio de cada página de tema (lo demás es el marco común)
+CONTENT_REGION_ID = 'topic-content'
+
+# Segmentación por bloques: elementos que forman una unidad y etiquetas en línea que admiten
+BLOCK_TAGS = ('p', 'li', 'td', 'th', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'dt', 'dd', 'caption')
+INLINE_TAGS = ('span', 'a', 'b', 'strong', 'i', 'em', 'u', 's', 'sub', 'sup', 'font', 'code',
+               'small', 'big', 'br', 'img', 'wbr')
+VOID_TAGS = ('br', 'img', 'wbr')
+PLACEHOLDER = re.compile(r'<(/?)(\d+)(/?)>')
+COLLAPSE_SPACE = re.compile(r'[ \t\n\r\f]+')
+
+NEWLINE = re.compile('\n')
+LEADING_SPACE = re.compile(r'(?:\s|&(?:nbsp|#160|#xa0|#xA0);)+')
+TRAILING_SPACE = re.compile(r'(?:\s|&(?:nbsp|#160|#xa0|#xA0);)+$')
+
+
+def _split_edges(raw, text):
+    """
+    Separa el espacio en blanco de los bordes del texto crudo, para conservarlo
+    al reemplazar el contenido (incluye &nbsp;, que str.strip() también elimina)
+    """
+    match = LEADING_SPACE.match(raw)
+    prefix = match.group() if match else ''
+    match = TRAILING_SPACE.search(raw, len(prefix))
+    suffix = match.group() if match else ''
+    if unescape(raw[len(prefix):len(raw) - len(suffix)]) != text:
+        # Espacio de bordes escrito de otra forma: reemplazar el tramo completo
+        return '', ''
+    return prefix, suffix
+
+
+def restore_placeholders(segment, translated):
+    """
+    Reconstruye el contenido de un bloque a partir de su traducción con marcadores
+
+    Returns:
+        list: Piezas (texto escapado o (start, end) de una etiqueta original),
+              o None si los marcadores no coinciden con los del original
+    """
+    tags = segment['tags']
+    pieces = []
+    seen = set()
+    open_numbers = []
+    position = 0
+    for match in PLACEHOLDER.finditer(translated):
+        token = match.group()
+        if token not in tags or token in seen:
+            return None
+        seen.add(token)
+        closing, number, void = match.groups()
+        if closing:
+            if not open_numbers or open_numbers.pop() != number:
+                return None
+        elif not void:
+            open_numbers.append(number)
+        pieces.append(escape(translated[position:match.start()], quote=False))
+        pieces.append(tags[token])
+        position = match.end()
+    if open_numbers or len(seen) != len(tags):
+        return None
+    pieces.append(escape(translated[position:], quote=False))
+    return pieces
+
+
+class SegmentRecorder(HTMLParser):
+    """
+    Parser que registra los segmentos traducibles con su posición en la fuente
+
+    Segmentos (dicts, como los elementos de extract_translatable_elements):
+        {'type': 'text', 'text', 'start', 'end', 'in_content'}
+        {'type': 'alt'|'title', 'text', 'start', 'end', 'in_content', 'tag'}
+        {'type': 'block', 'text', 'start', 'end', 'in_content', 'tags', 'parts'}
+    Para atributos, start/end abarcan el valor con sus comillas. 'in_content'
+    indica si el segmento está dentro de div#topic-content. En los bloques,
+    start/end abarcan el contenido del elemento, 'tags' da la posición de la
+    etiqueta de cada marcador y 'parts' los segmentos de texto del bloque.
+    """
+
+    def __init__(self, blocks=False):
+        super().__init__(convert_charrefs=True)
+        self.blocks = blocks
+        self.segments = []            # Segmentos completos aún no consumidos
+        self.html_lang = None         # (start, end, valor) del atributo lang del primer <html>
+        self.link_attributes = []     # (start, end, valor, etiqueta) de a[href] y meta refresh[content]
+        self.script_blocks = []       # (start, end) del contenido de cada <script>
+        self._line_starts = [0]
+        self._fed = 0
+        self._skip_tag = None
+        self._run_start = None
+        self._run_parts = []
+        self._seen_html = False
+        self._content_depth = None    # Nivel de <div> dentro de la región de contenido
+        self._content_done = False
+        self._frames = []             # Bloques abiertos (segmentación por bloques)
+
+    def record(self, source):
+        """Parsea el documento completo y retorna los segmentos"""
+        self.feed(source)
+        self.close()
+        return self.segments
+
+    def feed(self, data):
+        """Alimenta un bloque de texto (las posiciones siguen siendo absolutas)"""
+        base = self._fed
+        self._line_starts.extend(base + match.end() for match in NEWLINE.finditer(data))
+        self._fed += len(data)
+        super().feed(data)
+
+    def _position(self):
+        line, column = self.getpos()
+        return self._line_starts[line - 1] + column
+
+    # --- Texto ---
+
+    def handle_data(self, data):
+        if self._run_start is None:
+            self._run_start = self._position()
+        self._run_parts.append(data)
+
+    def _flush_text(self, end=None):
+        """Cierra la corrida de texto actual (los datos consecutivos forman un solo nodo)"""
+        if self._run_start is None:
+            return
+        start = self._run_start
+        end = self._position() if end is None else end
+        data = ''.join(self._run_parts)
+        self._run_start = None
+        self._run_parts = []
+
+        if self._skip_tag == 'script':
+            self.script_blocks.append((start, end))
+        if self._skip_tag is not None:
+            return
+
+        if self._frames:
+            self._frames[-1]['tokens'].append(data)
+
+        text = data.strip()
+        if text and len(text) > 2:
+            self._emit({
+                'type': 'text',
+                'text': text,
+                'start': start,
+                'end': end,
+                'in_content': self._content_depth is not None
+            })
+
+    def _emit(self, segment):
+        """Entrega un segmento de texto (dentro de un bloque queda como parte del bloque)"""
+        if self._frames:
+            self._frames[-1]['parts'].append(segment)
+        else:
+            self.segments.append(segment)
+
+    # --- Bloques ---
+
+    def _open_block(self, tag, inner_start):
+        if self._frames:
+            # Un bloque que contiene otro no es una unidad: su texto se traduce por partes
+            self._frames[-1]['ok'] = False
+        self._frames.append({
+            'tag': tag,
+            'start': inner_start,
+            'in_content': self._content_depth is not None,
+            'tokens': [],
+            'tags': {},
+            'open': [],
+            'parts': [],
+            'ok': True
+        })
+
+    def _inline_tag(self, tag, span, closing=False, void=False):
+        """Registra una etiqueta en línea del bloque actual como marcador"""
+        frame = self._frames[-1]
+        if closing:
+            number = frame['open'].pop()[0]
+            token = f"</{number}>"
+        else:
+            number = sum(1 for token in frame['tags'] if not token.startswith('</')) + 1
+            token = f"<{number}/>" if void else f"<{number}>"
+            if not void:
+                frame['open'].append((number, tag))
+        frame['tags'][token] = span
+        frame['tokens'].append(token)
+
+    def _close_block(self, end):
+        """Cierra el bloque actual: segmento 'block' o, si no es una unidad, sus partes"""
+        frame = self._frames.pop()
+        texts = [token for token in frame['tokens'] if not PLACEHOLDER.fullmatch(token) and token.strip()]
+        text = COLLAPSE_SPACE.sub(' ', ''.join(frame['tokens'])).strip(' ')
+
+        if frame['ok'] and not frame['open'] and frame['tags'] and len(texts) >= 2 and len(text) > 2:
+            self._emit({
+                'type': 'block',
+                'text': text,
+                'start': frame['start'],
+                'end': end,
+                'in_content': frame['in_content'],
+                'tags': frame['tags'],
+                'parts': frame['parts']
+            })
+        else:
+            for part in frame['parts']:
+                self._emit(part)
+
+    def _block_starttag(self, tag, void=False):
+        start = self._position()
+        end = start + len(self.get_starttag_text())
+        if tag in BLOCK_TAGS and not void:
+            self._open_block(tag, end)
+        elif self._frames:
+            if tag in INLINE_TAGS:
+                self._inline_tag(tag, (start, end), void=void or tag in VOID_TAGS)
+            else:
+                self._frames[-1]['ok'] = False
+
+    def _block_endtag(self, tag):
+        frame = self._frames[-1]
+        start = self._position()
+        if tag == frame['tag']:
+            self._close_block(start)
+        elif frame['open'] and frame['open'][-1][1] == tag:
+            local = start - (self._fed - len(self.rawdata))
+            end = self.rawdata.find('>', local) + 1
+            self._inline_tag(tag, (start, start + (end - local)), closing=True)
+        else:
+            # Cierre implícito o etiqueta fuera de lugar: se traduce por partes
+            frame['ok'] = False
+            if tag in BLOCK_TAGS and any(open_frame['tag'] == tag for open_frame in self._frames):
+                while self._frames[-1]['tag'] != tag:
+                    self._close_block(start)
+                self._close_block(start)
+
+    # --- Etiquetas ---
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag == 'div':
+            self._enter_div(attrs)
+        if self.blocks and self._skip_tag is None:
+            self._block_starttag(tag)
+        self._record_attributes(tag, attrs)
+        if tag in SKIP_CONTENT_TAGS:
+            self._skip_tag = tag
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_text()
+        if self.blocks and self._skip_tag is None:
+            self._block_starttag(tag, void=True)
+        self._record_attributes(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag == self._skip_tag:
+            self._skip_tag = None
+        elif self._frames and self._skip_tag is None:
+            self._block_endtag(tag)
+        if tag == 'div' and self._content_depth is not None:
+            self._content_depth -= 1
+            if self._content_depth == 0:
+                self._content_depth = None
+                self._content_done = True
+
+    def _enter_div(self, attrs):
+        if self._content_depth is not None:
+            self._content_depth += 1
+        elif not self._content_done and ('id', CONTENT_REGION_ID) in attrs:
+            self._content_depth = 1
+
+    def handle_comment(self, data):
+        self._flush_text()
+        if self._frames:
+            self._frames[-1]['ok'] = False
+
+    def handle_decl(self, decl):
+        # <!DOCTYPE html> no es texto traducible
+        self._flush_text()
+
+    def handle_pi(self, data):
+        self._flush_text()
+
+    def unknown_decl(self, data):
+        self._flush_text()
+
+    def close(self):
+        super().close()
+        self._flush_text(end=self._fed)
+        while self._frames:
+            self._frames[-1]['ok'] = False
+            self._close_block(self._fed)
+
+    def _attribute_spans(self, tag_start):
+        """Posición de los valores de atributos en la etiqueta cruda: {nombre: (start, end)}"""
+        raw = self.get_starttag_text()
+        spans = {}
+        match = tagfind_tolerant.match(raw, 1)
+        position = match.end() if match else len(raw)
+        while position < len(raw):
+            match = attrfind_tolerant.match(raw, position)
+            if not match or match.end() == position:
+                break
+            if match.group(3) is not None:
+                start, end = match.span(3)
+                # El último atributo repetido gana (igual que BeautifulSoup)
+                spans[match.group(1).lower()] = (tag_start + start, tag_start + end)
+            position = match.end()
+        return spans
+
+    def _record_attributes(self, tag, attrs):
+        values = dict(attrs)
+        wanted = [name for name in TRANSLATABLE_ATTRIBUTES if values.get(name)]
+        is_html = tag == 'html' and not self._seen_html
+        is_link = tag == 'a' and values.get('href')
+        is_refresh = (tag == 'meta' and values.get('http-equiv') == 'refresh'
+                      and values.get('content') is not None)
+        if tag == 'html':
+            self._seen_html = True
+        if not (wanted or is_html or is_link or is_refresh):
+            return
+
+        spans = self._attribute_spans(self._position())
+
+        for name in wanted:
+            if name in spans:
+                start, end = spans[name]
+                self.segments.append({
+                    'type': name,
+                    'text': values[name],
+                    'start': start,
+                    'end': end,
+                    'in_content': self._content_depth is not None,
+                    'tag': tag
+                })
+        if is_html and 'lang' in spans:
+            self.html_lang = spans['lang'] + (values['lang'],)
+        if is_link and 'href' in spans:
+            self.link_attributes.append(spans['href'] + (values['href'], tag))
+        if is_refresh and 'content' in spans:
+            self.link_attributes.append(spans['content'] + (values['content'], tag))
+
+
+def iter_segments(source=None, path=None, chunk_size=64 * 1024, blocks=False):
+    """
+    Genera los segmentos traducibles en orden de documento, en una sola pasada
+
+    Args:
+        source: Texto HTML completo, o
+        path: Archivo a leer por bloques (no se carga entero en memoria)
+        chunk_size: Tamaño de bloque en caracteres
+        blocks: Agrupar el contenido de p, li, td... en segmentos 'block'
+
+    Yields:
+        dict: Segmento {'type', 'text', 'start', 'end', ...}
+    """
+    recorder = SegmentRecorder(blocks)
+
+    if path is not None:
+        with open(path, 'r', encoding='utf-8') as f:
+            for chunk in iter(lambda: f.read(chunk_size), ''):
+                recorder.feed(chunk)
+                yield from recorder.segments
+                recorder.segments.clear()
+    else:
+        for offset in range(0, len(source), chunk_size):
+            recorder.feed(source[offset:offset + chunk_size])
+            yield from recorder.segments
+            recorder.segments.clear()
+
+    recorder.close()
+    yield from recorder.segments
+    recorder.segments.clear()
+
+
+class SplicedDocument:
+    """Documento fuente más los reemplazos a empalmar al renderizar"""
+
+    def __init__(self, source, blocks=False, parsed=None):
+        self.source = source
+        if parsed is None:
+            recorder = SegmentRecorder(blocks)
+            parsed = {
+                'segments': recorder.record(source),
+                'html_lang': recorder.html_lang,
+                'link_attributes': recorder.link_attributes,
+                'script_blocks': recorder.script_blocks
+            }
+        self.segments = parsed['segments']
+        self.html_lang = parsed['html_lang']
+        self.link_attributes = parsed['link_attributes']
+        self.script_blocks = parsed['script_blocks']
+        self.replacements = {}
+
+    def parsed(self):
+        """Resultado del parseo (sin la fuente), para reconstruir el documento sin volver a parsear"""
+        return {
+            'segments': self.segments,
+            'html_lang': self.html_lang,
+            'link_attributes': self.link_attributes,
+            'script_blocks': self.script_blocks
+        }
+
+    def set_text(self, segment, translated):
+        """
+        Reemplaza el texto de un segmento (texto, atributo o bloque)
+
+        Returns:
+            bool: False si la traducción de un bloque no conserva sus marcadores
+        """
+        if segment['type'] == 'block':
+            pieces = restore_placeholders(segment, translated)
+            if pieces is None:
+                return False
+            raw = self.source[segment['start']:segment['end']]
+            prefix = raw[:len(raw) - len(raw.lstrip())]
+            suffix = raw[len(raw.rstrip()):] if raw.strip() else ''
+            new = [prefix] + pieces + [suffix]
+        elif segment['type'] == 'text':
+            prefix, suffix = _split_edges(self.source[segment['start']:segment['end']], segment['text'])
+            new = prefix + escape(translated, quote=False) + suffix
+        else:
+            new = '"' + escape(translated, quote=True) + '"'
+        self.replacements[segment['start']] = (segment['end'], new)
+        return True
+
+    def set_attribute_value(self, span, value):
+        """Reemplaza el valor de un atributo registrado como (start, end, valor)"""
+        start, end = span[0], span[1]
+        self.replacements[start] = (end, '"' + escape(value, quote=True) + '"')
+
+    def rewrite_links(self, pattern, replacement):
+        """
+        Aplica re.sub en a[href], meta refresh y bloques <script>
+
+        Returns:
+            list: (etiqueta, valor nuevo) de los atributos modificados
+        """
+        regex = re.compile(pattern)
+        changed = []
+        for span in self.link_attributes:
+            if regex.search(span[2]):
+                new_value = regex.sub(replacement, span[2])
+                self.set_attribute_value(span, new_value)
+                changed.append((span[3], new_value))
+        for start, end in self.script_blocks:
+            script = self.source[start:end]
+            if regex.search(script):
+                self.replacements[start] = (end, regex.sub(replacement, script))
+        return changed
+
+    def render(self):
+        """Escribe el documento empalmando los reemplazos en la fuente original"""
+        self._starts = sorted(self.replacements)
+        pieces = []
+        self._render_range(0, len(self.source), pieces)
+        return ''.join(pieces)
+
+    def _render_range(self, start, end, pieces):
+        """
+        Copia source[start:end] con sus reemplazos. Los bloques traducidos citan
+        sus etiquetas originales por posición, que se copian con los reemplazos
+        que tengan dentro (alt/title/href de etiquetas en línea)
+        """
+        position = start
+        index = bisect_left(self._starts, start)
+        while index < len(self._starts) and self._starts[index] < end:
+            replacement_start = self._starts[index]
+            index += 1
+            replacement_end, new = self.replacements[replacement_start]
+            if replacement_start < position or replacement_end > end:
+                continue  # Dentro de un bloque ya empalmado, o el bloque que contiene el tramo
+            pieces.append(self.source[position:replacement_start])
+            if isinstance(new, str):
+                pieces.append(new)
+            else:
+                for piece in new:
+                    if isinstance(piece, str):
+                        pieces.append(piece)
+                    else:
+                        self._render_range(piece[0], piece[1], pieces)
+            position = replacement_end
+        pieces.append(self.source[position:end])
+
+
+def _source_files():
+    from system_config import ORIGINAL_DIR
+    return sorted(ORIGINAL_DIR.glob('*_es/html/*.html'))
+
+
+def run_check():
+    """
+    Verifica en los manuales originales que:
+    - los segmentos coinciden con la extracción de BeautifulSoup (salvo el DOCTYPE)
+    - sin reemplazos, la salida es idéntica a la fuente
+    - con reemplazos, BeautifulSoup lee exactamente los textos nuevos
+    - por bloques, los marcadores vuelven a las etiquetas originales
+    """
+    from html_backend import parse_html
+    from html_translator import HTMLTranslator
+
+    problems = []
+    block_stats = [0, 0]
+    files = _source_files()
+    for html_file in files:
+        source = html_file.read_text(encoding='utf-8')
+        document = SplicedDocument(source)
+
+        soup = parse_html(source)
+        reference = sorted((element['type'], element['text'])
+                           for element in HTMLTranslator.extract_translatable_elements(None, soup))
+        spliced = sorted((segment['type'], segment['text']) for segment in document.segments)
+        if spliced != reference:
+            problems.append(f"{html_file.name}: segmentos distintos a BeautifulSoup")
+            continue
+
+        streamed = list(iter_segments(path=html_file, chunk_size=997))
+        if streamed != document.segments:
+            problems.append(f"{html_file.name}: la lectura por bloques da otros segmentos")
+            continue
+
+        if document.render() != source:
+            problems.append(f"{html_file.name}: la salida sin cambios difiere de la fuente")
+            continue
+
+        for segment in document.segments:
+            document.set_text(segment, f"«{segment['text'].upper()} & <ok>»")
+        expected = sorted((segment['type'], f"«{segment['text'].upper()} & <ok>»") for segment in document.segments)
+        rendered = parse_html(document.render())
+        got = sorted((element['type'], element['text'])
+                     for element in HTMLTranslator.extract_translatable_elements(None, rendered))
+        if got != expected:
+            problems.append(f"{html_file.name}: la salida empalmada no reproduce las traducciones")
+            continue
+
+        problem = _check_blocks(html_file, source, soup, block_stats)
+        if problem:
+            problems.append(f"{html_file.name}: {problem}")
+
+    print(f"🔍 {len(files)} archivos verificados")
+    print(f"🧱 Por bloques: {block_stats[0]} bloques agrupan {block_stats[1]} segmentos de texto")
+    if problems:
+        print(f"❌ {len(problems)} problemas:")
+        for problem in problems[:10]:
+            print(f"   - {problem}")
+        return False
+    print("✅ Segmentos idénticos a BeautifulSoup y empalme correcto")
+    return True
+
+
+def _check_blocks(html_file, source, soup, block_stats):
+    """
+    Segmentación por bloques: con la traducción identidad el texto y las etiquetas
+    no cambian, los atributos dentro de un bloque se siguen reemplazando y una
+    traducción sin todos sus marcadores se rechaza
+    """
+    from html_backend import parse_html
+    from html_translator import HTMLTranslator
+
+    document = SplicedDocument(source, blocks=True)
+    if list(iter_segments(path=html_file, chunk_size=997, blocks=True)) != document.segments:
+        return "la lectura por bloques da otros segmentos (modo bloque)"
+
+    expected_attributes = []
+    for segment in document.segments:
+        if segment['type'] == 'block':
+            block_stats[0] += 1
+            block_stats[1] += len(segment['parts'])
+            if document.set_text(segment, PLACEHOLDER.sub('', segment['text'], count=1)):
+                return "se aceptó una traducción con un marcador faltante"
+            document.set_text(segment, segment['text'])
+        elif segment['type'] == 'text':
+            document.set_text(segment, segment['text'])
+        else:
+            document.set_text(segment, segment['text'].upper())
+            expected_attributes.append((segment['type'], segment['text'].upper()))
+
+    rendered = parse_html(document.render())
+    if rendered.get_text().split() != soup.get_text().split():
+        return "el texto de los bloques cambia con la traducción identidad"
+    if [tag.name for tag in rendered.find_all(True)] != [tag.name for tag in soup.find_all(True)]:
+        return "los marcadores no reconstruyen las etiquetas originales"
+    got = sorted((element['type'], element['text'])
+                 for element in HTMLTranslator.extract_translatable_elements(None, rendered)
+                 if element['type'] != 'text')
+    if got != sorted(expected_attributes):
+        return "se perdieron atributos traducidos dentro de un bloque"
+    return None
+
+
+def run_benchmark():
+    """Compara el renderizado por empalme con parseo + prettify()"""
+    from html_backend import parse_html, serialize_html
+
+    files = _source_files()
+    sources = [f.read_text(encoding='utf-8') for f in files]
+
+    start = time.perf_counter()
+    pretty_size = 0
+    for source in sources:
+        pretty_size += len(serialize_html(parse_html(source)).encode('utf-8'))
+    pretty_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    splice_size = 0
+    for source in sources:
+        document = SplicedDocument(source)
+        for segment in document.segments:
+            document.set_text(segment, segment['text'])
+        splice_size += len(document.render().encode('utf-8'))
+    splice_time = time.perf_counter() - start
+
+    source_size = sum(len(source.encode('utf-8')) for source in sources)
+    print("⏱️ BENCHMARK DE RENDERIZADO")
+    print("=" * 50)
+    print(f"📄 Archivos: {len(files)} ({source_size / 1024:.0f} KB fuente)")
+    print(f"🌳 parse + prettify: {pretty_time:.2f}s, {pretty_size / 1024:.0f} KB de salida")
+    print(f"✂️ empalme:          {splice_time:.2f}s, {splice_size / 1024:.0f} KB de salida")
+    print(f"🚀 {pretty_time / splice_time:.1f}x más rápido")
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Renderizado HTML por empalme')
+    parser.add_argument('action', choices=['check', 'benchmark'], help='Acción a ejecutar')
+
+    args = parser.parse_args()
+
+    if args.action == 'check':
+        sys.exit(0 if run_check() else 1)
+    elif args.action == 'benchmark':
+        run_benchmark()
+
+
+if __name__ == "__main__":
+    main()
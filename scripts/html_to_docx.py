@@ -11,15 +11,19 @@ from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_TAB_ALIGNMENT
 from docx.oxml.shared import OxmlElement, qn
-from docx.oxml.parser import parse_xml
-from docx.oxml.ns import nsdecls
 import re
 import os
 import time
 from datetime import datetime
-from bs4 import BeautifulSoup
 from toc_handler import TOCHandler
-from system_config import get_log_file
+from system_config import DOCX_STYLES_CONFIG, IMAGE_INDEX_CONFIG, IMAGE_OPTIMIZATION_CONFIG, get_log_file
+from html_backend import parse_html
+from docx_hyperlinks import build_hyperlink
+from docx_skeleton import add_picture
+from docx_styles import (BASE_STYLE_ID, add_character_styles, class_style_id, load_rvts_styles,
+                         parse_css_color, set_run_style)
+from image_index import get_image_index, probe_image
+from image_optimizer import optimized_image
 
 class DOCXLogger:
     """Logger específico para generación DOCX"""
@@ -131,6 +135,8 @@ def spanish_html_with_real_links(html_dir, output_docx, manual_name="manual", la
     # Cargar estilos CSS
     progress.show_step("Cargando estilos CSS")
     css_styles = load_css_styles_from_spanish(manual_type)
+    if DOCX_STYLES_CONFIG['enabled']:
+        add_character_styles(doc, css_styles)
     logger.log_step(f"CSS_STYLES_LOADED: {len(css_styles)} classes")
 
     # CREAR PÁGINA DE TÍTULO Y ÍNDICE
@@ -324,9 +330,12 @@ def get_translations(language='es'):
     return translations.get(language, translations['es'])
 
 def add_run_with_font(paragraph, text=""):
-    """Crear run con fuente Calibri por defecto"""
+    """Crear run con fuente Calibri por defecto (estilo de carácter base o formato directo)"""
     run = paragraph.add_run(text)
-    run.font.name = 'Calibri'
+    if DOCX_STYLES_CONFIG['enabled']:
+        set_run_style(run, BASE_STYLE_ID)
+    else:
+        run.font.name = 'Calibri'
     return run
 
 def load_css_styles_from_spanish(manual_type='open_aula_back'):
@@ -338,52 +347,12 @@ def load_css_styles_from_spanish(manual_type='open_aula_back'):
     css_file = PROJECT_ROOT / "original" / manual_dir / "html" / "css" / "hnd.content.css"
     if css_file.exists():
         try:
-            with open(css_file, 'r', encoding='utf-8') as f:
-                css_content = f.read()
-            css_styles = parse_rvts_styles(css_content)
+            css_styles = load_rvts_styles(css_file)
         except Exception as e:
             print(f"   ⚠️ Error cargando CSS: {e}")
 
     return css_styles
 
-def parse_rvts_styles(css_content):
-    """Parsear clases rvts del CSS"""
-    styles = {}
-
-    patterns = [
-        r'(?:a\.rvts(\d+),?\s*)?span\.rvts(\d+)[^{]*\{([^}]+)\}',
-        r'a\.rvts(\d+),?\s*span\.rvts(\d+)[^{]*\{([^}]+)\}',
-        r'span\.rvts(\d+)[^{]*\{([^}]+)\}'
-    ]
-
-    for pattern in patterns:
-        matches = re.finditer(pattern, css_content, re.MULTILINE | re.DOTALL)
-        for match in matches:
-            groups = match.groups()
-
-            if len(groups) == 3 and groups[1]:
-                class_num = groups[1]
-                css_rules = groups[2]
-            elif len(groups) == 2:
-                class_num = groups[0]
-                css_rules = groups[1]
-            else:
-                continue
-
-            style_props = {}
-            rules = css_rules.strip().split(';')
-
-            for rule in rules:
-                if ':' in rule:
-                    prop, value = rule.split(':', 1)
-                    prop = prop.strip()
-                    value = value.strip()
-                    style_props[prop] = value
-
-            styles[f'rvts{class_num}'] = style_props
-
-    return styles
-
 def create_bookmark_mapping(html_files):
     """Crear mapeo de archivos HTML a nombres de bookmarks"""
     bookmark_mapping = {}
@@ -405,8 +374,6 @@ def clean_bookmark_name(filename):
 
 def parse_html_toc_structure(manual_type='open_aula_back'):
     """Parsear la estructura jerárquica del TOC HTML"""
-    from bs4 import BeautifulSoup
-
     try:
         # Determinar directorio source según el tipo de manual
         manual_dir = f"{manual_type}_es"
@@ -414,7 +381,7 @@ def parse_html_toc_structure(manual_type='open_aula_back'):
         with open(index_path, 'r', encoding='utf-8') as f:
             content = f.read()
 
-        soup = BeautifulSoup(content, 'html.parser')
+        soup = parse_html(content)
         toc_div = soup.find('div', {'id': 'toc'})
 
         if toc_div:
@@ -596,7 +563,7 @@ def process_html_file_with_real_links(doc, html_file, base_path, css_styles, boo
         with open(html_file, 'r', encoding='utf-8') as f:
             html_content = f.read()
 
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = parse_html(html_content)
 
         # CREAR BOOKMARK REAL para esta sección
         title = extract_title(soup, html_file)
@@ -865,25 +832,8 @@ def create_real_internal_hyperlink(paragraph, text, bookmark_name, css_styles, c
     """Crear HYPERLINK XML REAL hacia bookmark"""
 
     try:
-        # Crear elemento hyperlink XML
-        p = paragraph._element
-
         # Crear el elemento hyperlink con anchor hacia bookmark
-        hyperlink_xml = f'''
-        <w:hyperlink w:anchor="{bookmark_name}" {nsdecls('w')}>
-            <w:r>
-                <w:rPr>
-                    <w:color w:val="0000FF"/>
-                    <w:u w:val="single"/>
-                </w:rPr>
-                <w:t>{text}</w:t>
-            </w:r>
-        </w:hyperlink>
-        '''
-
-        hyperlink_element = parse_xml(hyperlink_xml)
-        p.append(hyperlink_element)
-
+        paragraph._element.append(build_hyperlink(text, anchor=bookmark_name))
         return True
 
     except Exception as e:
@@ -904,24 +854,7 @@ def create_real_external_hyperlink(paragraph, text, url, css_styles, css_class):
         part = paragraph.part
         r_id = part.relate_to(url, "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink", is_external=True)
 
-        # Crear elemento hyperlink XML con relationship ID
-        p = paragraph._element
-
-        hyperlink_xml = f'''
-        <w:hyperlink r:id="{r_id}" {nsdecls('w', 'r')}>
-            <w:r>
-                <w:rPr>
-                    <w:color w:val="0000FF"/>
-                    <w:u w:val="single"/>
-                </w:rPr>
-                <w:t>{text}</w:t>
-            </w:r>
-        </w:hyperlink>
-        '''
-
-        hyperlink_element = parse_xml(hyperlink_xml)
-        p.append(hyperlink_element)
-
+        paragraph._element.append(build_hyperlink(text, r_id=r_id))
         return True
 
     except Exception as e:
@@ -980,6 +913,11 @@ def apply_css_style_to_run(run, class_name, css_styles):
     if class_name not in css_styles:
         return
 
+    # La clase compilada como estilo de carácter (add_character_styles)
+    if DOCX_STYLES_CONFIG['enabled']:
+        set_run_style(run, class_style_id(class_name))
+        return
+
     style_props = css_styles[class_name]
 
     if style_props.get('font-weight') == 'bold':
@@ -997,33 +935,6 @@ def apply_css_style_to_run(run, class_name, css_styles):
         if rgb_color:
             run.font.color.rgb = rgb_color
 
-def parse_css_color(color_str):
-    """Convertir color CSS a RGBColor"""
-
-    color_str = color_str.strip().lower()
-
-    if color_str.startswith('#'):
-        try:
-            if len(color_str) == 7:
-                r = int(color_str[1:3], 16)
-                g = int(color_str[3:5], 16)
-                b = int(color_str[5:7], 16)
-                return RGBColor(r, g, b)
-        except:
-            pass
-
-    color_map = {
-        '#000000': RGBColor(0, 0, 0),
-        '#0000ff': RGBColor(0, 0, 255),
-        '#000080': RGBColor(0, 0, 128),
-        '#800000': RGBColor(128, 0, 0),
-        '#008000': RGBColor(0, 128, 0),
-        '#c0c0c0': RGBColor(192, 192, 192),
-        '#6666ff': RGBColor(102, 102, 255),
-    }
-
-    return color_map.get(color_str)
-
 def process_enhanced_image(paragraph, img_elem, base_path, inline_context=False):
     """Procesar imagen HTML con soporte para imágenes inline y standalone"""
 
@@ -1042,7 +953,7 @@ def process_enhanced_image(paragraph, img_elem, base_path, inline_context=False)
                 # Imagen inline: agregar al párrafo actual, tamaño pequeño
                 run = paragraph.add_run()
                 try:
-                    run.add_picture(str(img_path), height=Inches(0.2))  # ~5mm altura
+                    add_picture(run, _picture_source(img_path, height_in=0.2), height=Inches(0.2))  # ~5mm altura
                     return True
                 except Exception as e:
                     print(f"      ⚠️ Error imagen inline {src}: {e}")
@@ -1051,7 +962,7 @@ def process_enhanced_image(paragraph, img_elem, base_path, inline_context=False)
                 # Imagen standalone: crear párrafo separado, tamaño normal
                 run = paragraph.add_run()
                 try:
-                    run.add_picture(str(img_path), width=Inches(4))  # Reducido de 6 a 4
+                    add_picture(run, _picture_source(img_path, width_in=4), width=Inches(4))  # Reducido de 6 a 4
                     paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
                     return True
                 except Exception as e:
@@ -1065,6 +976,15 @@ def process_enhanced_image(paragraph, img_elem, base_path, inline_context=False)
         print(f"      ❌ Error procesando imagen {src}: {e}")
         return False
 
+def _picture_source(img_path, width_in=None, height_in=None):
+    """Archivo a embeber: la variante reducida al tamaño mostrado si la optimización está activa"""
+    if IMAGE_OPTIMIZATION_CONFIG['enabled']:
+        try:
+            return str(optimized_image(img_path, width_in, height_in))
+        except Exception as e:
+            print(f"      ⚠️ Error optimizando {img_path.name}: {e}")
+    return str(img_path)
+
 def _is_inline_image(img_elem, inline_context, base_path):
     """Determinar si una imagen debe ser tratada como inline basado en tamaño real"""
 
@@ -1083,34 +1003,32 @@ def _is_inline_image(img_elem, inline_context, base_path):
         img_path = base_path / src
         if img_path.exists():
             try:
-                from PIL import Image
-                with Image.open(img_path) as img:
-                    width, height = img.size
-                    # print(f"      📏 {src}: {width}x{height}px")  # Simplificado
-
-                    # Considerar inline si es pequeña en dimensiones
-                    # Típicamente botones/iconos son <100px en alguna dimensión
-                    if width <= 100 or height <= 100:
-                        # print(f"         → INLINE (pequeña: ≤100px)")  # Simplificado
-                        return True
+                # Dimensiones desde el índice compartido entre idiomas (solo se abre la imagen si no está)
+                if IMAGE_INDEX_CONFIG['enabled']:
+                    info = get_image_index().get(base_path, src)
+                    if info is None:
+                        raise ValueError("imagen no legible")
+                else:
+                    info = probe_image(img_path)
+                width, height = info['width'], info['height']
+
+                # Considerar inline si es pequeña en dimensiones
+                # Típicamente botones/iconos son <100px en alguna dimensión
+                if info['class'] == 'inline':
+                    return True
 
-                    # Si es grande (>300px en ambas), definitivamente standalone
-                    if width > 300 and height > 200:
-                        # print(f"         → STANDALONE (grande: {width}x{height} > 300x200)")  # Simplificado
-                        return False
-
-                    # Si está en contexto inline, verificar ratios especiales
-                    if inline_context:
-                        # Si es muy ancha pero baja (banner/barra), puede ser inline
-                        if height <= 50 and width <= 400:
-                            # print(f"         → INLINE (banner: {width}x{height})")  # Simplificado
-                            return True
-                        # Si es muy alta pero estrecha (botón vertical), puede ser inline
-                        if width <= 50 and height <= 200:
-                            # print(f"         → INLINE (botón vertical: {width}x{height})")  # Simplificado
-                            return True
-
-                    # print(f"         → Continuando análisis...")  # Simplificado
+                # Si es grande (>300px en ambas), definitivamente standalone
+                if info['class'] == 'standalone':
+                    return False
+
+                # Si está en contexto inline, verificar ratios especiales
+                if inline_context:
+                    # Si es muy ancha pero baja (banner/barra), puede ser inline
+                    if height <= 50 and width <= 400:
+                        return True
+                    # Si es muy alta pero estrecha (botón vertical), puede ser inline
+                    if width <= 50 and height <= 200:
+                        return True
 
             except Exception as e:
                 print(f"      ⚠️ Error verificando tamaño de {src}: {e}")
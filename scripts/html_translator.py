@@ -9,17 +9,31 @@ import json
 import os
 import hashlib
 import time
+import threading
 import requests
 from pathlib import Path
 from datetime import datetime
-from bs4 import BeautifulSoup
 from collections import deque
+from concurrent.futures import Future
 
 # Agregar directorios al path
 sys.path.append(str(Path(__file__).parent))
 
 from languages_config import LANGUAGES, get_language_display_name
-from system_config import CACHE_FILE, get_manual_path, estimate_translation_cost, load_api_key, get_log_file
+from system_config import CACHE_FILE, CACHE_SNAPSHOT_CONFIG, CACHE_IMAGE_CONFIG, HTML_RENDER_CONFIG, PAGE_CHROME_CONFIG, JSON_BATCH_CONFIG, ASSET_STORE_CONFIG, SEGMENTATION_CONFIG, SEGMENT_CLASSIFIER_CONFIG, get_manual_path, estimate_translation_cost, load_api_key, get_log_file
+from cache_daemon import CacheClient, DaemonCache
+from cache_stats import CacheStatsIndex, print_cache_stats_report
+from cache_snapshot import load_snapshot, write_snapshot, snapshot_is_fresh
+from cache_image import build_image
+from html_backend import parse_html, serialize_html
+from html_splice import SplicedDocument, CONTENT_REGION_ID
+from page_chrome import PageChrome
+from segment_cache import SegmentCache
+from asset_sync import AssetStore, sync_resources
+from segment_classifier import SegmentClassifier
+from text_patterns import (protect_email_addresses, restore_email_addresses, find_corruption,
+                           remove_extra_html, remove_explanation_prefixes, normalize_spacing,
+                           has_structural_html, pdf_link_pattern, replace_pdf_links)
 
 class TranslationLogger:
     """Logger para registrar traducciones y progreso en archivos de log"""
@@ -40,6 +54,7 @@ class TranslationLogger:
             'total_elements': 0,
             'cache_hits': 0,
             'api_calls': 0,
+            'coalesced': 0,
             'errors': []
         }
 
@@ -75,6 +90,16 @@ class TranslationLogger:
                 self.summary_data['total_cost'] = 0.0
             self.summary_data['total_cost'] += cost
 
+    def log_coalesced(self, original):
+        """Registrar una traducción que reutilizó una llamada a la API ya en curso"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        orig_short = original[:50] + "..." if len(original) > 50 else original
+
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(f"[{timestamp}] COALESCED: \"{orig_short}\"\n")
+
+        self.summary_data['coalesced'] += 1
+
     def log_file_start(self, filename, element_count):
         """Registrar inicio de procesamiento de archivo"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -123,6 +148,7 @@ class TranslationLogger:
         with open(self.log_file, 'a', encoding='utf-8') as f:
             f.write(f"[{timestamp}] SESSION_END: Files:{self.summary_data['files_processed']}, ")
             f.write(f"Cache:{self.summary_data['cache_hits']}, API:{self.summary_data['api_calls']}, ")
+            f.write(f"Coalesced:{self.summary_data['coalesced']}, ")
             f.write(f"Cost:${self.summary_data.get('total_cost', 0.0):.4f}, ")
             f.write(f"Errors:{len(self.summary_data['errors'])}\n")
 
@@ -302,6 +328,45 @@ class AdaptiveRateLimiter:
             'avg_requests_per_minute': len(recent_requests) if recent_requests else 0
         }
 
+class SingleFlight:
+    """Coalesce llamadas concurrentes con la misma clave en una sola ejecución"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}  # clave -> Future de la llamada en curso
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Ejecuta fn una sola vez por clave entre los hilos que la pidan a la vez
+
+        Returns:
+            tuple: (resultado, shared) donde shared indica si se reutilizó
+                   el resultado de otra llamada en curso
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            return future.result(), True
+
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
 def estimate_tokens(text):
     """Estima el número de tokens en un texto (aproximación simple)"""
     if not text:
@@ -326,21 +391,50 @@ class HTMLTranslator:
     def __init__(self, manual_name='open_aula_front'):
         self.manual_name = manual_name
         self.api_key = load_api_key()
+        # Si el servicio de caché está corriendo, se comparte su memoria en lugar de cargar el JSON
+        self.cache_client = CacheClient.connect_if_running()
+        self.cache_from_snapshot = False
         self.cache = self.load_cache()
+        # Estadísticas agregadas del caché (con servicio compartido las mantiene el servicio)
+        self.cache_stats = None if self.cache_client else CacheStatsIndex.load_for(self.cache)
         self.logger = None
         self.progress = None
+        self.page_chrome = None          # Marco común del manual (se detecta al planificar)
+        self.segment_cache = SegmentCache()  # Fuentes ya parseadas, compartidas entre idiomas
+        # Recursos (vendors, css, js...) guardados una vez y enlazados en cada idioma
+        self.asset_store = AssetStore() if ASSET_STORE_CONFIG['enabled'] else None
         self.session = requests.Session()
         self.rate_limiter = AdaptiveRateLimiter(base_delay=0.5, max_delay=30.0)
+        self.single_flight = SingleFlight()
+        # Segmentos que no necesitan traducción (URLs, versiones, marcas...): identidad sin API
+        self.classifier = SegmentClassifier() if SEGMENT_CLASSIFIER_CONFIG['enabled'] else None
 
-        # Validar y limpiar caché automáticamente al inicializar
+        # Validar y limpiar caché automáticamente al inicializar (también desde el snapshot:
+        # la pasada cuesta unos ms; la mejora del arranque viene de decodificar el snapshot)
         self.validate_and_clean_cache()
+        if not self.cache_from_snapshot:
+            self.save_snapshot()
 
     def load_cache(self):
         """Carga el caché de traducciones y limpia entradas corruptas"""
-        if CACHE_FILE.exists():
+        if self.cache_client:
+            print("🔌 Usando servicio de caché compartido")
+            return DaemonCache(self.cache_client)
+
+        cache = None
+        snapshot_file = CACHE_SNAPSHOT_CONFIG['snapshot_file']
+        if CACHE_SNAPSHOT_CONFIG['enabled'] and snapshot_is_fresh(snapshot_file, CACHE_FILE):
             try:
-                with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                    cache = json.load(f)
+                cache = load_snapshot(snapshot_file)
+                self.cache_from_snapshot = True
+            except Exception as e:
+                print(f"⚠️ Error cargando snapshot del caché, se usa el JSON: {e}")
+
+        if cache is not None or CACHE_FILE.exists():
+            try:
+                if cache is None:
+                    with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                        cache = json.load(f)
 
                 # Limpiar entradas del caché que contengan texto sucio
                 cleaned_cache = {}
@@ -364,9 +458,10 @@ class HTMLTranslator:
 
                 if cleaned_count > 0:
                     print(f"🧹 Limpiadas {cleaned_count} entradas del caché con texto corrupto")
-                    # Guardar caché limpio
+                    # Guardar caché limpio (el snapshot deja de corresponder al JSON)
                     with open(CACHE_FILE, 'w', encoding='utf-8') as f:
                         json.dump(cleaned_cache, f, ensure_ascii=False, indent=2)
+                    self.cache_from_snapshot = False
 
                 return cleaned_cache
 
@@ -374,14 +469,70 @@ class HTMLTranslator:
                 print(f"⚠️ Error cargando caché: {e}")
         return {}
 
-    def save_cache(self):
-        """Guarda el caché de traducciones"""
+    def save_cache(self, snapshot=True):
+        """
+        Guarda el caché de traducciones
+
+        Args:
+            snapshot: Actualizar también el snapshot binario (los guardados
+                intermedios lo omiten; un snapshot viejo simplemente no se usa)
+        """
+        if isinstance(self.cache, DaemonCache):
+            try:
+                self.cache.flush()
+            except (OSError, RuntimeError) as e:
+                print(f"⚠️ Error enviando caché al servicio: {e}")
+            return
+
         CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
         try:
             with open(CACHE_FILE, 'w', encoding='utf-8') as f:
                 json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            if self.cache_stats:
+                self.cache_stats.save()
         except Exception as e:
             print(f"⚠️ Error guardando caché: {e}")
+            return
+
+        if snapshot:
+            self.save_snapshot()
+
+    def save_snapshot(self):
+        """Actualiza el snapshot binario del caché (y la imagen mmap si CACHE_IMAGE_CONFIG está activo)"""
+        if self.cache_client or not CACHE_FILE.exists():
+            return
+        if CACHE_SNAPSHOT_CONFIG['enabled']:
+            try:
+                write_snapshot(self.cache, CACHE_SNAPSHOT_CONFIG['snapshot_file'], CACHE_FILE)
+            except Exception as e:
+                print(f"⚠️ Error guardando snapshot del caché: {e}")
+        if CACHE_IMAGE_CONFIG['enabled']:
+            try:
+                build_image(self.cache, CACHE_IMAGE_CONFIG['image_file'])
+            except Exception as e:
+                print(f"⚠️ Error guardando imagen del caché: {e}")
+
+    def _store_cache_entry(self, key, value):
+        """Guarda una entrada en el caché manteniendo el índice de estadísticas"""
+        if self.cache_stats:
+            if key in self.cache:
+                self.cache_stats.record_remove(key, self.cache[key])
+            self.cache_stats.record_insert(key, value)
+        self.cache[key] = value
+
+    def _remove_cache_entry(self, key):
+        """Elimina una entrada del caché manteniendo el índice de estadísticas"""
+        value = self.cache[key]
+        del self.cache[key]
+        if self.cache_stats:
+            self.cache_stats.record_remove(key, value)
+
+    def _record_cache_hit(self, cached_value):
+        """Registra un acierto de caché en la entrada y en el índice"""
+        if isinstance(cached_value, dict):
+            cached_value['usage_count'] = cached_value.get('usage_count', 0) + 1
+        if self.cache_stats:
+            self.cache_stats.record_hit(cached_value)
 
     def get_cache_key(self, text, target_lang):
         """Genera clave única para el caché"""
@@ -425,112 +576,37 @@ class HTMLTranslator:
 
         return True, "Primera traducción del archivo"
 
-    def save_file_metadata(self, source_file, target_file, target_lang):
+    def save_file_metadata(self, source_file, target_file, target_lang, source_checksum=None):
         """Guarda metadata del archivo traducido"""
-        source_checksum = self.get_file_checksum(source_file)
+        source_checksum = source_checksum or self.get_file_checksum(source_file)
         if source_checksum:
             file_metadata_key = f"FILE_METADATA:{source_file.name}:{target_lang}"
-            self.cache[file_metadata_key] = {
+            self._store_cache_entry(file_metadata_key, {
                 'source_checksum': source_checksum,
                 'target_file': str(target_file),
                 'translated_at': time.time(),
                 'source_size': source_file.stat().st_size,
                 'target_size': target_file.stat().st_size if target_file.exists() else 0
-            }
+            })
 
     def validate_cache(self):
-        """Valida la integridad del caché y retorna estadísticas"""
-        stats = {
-            'total_entries': len(self.cache),
-            'translation_entries': 0,
-            'file_metadata_entries': 0,
-            'languages': set(),
-            'corrupted_entries': [],
-            'oldest_entry': None,
-            'newest_entry': None,
-            'total_usage': 0
-        }
-
-        current_time = time.time()
-
-        for key, value in self.cache.items():
-            try:
-                if key.startswith('FILE_METADATA:'):
-                    stats['file_metadata_entries'] += 1
-                    if isinstance(value, dict) and 'translated_at' in value:
-                        timestamp = value['translated_at']
-                        if stats['oldest_entry'] is None or timestamp < stats['oldest_entry']:
-                            stats['oldest_entry'] = timestamp
-                        if stats['newest_entry'] is None or timestamp > stats['newest_entry']:
-                            stats['newest_entry'] = timestamp
-                else:
-                    stats['translation_entries'] += 1
-                    # Extraer idioma de la clave MD5 buscando en todas las traducciones
-                    if isinstance(value, dict):
-                        if 'timestamp' in value:
-                            timestamp = value['timestamp']
-                            if stats['oldest_entry'] is None or timestamp < stats['oldest_entry']:
-                                stats['oldest_entry'] = timestamp
-                            if stats['newest_entry'] is None or timestamp > stats['newest_entry']:
-                                stats['newest_entry'] = timestamp
-
-                        usage_count = value.get('usage_count', 1)
-                        stats['total_usage'] += usage_count
-
-                        # Intentar detectar idioma por patrones comunes
-                        translated_text = value.get('translated', '')
-                        if any(word in translated_text.lower() for word in ['the', 'and', 'or', 'to', 'of']):
-                            stats['languages'].add('en')
-                        elif any(word in translated_text.lower() for word in ['di', 'della', 'con', 'per', 'una']):
-                            stats['languages'].add('it')
-                        elif any(word in translated_text.lower() for word in ['et', 'de', 'le', 'pour', 'avec']):
-                            stats['languages'].add('fr')
+        """Retorna estadísticas del caché desde el índice agregado (sin recorrer las entradas)"""
+        if self.cache_stats:
+            return self.cache_stats.summary()
 
-            except Exception as e:
-                stats['corrupted_entries'].append(f"{key}: {str(e)}")
+        if self.cache_client:
+            index = self.cache_client.stats().get('index')
+            if index:
+                return index
 
-        return stats
+        # Sin índice disponible: reconstruirlo en memoria a partir de lo cargado
+        index = CacheStatsIndex()
+        index.rebuild(self.cache)
+        return index.summary()
 
     def print_cache_report(self):
         """Imprime un reporte completo del estado del caché"""
-        stats = self.validate_cache()
-
-        print("📊 REPORTE DEL CACHÉ")
-        print("=" * 50)
-        print(f"📝 Total entradas: {stats['total_entries']}")
-        print(f"🔤 Traducciones: {stats['translation_entries']}")
-        print(f"📄 Metadata archivos: {stats['file_metadata_entries']}")
-        print(f"🌍 Idiomas detectados: {', '.join(stats['languages']) or 'Ninguno detectado'}")
-        print(f"🔄 Uso total: {stats['total_usage']} reutilizaciones")
-
-        if stats['oldest_entry']:
-            oldest_date = time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['oldest_entry']))
-            print(f"📅 Entrada más antigua: {oldest_date}")
-
-        if stats['newest_entry']:
-            newest_date = time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['newest_entry']))
-            print(f"📅 Entrada más reciente: {newest_date}")
-
-        if stats['corrupted_entries']:
-            print(f"\n⚠️ Entradas corruptas encontradas: {len(stats['corrupted_entries'])}")
-            for corrupt in stats['corrupted_entries'][:3]:  # Mostrar solo las primeras 3
-                print(f"   - {corrupt}")
-            if len(stats['corrupted_entries']) > 3:
-                print(f"   ... y {len(stats['corrupted_entries']) - 3} más")
-        else:
-            print("✅ No se encontraron entradas corruptas")
-
-        # Análisis de eficiencia
-        if stats['translation_entries'] > 0:
-            avg_usage = stats['total_usage'] / stats['translation_entries']
-            print(f"\n📈 Eficiencia promedio: {avg_usage:.1f} reutilizaciones por traducción")
-
-            if avg_usage < 1.5:
-                print("⚠️ Baja reutilización del caché (< 1.5x)")
-            elif avg_usage > 3.0:
-                print("🎯 Excelente reutilización del caché (> 3.0x)")
-            else:
-                print("✅ Reutilización normal del caché")
+        print_cache_stats_report(self.validate_cache())
 
     def cleanup_cache(self, max_age_days=30, min_usage=1):
         """Limpia entradas antiguas o poco usadas del caché"""
@@ -563,7 +639,7 @@ class HTMLTranslator:
         # Remover entradas
         removed_count = len(keys_to_remove)
         for key, reason in keys_to_remove:
-            del self.cache[key]
+            self._remove_cache_entry(key)
 
         if removed_count > 0:
             self.save_cache()
@@ -611,74 +687,60 @@ class HTMLTranslator:
         # Corregir enlaces PDF para que apunten al idioma correcto
         self.fix_pdf_links(soup, target_lang)
 
-    def fix_pdf_links(self, soup, target_lang):
-        """Corrige enlaces PDF para que apunten al archivo del idioma correcto"""
-        import re
+    def fix_document_attributes(self, document, target_lang):
+        """Equivalente de fix_html_attributes para un SplicedDocument"""
+        # Corregir atributo lang en tag html
+        if document.html_lang:
+            document.set_attribute_value(document.html_lang, target_lang)
 
-        # Determinar el tipo de manual basado en el directorio
-        # Esto se puede determinar desde el self.manual_name si está disponible
-        manual_type = getattr(self, 'manual_name', 'front')
+        # Corregir enlaces PDF para que apunten al idioma correcto
+        spanish_pdf_pattern, replacement_pdf = self._pdf_link_pattern(target_lang)
+        for tag, new_value in document.rewrite_links(spanish_pdf_pattern, replacement_pdf):
+            if tag == 'meta':
+                print(f"   🔗 Corregido meta refresh: {replacement_pdf}")
+            else:
+                print(f"   🔗 Corregido enlace PDF: {new_value}")
 
-        if 'front' in manual_type:
-            manual_suffix = 'front'
-        elif 'back' in manual_type:
-            manual_suffix = 'back'
-        else:
-            manual_suffix = 'front'  # default
+    def _pdf_link_pattern(self, target_lang):
+        """Patrón compilado del PDF español del manual y su reemplazo para el idioma destino"""
+        return pdf_link_pattern(getattr(self, 'manual_name', 'front'), target_lang)
 
-        # Patrón para identificar enlaces PDF españoles
-        spanish_pdf_pattern = f'manual_aula_{manual_suffix}_es\\.pdf'
-        replacement_pdf = f'manual_aula_{manual_suffix}_{target_lang}.pdf'
+    def fix_pdf_links(self, soup, target_lang):
+        """Corrige enlaces PDF para que apunten al archivo del idioma correcto"""
+        spanish_pdf_pattern, replacement_pdf = self._pdf_link_pattern(target_lang)
 
         # Corregir meta refresh
         meta_refresh = soup.find('meta', attrs={'http-equiv': 'refresh'})
         if meta_refresh and 'content' in meta_refresh.attrs:
-            content = meta_refresh['content']
-            if re.search(spanish_pdf_pattern, content):
-                new_content = re.sub(spanish_pdf_pattern, replacement_pdf, content)
+            new_content = replace_pdf_links(meta_refresh['content'], self.manual_name, target_lang)
+            if new_content is not None:
                 meta_refresh['content'] = new_content
                 print(f"   🔗 Corregido meta refresh: {replacement_pdf}")
 
         # Corregir enlaces directos <a href="...">
-        pdf_links = soup.find_all('a', href=re.compile(spanish_pdf_pattern))
+        pdf_links = soup.find_all('a', href=spanish_pdf_pattern)
         for link in pdf_links:
-            old_href = link['href']
-            new_href = re.sub(spanish_pdf_pattern, replacement_pdf, old_href)
+            new_href = spanish_pdf_pattern.sub(replacement_pdf, link['href'])
             link['href'] = new_href
             print(f"   🔗 Corregido enlace PDF: {new_href}")
 
         # También corregir cualquier referencia en JavaScript o texto inline si existe
         for script in soup.find_all('script'):
-            if script.string and re.search(spanish_pdf_pattern, script.string):
-                script.string = re.sub(spanish_pdf_pattern, replacement_pdf, script.string)
+            if script.string:
+                new_script = replace_pdf_links(script.string, self.manual_name, target_lang)
+                if new_script is not None:
+                    script.string = new_script
 
     def fix_pdf_links_in_json(self, json_data, target_lang):
         """Corrige enlaces PDF en datos JSON como _toc.json"""
-        import re
-
-        # Determinar el tipo de manual basado en self.manual_name
-        manual_type = getattr(self, 'manual_name', 'front')
-
-        if 'front' in manual_type:
-            manual_suffix = 'front'
-        elif 'back' in manual_type:
-            manual_suffix = 'back'
-        else:
-            manual_suffix = 'front'  # default
-
-        # Patrón para identificar enlaces PDF españoles
-        spanish_pdf_pattern = f'manual_aula_{manual_suffix}_es\\.pdf'
-        replacement_pdf = f'manual_aula_{manual_suffix}_{target_lang}.pdf'
-
         pdf_links_fixed = 0
 
         # Procesar cada elemento del array JSON
         for item in json_data:
             if isinstance(item, dict) and 'a_attr' in item:
                 if isinstance(item['a_attr'], dict) and 'href' in item['a_attr']:
-                    href = item['a_attr']['href']
-                    if re.search(spanish_pdf_pattern, href):
-                        new_href = re.sub(spanish_pdf_pattern, replacement_pdf, href)
+                    new_href = replace_pdf_links(item['a_attr']['href'], self.manual_name, target_lang)
+                    if new_href is not None:
                         item['a_attr']['href'] = new_href
                         pdf_links_fixed += 1
                         print(f"      🔗 JSON PDF corregido: {new_href}")
@@ -688,31 +750,19 @@ class HTMLTranslator:
 
     def protect_email_addresses(self, text):
         """Protege direcciones de email reemplazándolas con marcadores únicos"""
-        import re
-
-        # Patrón para detectar emails
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-
-        emails_found = []
-        def replace_email(match):
-            email = match.group(0)
-            placeholder = f"__EMAIL_PLACEHOLDER_{len(emails_found)}__"
-            emails_found.append(email)
-            return placeholder
-
-        protected_text = re.sub(email_pattern, replace_email, text)
-        return protected_text, emails_found
+        return protect_email_addresses(text)
 
     def restore_email_addresses(self, text, emails_list):
         """Restaura las direcciones de email protegidas"""
-        for i, email in enumerate(emails_list):
-            placeholder = f"__EMAIL_PLACEHOLDER_{i}__"
-            text = text.replace(placeholder, email)
-        return text
+        return restore_email_addresses(text, emails_list)
 
     def translate_with_claude(self, text, target_lang, context="", element_type="text", max_retries=3):
         """Traduce texto usando Claude API con reintentos robustos"""
 
+        # Textos que la API devolvería iguales
+        if self.classifier and self.classifier.is_identity(text, cached=False):
+            return text, 0.0
+
         # Proteger direcciones de email antes de cualquier procesamiento
         protected_text, emails_found = self.protect_email_addresses(text)
 
@@ -724,11 +774,10 @@ class HTMLTranslator:
             cached_value = self.cache[cache_key]
             # Si es formato nuevo con metadata, extraer la traducción
             if isinstance(cached_value, dict) and 'translated' in cached_value:
-                # Actualizar contador de uso
-                cached_value['usage_count'] = cached_value.get('usage_count', 0) + 1
                 translated = cached_value['translated']
             else:
                 translated = cached_value  # Formato antiguo
+            self._record_cache_hit(cached_value)
 
             # Restaurar emails en traducción del caché
             translated = self.restore_email_addresses(translated, emails_found)
@@ -742,6 +791,30 @@ class HTMLTranslator:
         if not self.api_key:
             raise ValueError("No se encontró API key de Claude")
 
+        # Con servicio de caché: reclamar la clave para que otro proceso no la traduzca en paralelo
+        if isinstance(self.cache, DaemonCache):
+            cached_value = self.cache.claim(cache_key)
+            if cached_value is not None:
+                if isinstance(cached_value, dict) and 'translated' in cached_value:
+                    translated = cached_value['translated']
+                else:
+                    translated = cached_value
+                translated = self.restore_email_addresses(translated, emails_found)
+                if self.logger:
+                    self.logger.log_translation(text, translated, "CACHE")
+                return translated, 0.0
+
+            try:
+                return self._request_translation(text, protected_text, emails_found, cache_key, target_lang, element_type, max_retries)
+            except Exception:
+                self.cache.release(cache_key)
+                raise
+
+        return self._request_translation(text, protected_text, emails_found, cache_key, target_lang, element_type, max_retries)
+
+    def _request_translation(self, text, protected_text, emails_found, cache_key, target_lang, element_type, max_retries):
+        """Llama a la API de Claude y guarda el resultado en caché"""
+
         # Preparar prompt en español (funciona mejor con Claude)
         lang_info = LANGUAGES.get(target_lang, {})
         target_lang_name = lang_info.get('claude_code', target_lang)
@@ -750,6 +823,12 @@ class HTMLTranslator:
         from languages_config import get_translation_instructions
         cultural_instructions = get_translation_instructions(target_lang, self.manual_name)
 
+        # Párrafos con formato: los marcadores numerados reemplazan etiquetas en línea
+        block_instructions = ""
+        if element_type == 'block':
+            block_instructions = ("9. Los marcadores <1>...</1> y <2/> representan formato: consérvalos TODOS, "
+                                  "con el mismo número, rodeando el texto equivalente de la traducción\n")
+
         prompt = f"""IMPORTANTE: Responde ÚNICAMENTE con el texto traducido directo. NO incluyas explicaciones, traducciones adicionales, o formato instructivo.
 
 Traduce este texto del español al {target_lang_name}:
@@ -764,11 +843,57 @@ Reglas críticas:
 6. Preserva tags HTML tal como están
 7. NO traduzcas nombres propios, URLs o códigos técnicos
 8. PRESERVA EXACTAMENTE cualquier __EMAIL_PLACEHOLDER_X__ tal como aparece
-
+{block_instructions}
 {cultural_instructions}
 
 Traducción directa:"""
 
+        translated_text, input_tokens, output_tokens = self._call_claude(prompt, max_retries)
+        cost = calculate_cost(input_tokens, output_tokens)
+
+        # Limpiar la respuesta - remover instrucciones técnicas
+        translated_text = self._clean_translation_response(translated_text)
+
+        # Restaurar direcciones de email en la traducción
+        translated_text = self.restore_email_addresses(translated_text, emails_found)
+
+        # Validar que la traducción no esté corrupta
+        self._validate_translation(text, translated_text, target_lang)
+
+        # Guardar en caché con metadata incluyendo costo
+        self._store_cache_entry(cache_key, {
+            'original': text,
+            'translated': translated_text,
+            'element_type': element_type,
+            'lang': target_lang,
+            'manual': self.manual_name,
+            'timestamp': time.time(),
+            'usage_count': 1,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'cost': cost
+        })
+
+        # Publicar enseguida en el servicio para liberar a quien espere esta clave
+        if isinstance(self.cache, DaemonCache):
+            self.cache.flush([cache_key])
+
+        # Log API call con costo
+        if self.logger:
+            self.logger.log_translation(text, translated_text, "API", cost)
+
+        # Mostrar ejemplo de traducción (verbose)
+        self._show_translation_example(text, translated_text, target_lang)
+
+        return translated_text, cost
+
+    def _call_claude(self, prompt, max_retries=3):
+        """
+        Envía un prompt a la API de Claude con rate limiting y reintentos
+
+        Returns:
+            tuple: (texto de la respuesta, tokens de entrada, tokens de salida)
+        """
         # Implementar reintentos con backoff exponencial
         for attempt in range(max_retries + 1):
             try:
@@ -808,43 +933,14 @@ Traducción directa:"""
                     self.rate_limiter.record_request(200)
 
                     result = response.json()
-                    translated_text = result['content'][0]['text'].strip()
+                    response_text = result['content'][0]['text'].strip()
 
-                    # Calcular costo real de la traducción
+                    # Tokens reales para calcular el costo
                     usage = result.get('usage', {})
                     input_tokens = usage.get('input_tokens', estimate_tokens(prompt))
-                    output_tokens = usage.get('output_tokens', estimate_tokens(translated_text))
-                    cost = calculate_cost(input_tokens, output_tokens)
-
-                    # Limpiar la respuesta - remover instrucciones técnicas
-                    translated_text = self._clean_translation_response(translated_text)
-
-                    # Restaurar direcciones de email en la traducción
-                    translated_text = self.restore_email_addresses(translated_text, emails_found)
-
-                    # Validar que la traducción no esté corrupta
-                    self._validate_translation(text, translated_text, target_lang)
-
-                    # Guardar en caché con metadata incluyendo costo
-                    self.cache[cache_key] = {
-                        'original': text,
-                        'translated': translated_text,
-                        'element_type': element_type,
-                        'timestamp': time.time(),
-                        'usage_count': 1,
-                        'input_tokens': input_tokens,
-                        'output_tokens': output_tokens,
-                        'cost': cost
-                    }
-
-                    # Log API call con costo
-                    if self.logger:
-                        self.logger.log_translation(text, translated_text, "API", cost)
+                    output_tokens = usage.get('output_tokens', estimate_tokens(response_text))
 
-                    # Mostrar ejemplo de traducción (verbose)
-                    self._show_translation_example(text, translated_text, target_lang)
-
-                    return translated_text, cost
+                    return response_text, input_tokens, output_tokens
 
                 # Errores que justifican reintentos
                 elif response.status_code in [429, 500, 502, 503, 504]:
@@ -921,51 +1017,41 @@ Traducción directa:"""
                 print(f"❌ Error no recoverable: {e}")
                 raise
 
+    def translate_coalesced(self, text, target_lang, context="", element_type="text"):
+        """
+        Traduce pasando por la capa single-flight: si otro hilo ya está traduciendo
+        el mismo segmento, espera su resultado en lugar de pagar otra llamada a la API
+        """
+        cache_key = self.get_cache_key(text, target_lang)
+        (translated_text, cost), shared = self.single_flight.do(
+            cache_key, self.translate_with_claude, text, target_lang, context, element_type
+        )
+
+        if shared:
+            if self.logger:
+                self.logger.log_coalesced(text)
+            return translated_text, 0.0  # El costo ya lo registró la llamada original
+
+        return translated_text, cost
+
     def _validate_translation(self, original, translated, target_lang):
         """Valida que la traducción no esté corrupta con explicaciones o instrucciones"""
-        import re
-
-        # Patrones de traducciones corruptas detectados
-        corruption_patterns = [
-            r'Tradução em \w+:',           # "Tradução em galego:"
-            r'Traducción al \w+:',         # "Traducción al Catalan:"
-            r'Translation to \w+:',        # "Translation to English:"
-            r'Traduction en \w+:',         # "Traduction en français:"
-            r'Traduzione in \w+:',         # "Traduzione in italiano:"
-            r'Übersetzung ins \w+:',       # "Übersetzung ins Deutsche:"
-            r'"[^"]*"\s*\n\s*\n\s*\w+.*:', # Patrón general: "texto"\n\nIdioma:
-            r'^".*"\s*\n.*:.*".*"$',       # Formato explicativo con comillas
-        ]
-
-        for pattern in corruption_patterns:
-            if re.search(pattern, translated, re.MULTILINE | re.IGNORECASE):
-                error_msg = f"❌ TRADUCCIÓN CORRUPTA detectada para '{target_lang}': contiene explicaciones en lugar de traducción pura"
-                print(f"{error_msg}")
-                print(f"Original: {original[:100]}...")
-                print(f"Corrupta: {translated[:200]}...")
-                # Rechazar traducción corrupta - forzar reintento
-                raise Exception(f"Traducción corrupta detectada - patrón: {pattern}")
+        pattern = find_corruption(translated)
+        if pattern:
+            error_msg = f"❌ TRADUCCIÓN CORRUPTA detectada para '{target_lang}': contiene explicaciones en lugar de traducción pura"
+            print(f"{error_msg}")
+            print(f"Original: {original[:100]}...")
+            print(f"Corrupta: {translated[:200]}...")
+            # Rechazar traducción corrupta - forzar reintento
+            raise Exception(f"Traducción corrupta detectada - patrón: {pattern}")
 
         return True
 
     def validate_and_clean_cache(self):
         """Valida el caché y limpia traducciones corruptas automáticamente"""
-        import re
-
         if not self.cache:
             return
 
-        corruption_patterns = [
-            r'Tradução em \w+:',
-            r'Traducción al \w+:',
-            r'Translation to \w+:',
-            r'Traduction en \w+:',
-            r'Traduzione in \w+:',
-            r'Übersetzung ins \w+:',
-            r'"[^"]*"\s*\n\s*\n\s*\w+.*:',
-            r'^".*"\s*\n.*:.*".*"$',
-        ]
-
         keys_to_remove = []
         for key, translation in self.cache.items():
             if isinstance(translation, dict):
@@ -973,22 +1059,18 @@ Traducción directa:"""
             else:
                 translated_text = str(translation)
 
-            for pattern in corruption_patterns:
-                if re.search(pattern, translated_text, re.MULTILINE | re.IGNORECASE):
-                    keys_to_remove.append(key)
-                    break
+            if find_corruption(translated_text):
+                keys_to_remove.append(key)
 
         if keys_to_remove:
             print(f"🧹 Limpiando {len(keys_to_remove)} traducciones corruptas del caché...")
             for key in keys_to_remove:
-                del self.cache[key]
+                self._remove_cache_entry(key)
             self.save_cache()
             print("✅ Caché limpiado automáticamente")
 
     def _clean_translation_response(self, response):
         """Limpia la respuesta de Claude removiendo instrucciones técnicas y HTML extra"""
-        import re
-
         cleaned = response.strip()
 
         # 1. Detectar y extraer solo la parte traducida si Claude devuelve HTML completo
@@ -999,35 +1081,15 @@ Traducción directa:"""
             raise Exception("Claude devolvió HTML completo en lugar de texto traducido")
 
         # 2. Remover tags HTML sueltos que no deberían estar
-        html_patterns = [
-            r'</?html[^>]*>',
-            r'</?head[^>]*>',
-            r'</?body[^>]*>',
-            r'</?title[^>]*>',
-            r'<!DOCTYPE[^>]*>',
-        ]
-
-        for pattern in html_patterns:
-            if re.search(pattern, cleaned, re.IGNORECASE):
-                print(f"⚠️ Removiendo HTML extra: {pattern}")
-                cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+        cleaned, removed = remove_extra_html(cleaned)
+        if removed:
+            print(f"⚠️ Removiendo HTML extra: {', '.join(sorted(set(removed)))}")
 
         # 3. Remover prefijos explicativos
-        prefixes_to_remove = [
-            r"^(?:Here's the|This is the|The) translation.*?:\s*",
-            r"^(?:Aquí está la|Esta es la) traducción.*?:\s*",
-            r"^Traducción:\s*",
-            r"^Translation:\s*",
-            r"^Ecco la traduzione.*?:\s*",
-            r"^La traduzione.*?:\s*",
-        ]
-
-        for prefix in prefixes_to_remove:
-            cleaned = re.sub(prefix, '', cleaned, flags=re.IGNORECASE | re.MULTILINE)
+        cleaned = remove_explanation_prefixes(cleaned)
 
         # 4. Limpiar espacios múltiples y saltos de línea extra
-        cleaned = re.sub(r'\n\s*\n\s*\n', '\n\n', cleaned)
-        cleaned = re.sub(r'[ \t]+', ' ', cleaned)
+        cleaned = normalize_spacing(cleaned)
 
         result = cleaned.strip()
 
@@ -1038,7 +1100,7 @@ Traducción directa:"""
             result = result[1:-1]
 
         # 6. Validación final - asegurar que no quedó HTML estructural
-        if any(tag in result.lower() for tag in ['<html', '<head', '<body', '<!doctype']):
+        if has_structural_html(result):
             print(f"❌ CRÍTICO: HTML estructural detectado en resultado final")
             print(f"Respuesta problemática: {result[:200]}...")
             raise Exception("Respuesta contiene HTML estructural después de limpieza")
@@ -1067,38 +1129,37 @@ Traducción directa:"""
                 print(f"      ⚠️ Formato JSON no esperado en {source_file.name}")
                 return False
 
-            translated_count = 0
-            cache_hits = 0
+            # Textos únicos: los que no necesitan traducción o están en caché se resuelven aquí
+            if isinstance(self.cache, DaemonCache):
+                self.cache.prefetch(self.get_cache_key(item['text'], target_lang)
+                                    for item in data if isinstance(item, dict) and item.get('text'))
 
-            # Traducir cada entrada del array
+            translations = {}
+            pending = []
+            cache_hits = 0
             for item in data:
-                if isinstance(item, dict) and 'text' in item:
+                if isinstance(item, dict) and item.get('text'):
                     original_text = item['text']
+                    if original_text in translations or original_text in pending:
+                        continue
+                    # Solo traducir si no es técnico
+                    if self._is_technical_text(original_text):
+                        continue
+                    translated_text = self._cached_translation(original_text, target_lang)
+                    if translated_text is not None:
+                        translations[original_text] = translated_text
+                        cache_hits += 1
+                    else:
+                        pending.append(original_text)
 
-                    # Solo traducir si no está vacío y no es técnico
-                    if original_text and not self._is_technical_text(original_text):
-                        cache_key = self.get_cache_key(original_text, target_lang)
-
-                        if cache_key in self.cache:
-                            # Usar cache
-                            cached_value = self.cache[cache_key]
-                            if isinstance(cached_value, dict) and 'translated' in cached_value:
-                                translated_text = cached_value['translated']
-                                cached_value['usage_count'] = cached_value.get('usage_count', 0) + 1
-                            else:
-                                translated_text = cached_value
-                            cache_hits += 1
-                            print(f"      ⚡ JSON Cache: '{original_text}' → '{translated_text}'")
-                        else:
-                            # Traducir con API
-                            translated_text = self.translate_with_claude(
-                                original_text, target_lang, element_type="json_text"
-                            )
-                            translated_count += 1
-                            print(f"      🔄 JSON: '{original_text}' → '{translated_text}'")
+            # El resto se traduce por lotes
+            translated_count = len(pending)
+            self._translate_json_texts(pending, target_lang, translations)
 
-                        # Aplicar traducción
-                        item['text'] = translated_text
+            # Aplicar traducciones
+            for item in data:
+                if isinstance(item, dict) and item.get('text') in translations:
+                    item['text'] = translations[item['text']]
 
             # Corregir enlaces PDF en el JSON después de traducir
             self.fix_pdf_links_in_json(data, target_lang)
@@ -1115,7 +1176,7 @@ Traducción directa:"""
 
             # Guardar caché después de traducir JSON
             if translated_count > 0:
-                self.save_cache()
+                self.save_cache(snapshot=False)
                 print(f"      💾 Caché guardado con {len(self.cache)} entradas")
 
             return True
@@ -1124,6 +1185,138 @@ Traducción directa:"""
             print(f"      ❌ Error traduciendo JSON {source_file.name}: {e}")
             return False
 
+    def _translate_json_texts(self, texts, target_lang, translations):
+        """
+        Traduce textos de los JSON en lotes de pocas llamadas; si un lote no vuelve
+        completo y válido, sus textos se traducen de a uno
+
+        Args:
+            translations: dict {original: traducción} que se completa
+        """
+        if not texts:
+            return
+
+        # Los textos con emails van de a uno (su clave de caché usa el texto protegido)
+        single = [text for text in texts if '@' in text]
+        batches = self._json_batches([text for text in texts if '@' not in text]) if JSON_BATCH_CONFIG['enabled'] else [[text] for text in texts]
+
+        for number, batch in enumerate(batches, 1):
+            if len(batch) == 1:
+                single.extend(batch)
+                continue
+            print(f"      🔄 JSON lote {number}/{len(batches)}: {len(batch)} textos", flush=True)
+            try:
+                batch_translations, cost = self.translate_batch(batch, target_lang)
+                translations.update(batch_translations)
+                if self.progress:
+                    self.progress.total_cost += cost
+            except Exception as e:
+                if "crédito" in str(e).lower() or "credit" in str(e).lower():
+                    raise
+                print(f"      ⚠️ Lote descartado ({e}), se traduce texto por texto")
+                single.extend(batch)
+
+        for text in single:
+            translated_text, cost = self.translate_coalesced(text, target_lang, element_type="json_text")
+            translations[text] = translated_text
+            print(f"      🔄 JSON: '{text}' → '{translated_text}'")
+
+    def _json_batches(self, texts):
+        """Agrupa textos en lotes según JSON_BATCH_CONFIG"""
+        batches = []
+        current = []
+        chars = 0
+        for text in texts:
+            if current and (len(current) >= JSON_BATCH_CONFIG['max_items'] or chars + len(text) > JSON_BATCH_CONFIG['max_chars']):
+                batches.append(current)
+                current, chars = [], 0
+            current.append(text)
+            chars += len(text)
+        if current:
+            batches.append(current)
+        return batches
+
+    def translate_batch(self, texts, target_lang, element_type="json_text", max_retries=3):
+        """
+        Traduce varios textos cortos en una sola llamada (array JSON de ida y vuelta)
+        Cada traducción se guarda en caché como si fuera una llamada individual,
+        con su parte de los tokens y del costo
+
+        Returns:
+            tuple: (dict {original: traducción}, costo)
+        """
+        if not self.api_key:
+            raise ValueError("No se encontró API key de Claude")
+
+        lang_info = LANGUAGES.get(target_lang, {})
+        target_lang_name = lang_info.get('claude_code', target_lang)
+
+        from languages_config import get_translation_instructions
+        cultural_instructions = get_translation_instructions(target_lang, self.manual_name)
+
+        prompt = f"""IMPORTANTE: Responde ÚNICAMENTE con un array JSON de strings. NO incluyas explicaciones ni formato adicional.
+
+Traduce del español al {target_lang_name} cada elemento de este array JSON (entradas del índice y de la tabla de contenidos de un manual):
+{json.dumps(texts, ensure_ascii=False)}
+
+Reglas críticas:
+1. Devuelve un array JSON con exactamente {len(texts)} strings, en el mismo orden
+2. Cada elemento es solo la traducción directa del elemento original
+3. Mantén significado exacto y tono profesional
+4. NO traduzcas nombres propios, URLs o códigos técnicos
+
+{cultural_instructions}
+
+Array traducido:"""
+
+        response_text, input_tokens, output_tokens = self._call_claude(prompt, max_retries)
+        translated_list = self._parse_batch_response(response_text, len(texts))
+        cost = calculate_cost(input_tokens, output_tokens)
+
+        # Validar todo el lote antes de guardar nada
+        results = {}
+        for original, translated in zip(texts, translated_list):
+            translated = self._clean_translation_response(translated)
+            self._validate_translation(original, translated, target_lang)
+            results[original] = translated
+
+        count = len(texts)
+        keys = []
+        for original, translated in results.items():
+            cache_key = self.get_cache_key(original, target_lang)
+            keys.append(cache_key)
+            self._store_cache_entry(cache_key, {
+                'original': original,
+                'translated': translated,
+                'element_type': element_type,
+                'lang': target_lang,
+                'manual': self.manual_name,
+                'timestamp': time.time(),
+                'usage_count': 1,
+                'input_tokens': round(input_tokens / count),
+                'output_tokens': round(output_tokens / count),
+                'cost': cost / count
+            })
+            if self.logger:
+                self.logger.log_translation(original, translated, "API", cost / count)
+
+        if isinstance(self.cache, DaemonCache):
+            self.cache.flush(keys)
+
+        return results, cost
+
+    def _parse_batch_response(self, response_text, expected):
+        """Extrae el array JSON de traducciones de la respuesta de un lote"""
+        start, end = response_text.find('['), response_text.rfind(']')
+        if start < 0 or end < start:
+            raise ValueError("la respuesta no contiene un array JSON")
+        items = json.loads(response_text[start:end + 1])
+        if not isinstance(items, list) or len(items) != expected:
+            raise ValueError(f"se esperaban {expected} traducciones")
+        if not all(isinstance(item, str) and item.strip() for item in items):
+            raise ValueError("el array contiene traducciones vacías o no textuales")
+        return items
+
     def _is_technical_text(self, text):
         """Detecta si un texto es técnico y no debe traducirse"""
         technical_indicators = [
@@ -1169,8 +1362,6 @@ Traducción directa:"""
 
     def _show_translation_example(self, original, translated, target_lang, show_always=False):
         """Muestra un ejemplo de la traducción en tiempo real"""
-        from bs4 import BeautifulSoup
-
         # Solo mostrar ocasionalmente para reducir spam (excepto si show_always=True)
         if not show_always and hasattr(self, '_translation_count'):
             self._translation_count += 1
@@ -1184,10 +1375,10 @@ Traducción directa:"""
         try:
             # Si es HTML, extraer texto
             if '<' in original and '>' in original:
-                soup_orig = BeautifulSoup(original, 'html.parser')
+                soup_orig = parse_html(original)
                 text_orig = soup_orig.get_text().strip()
 
-                soup_trans = BeautifulSoup(translated, 'html.parser')
+                soup_trans = parse_html(translated)
                 text_trans = soup_trans.get_text().strip()
             else:
                 text_orig = original.strip()
@@ -1212,50 +1403,153 @@ Traducción directa:"""
             pass
 
     def extract_translatable_elements(self, soup):
-        """Extrae elementos traducibles del HTML"""
-        from bs4 import Comment
+        """Extrae elementos traducibles del HTML en una sola pasada por el árbol"""
+        from bs4.element import Tag, NavigableString, PreformattedString
         elements = []
 
-        # Elementos de texto directo
-        for tag in soup.find_all(text=True):
-            # Excluir scripts, styles y comentarios HTML
-            if tag.parent.name in ['script', 'style']:
-                continue
-            # Excluir comentarios HTML (esto es lo que causaba el problema)
-            if isinstance(tag, Comment):
-                continue
-            text = tag.strip()
-            if text and len(text) > 2:
-                elements.append({
-                    'type': 'text',
-                    'element': tag,
-                    'text': text
-                })
-
-        # Atributos traducibles (alt, title)
-        for tag in soup.find_all():
-            if tag.get('alt'):
-                elements.append({
-                    'type': 'alt',
-                    'element': tag,
-                    'text': tag['alt']
-                })
-            if tag.get('title'):
-                elements.append({
-                    'type': 'title',
-                    'element': tag,
-                    'text': tag['title']
-                })
+        # Nodos de la región de contenido de la página (lo demás es el marco común)
+        content = soup.find('div', id=CONTENT_REGION_ID)
+        content_nodes = {id(content)} | set(map(id, content.descendants)) if content else set()
+
+        for node in soup.descendants:
+            if isinstance(node, Tag):
+                # Atributos traducibles (alt, title)
+                if node.get('alt'):
+                    elements.append({
+                        'type': 'alt',
+                        'element': node,
+                        'text': node['alt'],
+                        'in_content': id(node) in content_nodes
+                    })
+                if node.get('title'):
+                    elements.append({
+                        'type': 'title',
+                        'element': node,
+                        'text': node['title'],
+                        'in_content': id(node) in content_nodes
+                    })
+            elif isinstance(node, NavigableString):
+                # Excluir comentarios, DOCTYPE y demás declaraciones
+                if isinstance(node, PreformattedString):
+                    continue
+                # Excluir contenido de scripts y styles
+                if node.parent.name in ('script', 'style'):
+                    continue
+                text = node.strip()
+                if text and len(text) > 2:
+                    elements.append({
+                        'type': 'text',
+                        'element': node,
+                        'text': text,
+                        'in_content': id(node) in content_nodes
+                    })
 
         return elements
 
+    def plan_html_files(self, html_files, target_lang):
+        """
+        Cuenta los segmentos de los archivos y cuántos faltan en caché,
+        leyéndolos en streaming sin construir árboles. En la misma pasada
+        detecta el marco común de las páginas (self.page_chrome)
+
+        Returns:
+            dict: segments, pending (únicos sin traducción), pending_chars, chrome,
+                  identity (únicos sin traducción que no necesitan la API)
+        """
+        blocks = self._block_segmentation()
+        pages = [self.segment_cache.segments(html_file, blocks) for html_file in html_files]
+        self.page_chrome = PageChrome.from_pages(pages) if PAGE_CHROME_CONFIG['enabled'] else None
+
+        keys = []
+        for segments in pages:
+            for segment in segments:
+                keys.append((self.get_cache_key(segment['text'], target_lang), len(segment['text'])))
+
+        if isinstance(self.cache, DaemonCache):
+            self.cache.prefetch(key for key, _ in keys)
+
+        identity = set()
+        if self.classifier:
+            identity = {self.get_cache_key(segment['text'], target_lang)
+                        for segments in pages for segment in segments
+                        if self.classifier.classify(segment['text'])}
+
+        pending = {}
+        saved = set()
+        for key, length in keys:
+            if key not in pending and key not in self.cache:
+                if key in identity:
+                    saved.add(key)
+                else:
+                    pending[key] = length
+
+        return {
+            'segments': len(keys),
+            'pending': len(pending),
+            'pending_chars': sum(pending.values()),
+            'chrome': len(self.page_chrome) if self.page_chrome else 0,
+            'identity': len(saved)
+        }
+
+    def translate_page_chrome(self, target_lang):
+        """
+        Traduce una sola vez los segmentos del marco común que aún no tienen traducción
+
+        Returns:
+            tuple: (llamadas a la API, costo); los aciertos de caché e identidad no cuentan
+        """
+        chrome = self.page_chrome
+        api_calls = 0
+        total_cost = 0.0
+
+        for key in sorted(chrome.keys - chrome.translations.keys()):
+            element_type, text = key
+            cache_key = self.get_cache_key(text, target_lang)
+            if cache_key in self.cache:
+                cached_value = self.cache[cache_key]
+                if isinstance(cached_value, dict) and 'translated' in cached_value:
+                    translated_text = cached_value['translated']
+                else:
+                    translated_text = cached_value  # Formato antiguo
+                self._record_cache_hit(cached_value)
+            else:
+                # translate_coalesced ya registra el resultado en el log
+                translated_text, cost = self.translate_coalesced(text, target_lang, element_type=element_type)
+                if cost > 0:
+                    api_calls += 1
+                    total_cost += cost
+            chrome.translations[key] = translated_text
+
+        return api_calls, total_cost
+
+    def _block_segmentation(self):
+        """Indica si los HTML se segmentan por bloques (requiere el renderer por empalme)"""
+        return SEGMENTATION_CONFIG['mode'] == 'block' and HTML_RENDER_CONFIG['renderer'] == 'splice'
+
+    def _apply_translation(self, document, element, translated_text):
+        """
+        Aplica una traducción al documento empalmado o al árbol
+
+        Returns:
+            bool: False si la traducción de un bloque perdió marcadores
+        """
+        if document is not None:
+            return document.set_text(element, translated_text)
+        elif element['type'] == 'text':
+            element['element'].replace_with(translated_text)
+        elif element['type'] == 'alt':
+            element['element']['alt'] = translated_text
+        elif element['type'] == 'title':
+            element['element']['title'] = translated_text
+        return True
+
     def analyze_html_structure(self, file_path):
         """Analiza la estructura de un archivo HTML y retorna estadísticas"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
 
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = parse_html(content)
 
             # Contar elementos traducibles
             translatable_elements = self.extract_translatable_elements(soup)
@@ -1309,6 +1603,8 @@ Traducción directa:"""
         start_time = time.time()
         cache_hits = 0
         api_calls = 0
+        translated_count = 0  # El manejo de errores los lee aunque falle el marco común
+        total_cost = 0.0
 
         try:
             # Verificar si necesita retraducirse (a menos que sea forzado)
@@ -1326,10 +1622,28 @@ Traducción directa:"""
             with open(source_file, 'r', encoding='utf-8') as f:
                 content = f.read()
 
-            soup = BeautifulSoup(content, 'html.parser')
-
             # Extraer elementos traducibles
-            elements = self.extract_translatable_elements(soup)
+            if HTML_RENDER_CONFIG['renderer'] == 'splice':
+                # Posiciones en la fuente: la salida se escribe empalmando las traducciones
+                document = self.segment_cache.document(content, self._block_segmentation())
+                soup = None
+                elements = document.segments
+            else:
+                document = None
+                soup = parse_html(content)
+                elements = self.extract_translatable_elements(soup)
+
+            # El marco común se traduce una vez por manual; aquí solo se aplica
+            chrome_elements = []
+            chrome_calls, chrome_cost = 0, 0.0
+            if self.page_chrome:
+                elements, chrome_elements = self.page_chrome.split(elements)
+                if chrome_elements:
+                    chrome_calls, chrome_cost = self.translate_page_chrome(target_lang)
+
+            # Traer del servicio de caché todas las claves del archivo en una sola petición
+            if isinstance(self.cache, DaemonCache):
+                self.cache.prefetch(self.get_cache_key(element['text'], target_lang) for element in elements)
 
             # Log y progreso de inicio de archivo
             if self.logger:
@@ -1341,22 +1655,31 @@ Traducción directa:"""
                 print(f"      📝 {len(elements)} elementos a traducir", end="", flush=True)
 
             # Traducir elementos
-            translated_count = 0
+            translated_count = chrome_calls
+            api_calls = chrome_calls
             cache_hits = 0
-            total_cost = 0.0
+            total_cost = chrome_cost
 
             for i, element in enumerate(elements, 1):
                 cache_key = self.get_cache_key(element['text'], target_lang)
 
-                if cache_key in self.cache:
+                if self.classifier and self.classifier.is_identity(element['text'], cached=cache_key in self.cache):
+                    # No necesita traducción: se deja igual, sin caché ni API
+                    translated_text = element['text']
+                    cache_hits += 1
+                    if self.progress:
+                        self.progress.show_element_progress(i, len(elements), cache_hits, api_calls, element['text'], translated_text)
+                    else:
+                        print(".", end="", flush=True)
+                elif cache_key in self.cache:
                     cached_value = self.cache[cache_key]
                     # Manejar formato antiguo y nuevo del caché
                     if isinstance(cached_value, dict) and 'translated' in cached_value:
                         translated_text = cached_value['translated']
-                        # Actualizar contador de uso
-                        cached_value['usage_count'] = cached_value.get('usage_count', 0) + 1
                     else:
                         translated_text = cached_value  # Formato antiguo
+                    # Actualizar contador de uso
+                    self._record_cache_hit(cached_value)
                     cache_hits += 1
 
                     # Log traducción desde caché
@@ -1377,7 +1700,7 @@ Traducción directa:"""
                         # Mostrar progreso con asterisco para API calls
                         print("*", end="", flush=True)
 
-                    translated_text, cost = self.translate_with_claude(
+                    translated_text, cost = self.translate_coalesced(
                         element['text'],
                         target_lang,
                         element_type=element['type']
@@ -1394,24 +1717,37 @@ Traducción directa:"""
                     if self.progress:
                         self.progress.show_element_progress(i, len(elements), cache_hits, api_calls, element['text'], translated_text)
 
-                # Aplicar traducción
-                if element['type'] == 'text':
-                    element['element'].replace_with(translated_text)
-                elif element['type'] == 'alt':
-                    element['element']['alt'] = translated_text
-                elif element['type'] == 'title':
-                    element['element']['title'] = translated_text
+                # Aplicar traducción (un bloque sin todos sus marcadores se traduce por partes)
+                if not self._apply_translation(document, element, translated_text):
+                    print(f"\n      ⚠️ Marcadores incompletos, se traduce por partes: {element['text'][:60]}")
+                    if cache_key in self.cache:
+                        self._remove_cache_entry(cache_key)
+                    for part in element['parts']:
+                        part_text, cost = self.translate_coalesced(part['text'], target_lang, element_type=part['type'])
+                        total_cost += cost
+                        if cost > 0:
+                            api_calls += 1
+                            translated_count += 1
+                        self._apply_translation(document, part, part_text)
 
                 # Rate limiting ahora se maneja automáticamente en translate_with_claude
 
+            for element in chrome_elements:
+                self._apply_translation(document, element, self.page_chrome.translation_for(element))
+
             # Corregir atributos HTML específicos del idioma
-            self.fix_html_attributes(soup, target_lang)
+            if document is not None:
+                self.fix_document_attributes(document, target_lang)
+                output = document.render()
+            else:
+                self.fix_html_attributes(soup, target_lang)
+                # Usar prettify() para mantener estructura del HTML árbol
+                output = serialize_html(soup)
 
             # Guardar archivo traducido preservando formato
             target_file.parent.mkdir(parents=True, exist_ok=True)
             with open(target_file, 'w', encoding='utf-8') as f:
-                # Usar prettify() para mantener estructura del HTML árbol
-                f.write(soup.prettify())
+                f.write(output)
 
             # Calcular duración
             duration = time.time() - start_time
@@ -1433,7 +1769,7 @@ Traducción directa:"""
 
             # Guardar caché después de traducir HTML
             if translated_count > 0:
-                self.save_cache()
+                self.save_cache(snapshot=False)
                 print(f"      💾 Caché guardado con {len(self.cache)} entradas")
 
             # Mostrar estadísticas del rate limiting si hubo traducciones
@@ -1564,11 +1900,20 @@ Traducción directa:"""
         self.logger = TranslationLogger(self.manual_name, target_lang)
         self.progress = ProgressDisplay(total_files)
 
-        # Estimación de costo
-        estimated_cost = estimate_translation_cost(len(html_files) * 30 + len(json_files) * 10)  # ~30 HTML, ~10 JSON
+        # Estimación de costo con los segmentos reales que faltan en caché (~10 por JSON)
+        plan = self.plan_html_files(html_files, target_lang)
+        print(f"   🧮 Segmentos HTML: {plan['segments']} ({plan['pending']} sin traducción en caché)")
+        if plan['chrome']:
+            print(f"   🧩 Marco común: {plan['chrome']} segmentos, se traducen una vez para todas las páginas")
+        if plan['identity']:
+            print(f"   🚫 No necesitan traducción: {plan['identity']} segmentos únicos sin caché (no van a la API)")
+        if self.classifier:
+            self.classifier.reset()
+        estimated_elements = plan['pending'] + len(json_files) * 10
+        avg_length = plan['pending_chars'] / plan['pending'] if plan['pending'] else 50
+        estimated_cost = estimate_translation_cost(estimated_elements, avg_length)
 
         # Confirmar si el costo es alto
-        estimated_elements = len(html_files) * 30 + len(json_files) * 10
         if estimated_cost > 2.0:
             confirm = input(f"\n⚠️ Se van a traducir ~{estimated_elements} elementos. ¿Continuar? (s/N): ")
             if confirm.lower() != 's':
@@ -1657,7 +2002,7 @@ Traducción directa:"""
 
             # Guardar caché periódicamente
             if i % 5 == 0:
-                self.save_cache()
+                self.save_cache(snapshot=False)
 
         # Guardar caché final
         self.save_cache()
@@ -1669,6 +2014,8 @@ Traducción directa:"""
             print(f"   💰 Costo total: ${self.progress.total_cost:.4f}")
         if errors > 0:
             print(f"   ⚠️ Errores: {errors}")
+        if self.classifier and self.classifier.stats:
+            print(f"   🚫 Sin traducir por regla: {self.classifier.summary()}")
 
         # Finalizar logging
         if self.logger:
@@ -1689,30 +2036,109 @@ Traducción directa:"""
             'from_cache': False
         }
 
+    def render_languages(self, target_langs):
+        """
+        Re-escribe los HTML traducidos de varios idiomas solo desde el caché,
+        parseando cada archivo fuente una vez para todos los idiomas (por
+        ejemplo después de corregir la plantilla). No llama a la API: los
+        archivos con segmentos sin traducción en caché se informan y se omiten.
+
+        Returns:
+            dict: {idioma: {'rendered': archivos escritos, 'missing': archivos omitidos}}
+        """
+        target_langs = [lang for lang in target_langs if lang in LANGUAGES and lang != 'es']
+        source_path = get_manual_path(self.manual_name)
+        html_dir = source_path / 'html'
+        resource_source = html_dir if html_dir.exists() else source_path
+        html_files = sorted(resource_source.glob('*.html'))
+        targets = {lang: get_manual_path(self.manual_name, lang, 'html') for lang in target_langs}
+        results = {lang: {'rendered': 0, 'missing': []} for lang in target_langs}
+        blocks = self._block_segmentation()
+
+        print(f"🖨️ Renderizando {self.manual_name} desde caché: {len(html_files)} archivos × {len(target_langs)} idiomas")
+        start_time = time.time()
+
+        for html_file in html_files:
+            with open(html_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            parsed = self.segment_cache.document(content, blocks).parsed()
+            source_checksum = self.get_file_checksum(html_file)
+
+            if isinstance(self.cache, DaemonCache):
+                texts = [part['text'] for segment in parsed['segments'] for part in [segment] + segment.get('parts', [])]
+                self.cache.prefetch(self.get_cache_key(text, lang) for lang in target_langs for text in texts)
+
+            for lang in target_langs:
+                document = SplicedDocument(content, parsed=parsed)
+                if not self._apply_cached_translations(document, lang):
+                    results[lang]['missing'].append(html_file.name)
+                    continue
+                self.fix_document_attributes(document, lang)
+
+                target_file = targets[lang] / html_file.name
+                target_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(target_file, 'w', encoding='utf-8') as f:
+                    f.write(document.render())
+                self.save_file_metadata(html_file, target_file, lang, source_checksum)
+                results[lang]['rendered'] += 1
+
+        self.save_cache()
+        print(f"✅ Renderizado en {time.time() - start_time:.1f}s")
+
+        for lang in target_langs:
+            result = results[lang]
+            print(f"   {get_language_display_name(lang)}: {result['rendered']} archivos", end="")
+            if result['missing']:
+                print(f", {len(result['missing'])} omitidos por traducciones faltantes (usar translate_manual)")
+            else:
+                print()
+            self.copy_resources(resource_source, targets[lang])
+
+        return results
+
+    def _apply_cached_translations(self, document, target_lang):
+        """
+        Aplica las traducciones del caché a todos los segmentos del documento
+
+        Returns:
+            bool: False si algún segmento no tiene traducción en caché
+        """
+        for segment in document.segments:
+            if segment['type'] == 'block':
+                translated_text = self._cached_translation(segment['text'], target_lang)
+                if translated_text is not None and document.set_text(segment, translated_text):
+                    continue
+                # Bloque sin traducción válida: por partes
+                for part in segment['parts']:
+                    translated_text = self._cached_translation(part['text'], target_lang)
+                    if translated_text is None:
+                        return False
+                    document.set_text(part, translated_text)
+            else:
+                translated_text = self._cached_translation(segment['text'], target_lang)
+                if translated_text is None:
+                    return False
+                document.set_text(segment, translated_text)
+        return True
+
+    def _cached_translation(self, text, target_lang):
+        """Traducción en caché de un texto (o el mismo texto si no necesita traducción), o None"""
+        if self.classifier and self.classifier.is_identity(text):
+            return text
+        cached_value = self.cache.get(self.get_cache_key(text, target_lang))
+        if cached_value is None:
+            return None
+        self._record_cache_hit(cached_value)
+        if isinstance(cached_value, dict):
+            return cached_value.get('translated')
+        return cached_value  # Formato antiguo
+
     def copy_resources(self, source_path, target_path):
-        """Copia recursos adicionales (imágenes, CSS, archivos JS, etc.)"""
-        import shutil
-        import glob
-
-        # Copiar directorios de recursos
-        resources_dirs = ['lib', 'css', 'js', 'images', 'vendors', 'context']
-
-        for resource_dir in resources_dirs:
-            source_resource = source_path / resource_dir
-            target_resource = target_path / resource_dir
-
-            if source_resource.exists():
-                if target_resource.exists():
-                    shutil.rmtree(target_resource)
-                shutil.copytree(source_resource, target_resource)
-                print(f"      📁 Recursos copiados: {resource_dir}")
-
-        # Copiar archivos JavaScript críticos (_*.js)
-        js_files = list(source_path.glob('_*.js'))
-        for js_file in js_files:
-            target_js = target_path / js_file.name
-            shutil.copy2(js_file, target_js)
-            print(f"      📄 Script copiado: {js_file.name}")
+        """Sincroniza recursos adicionales (imágenes, CSS, archivos JS, etc.): solo copia lo que cambió"""
+        report = sync_resources(source_path, target_path, store=self.asset_store)
+        print(f"      📁 Recursos: {report.summary()}")
+        if self.asset_store and self.asset_store.fallbacks:
+            print(f"      ⚠️ {self.asset_store.fallbacks} recursos copiados: no se pudo crear el enlace ({self.asset_store.link})")
 
 # Alias para compatibilidad con el menú
 MultiLanguageHTMLTranslator = HTMLTranslator
@@ -1722,13 +2148,20 @@ def main():
     import argparse
 
     parser = argparse.ArgumentParser(description='Traducir manual HTML a otro idioma')
-    parser.add_argument('--lang', required=True, help='Código de idioma destino (ej: en, pt, fr)')
+    parser.add_argument('--lang', required=True, help='Código de idioma destino (ej: en, pt, fr; con --render-only, varios separados por coma)')
     parser.add_argument('--manual', default='open_aula_front', help='Nombre del manual')
     parser.add_argument('--force', action='store_true', help='Forzar retraducción')
+    parser.add_argument('--render-only', action='store_true',
+                        help='Re-escribir los HTML de los idiomas indicados solo desde el caché, con un parseo por archivo')
 
     args = parser.parse_args()
 
     translator = HTMLTranslator(args.manual)
+
+    if args.render_only:
+        results = translator.render_languages([lang.strip() for lang in args.lang.split(',') if lang.strip()])
+        sys.exit(1 if not results or any(result['missing'] for result in results.values()) else 0)
+
     result = translator.translate_manual(args.lang, args.force)
 
     if result['success']:
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Índice persistente de metadatos de las imágenes de los manuales
+Para decidir si una imagen va en línea o como figura, la conversión DOCX abría
+cada captura con PIL solo para leer sus dimensiones, en cada idioma y en cada
+regeneración. Aquí se guardan dimensiones, formato y clasificación por tamaño
+de cada imagen, y se comparten entre todos los idiomas.
+
+La clave es la ruta relativa al directorio HTML más tamaño y fecha de
+modificación: las copias de recursos de cada idioma conservan la fecha del
+original, de modo que la misma captura en inglés, portugués, etc. resuelve a la
+misma entrada. Si el archivo cambia, cambia la clave y se vuelve a leer.
+
+Archivo: CACHE_DIR/images.json
+
+Uso:
+    python3 scripts/image_index.py scan open_aula_back en   # indexa las imágenes de un idioma
+    python3 scripts/image_index.py stats
+"""
+
+import sys
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import IMAGE_INDEX_CONFIG
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff', '.emf', '.wmf')
+# Directorios con imágenes en una exportación de HelpNDoc
+IMAGE_DIRS = ('lib', 'images')
+INDEX_VERSION = 1
+
+
+def size_class(width, height):
+    """
+    Clasificación por tamaño (mismos umbrales que la conversión DOCX)
+
+    Returns:
+        str: 'inline' (≤100px en alguna dimensión), 'standalone' (más de 300x200)
+             o 'context' (depende de si está en un párrafo con texto)
+    """
+    if width <= 100 or height <= 100:
+        return 'inline'
+    if width > 300 and height > 200:
+        return 'standalone'
+    return 'context'
+
+
+def probe_image(path):
+    """Lee dimensiones y formato del encabezado de una imagen"""
+    from PIL import Image
+    with Image.open(path) as img:
+        width, height = img.size
+        return {'width': width, 'height': height, 'format': img.format, 'class': size_class(width, height)}
+
+
+class ImageIndex:
+    """Metadatos de imágenes por (ruta relativa, tamaño, mtime)"""
+
+    def __init__(self, index_file=None):
+        self.index_file = Path(index_file or IMAGE_INDEX_CONFIG['index_file'])
+        self.entries = {}
+        self.probed = 0
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION:
+            self.entries = data.get('images', {})
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.index_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'images': self.entries}, f, separators=(',', ':'))
+            os.replace(tmp_file, self.index_file)
+            self.dirty = False
+        except OSError as e:
+            print(f"⚠️ Error guardando índice de imágenes: {e}")
+
+    @staticmethod
+    def key(relative, file_stat):
+        return f"{Path(relative).as_posix()}:{file_stat.st_size}:{file_stat.st_mtime_ns}"
+
+    def get(self, base_path, src):
+        """
+        Metadatos de la imagen src (relativa a base_path), leyéndola solo si no está indexada
+
+        Returns:
+            dict: width, height, format, class; o None si no existe o no se puede leer
+        """
+        path = Path(base_path) / src
+        try:
+            key = self.key(src, path.stat())
+        except OSError:
+            return None
+        entry = self.entries.get(key)
+        if entry is None:
+            try:
+                entry = probe_image(path)
+            except Exception:
+                return None
+            self.entries[key] = entry
+            self.probed += 1
+            self.dirty = True
+        return entry
+
+    def scan(self, html_dir, workers=None):
+        """
+        Indexa en paralelo las imágenes nuevas o modificadas de un directorio HTML
+
+        Returns:
+            tuple: (imágenes encontradas, imágenes leídas)
+        """
+        html_dir = Path(html_dir)
+        pending = []
+        found = 0
+        for image_dir in IMAGE_DIRS:
+            if not (html_dir / image_dir).is_dir():
+                continue
+            for root, dirs, files in os.walk(html_dir / image_dir):
+                for name in files:
+                    if not name.lower().endswith(IMAGE_EXTENSIONS):
+                        continue
+                    found += 1
+                    path = Path(root) / name
+                    relative = path.relative_to(html_dir)
+                    key = self.key(relative, path.stat())
+                    if key not in self.entries:
+                        pending.append((key, path))
+
+        def probe(item):
+            key, path = item
+            try:
+                return key, probe_image(path)
+            except Exception:
+                return key, None
+
+        workers = workers or IMAGE_INDEX_CONFIG['workers'] or min(8, (os.cpu_count() or 1) * 2)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for key, entry in executor.map(probe, pending):
+                if entry is not None:
+                    self.entries[key] = entry
+                    self.probed += 1
+                    self.dirty = True
+        return found, len(pending)
+
+
+_shared_index = None
+
+
+def get_image_index():
+    """Índice compartido del proceso (se carga del disco la primera vez)"""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = ImageIndex()
+    return _shared_index
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+    from system_config import get_manual_path
+
+    parser = argparse.ArgumentParser(description='Índice de metadatos de imágenes')
+    parser.add_argument('action', choices=['scan', 'stats'], help='Acción a ejecutar')
+    parser.add_argument('manual', nargs='?', help='Nombre del manual (scan)')
+    parser.add_argument('lang', nargs='?', default='es', help='Idioma cuyo HTML se indexa (scan)')
+
+    args = parser.parse_args()
+    index = ImageIndex()
+
+    if args.action == 'scan':
+        if not args.manual:
+            parser.error("scan requiere el nombre del manual")
+        html_dir = get_manual_path(args.manual, args.lang, 'html')
+        if args.lang == 'es':
+            html_dir = get_manual_path(args.manual) / 'html'
+        if html_dir is None or not html_dir.exists():
+            print(f"❌ No existe el HTML de {args.manual} en {args.lang}")
+            sys.exit(1)
+        start = time.perf_counter()
+        found, probed = index.scan(html_dir)
+        index.save()
+        print(f"🖼️ {found} imágenes, {probed} leídas en {time.perf_counter() - start:.2f}s ({found - probed} ya indexadas)")
+    elif args.action == 'stats':
+        classes = {}
+        for entry in index.entries.values():
+            classes[entry['class']] = classes.get(entry['class'], 0) + 1
+        print(f"🖼️ Índice de imágenes: {len(index.entries)} entradas en {index.index_file}")
+        for name, count in sorted(classes.items()):
+            print(f"   {name:<11} {count}")
+
+
+if __name__ == "__main__":
+    main()
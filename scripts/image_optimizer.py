@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Optimización de imágenes para DOCX y PDF
+Las capturas se embebían en el DOCX con su resolución original aunque se
+muestran a 4 pulgadas de ancho (o 0,2 de alto si van en línea), y luego Word y
+el camino pandoc → wkhtmltopdf procesaban los bytes completos. Aquí cada imagen
+se reduce al tamaño máximo en que se muestra a los DPI configurados, se
+recomprime y la variante se guarda por digest del contenido: todos los idiomas
+reutilizan las mismas variantes.
+
+Nunca se agranda una imagen, el tamaño mostrado en el documento no cambia y si
+la variante no resulta más chica se sigue usando el original.
+
+Archivos: CACHE_DIR/images/optimized/<ab>/<md5 de contenido + parámetros>.<ext>
+
+Uso:
+    python3 scripts/image_optimizer.py report open_aula_back en   # bytes antes/después
+    python3 scripts/image_optimizer.py clear
+"""
+
+import sys
+import os
+import hashlib
+import shutil
+import time
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import IMAGE_OPTIMIZATION_CONFIG
+from asset_sync import file_digest
+
+# Cambiar al modificar el procesamiento (invalida las variantes anteriores)
+OPTIMIZER_VERSION = 1
+# Formatos sin compresión que se guardan como PNG
+CONVERT_TO_PNG = ('.bmp', '.tif', '.tiff')
+# Formatos que se recomprimen (el resto se usa tal cual)
+OPTIMIZABLE = ('.jpg', '.jpeg', '.png') + CONVERT_TO_PNG
+
+
+def _variant_path(img_path, max_width, max_height):
+    """Ruta de la variante optimizada (clave: contenido + tamaño máximo + parámetros)"""
+    config = IMAGE_OPTIMIZATION_CONFIG
+    digest = file_digest(img_path)
+    params = f"{OPTIMIZER_VERSION}:{digest}:{max_width}:{max_height}:{config['jpeg_quality']}"
+    key = hashlib.md5(params.encode('utf-8')).hexdigest()
+    ext = img_path.suffix.lower()
+    if ext in CONVERT_TO_PNG:
+        ext = '.png'
+    return Path(config['cache_dir']) / key[:2] / f"{key}{ext}"
+
+
+def optimized_image(img_path, width_in=None, height_in=None):
+    """
+    Variante de una imagen reducida al tamaño en que se muestra
+
+    Args:
+        width_in / height_in: Tamaño mostrado en pulgadas (el mismo que recibe add_picture)
+
+    Returns:
+        Path: Variante optimizada, o img_path si no hay ganancia
+    """
+    img_path = Path(img_path)
+    if img_path.suffix.lower() not in OPTIMIZABLE:
+        return img_path
+
+    dpi = IMAGE_OPTIMIZATION_CONFIG['dpi']
+    max_width = round(width_in * dpi) if width_in else None
+    max_height = round(height_in * dpi) if height_in else None
+    variant = _variant_path(img_path, max_width, max_height)
+    keep_marker = variant.with_suffix('.keep')
+
+    if variant.exists():
+        return variant
+    if keep_marker.exists():
+        return img_path
+
+    from PIL import Image
+
+    with Image.open(img_path) as img:
+        width, height = img.size
+        scale = min(max_width / width if max_width else 1, max_height / height if max_height else 1, 1)
+        if scale < 1:
+            if img.mode in ('P', '1'):
+                img = img.convert('RGBA')  # Con paleta PIL solo redimensiona por vecino más cercano
+            img = img.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+
+        variant.parent.mkdir(parents=True, exist_ok=True)
+        tmp_variant = variant.with_name(f".{variant.stem}.{os.getpid()}{variant.suffix}")
+        if variant.suffix in ('.jpg', '.jpeg'):
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            img.save(tmp_variant, 'JPEG', quality=IMAGE_OPTIMIZATION_CONFIG['jpeg_quality'], optimize=True)
+        else:
+            if img.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+                img = img.convert('RGBA')
+            img.save(tmp_variant, 'PNG', optimize=True)
+
+    # Sin reducción y sin ganancia de compresión: se usa el original
+    if scale == 1 and tmp_variant.stat().st_size >= img_path.stat().st_size:
+        tmp_variant.unlink()
+        keep_marker.touch()
+        return img_path
+
+    os.replace(tmp_variant, variant)
+    return variant
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+    from system_config import get_manual_path
+    from image_index import ImageIndex, IMAGE_EXTENSIONS
+
+    parser = argparse.ArgumentParser(description='Optimización de imágenes para DOCX/PDF')
+    parser.add_argument('action', choices=['report', 'clear'], help='Acción a ejecutar')
+    parser.add_argument('manual', nargs='?', help='Nombre del manual (report)')
+    parser.add_argument('lang', nargs='?', default='en', help='Idioma con HTML traducido (report)')
+
+    args = parser.parse_args()
+
+    if args.action == 'clear':
+        cache_dir = Path(IMAGE_OPTIMIZATION_CONFIG['cache_dir'])
+        if cache_dir.exists():
+            shutil.rmtree(cache_dir)
+        print(f"🗑️ Variantes eliminadas de {cache_dir}")
+        return
+
+    if not args.manual:
+        parser.error("report requiere el nombre del manual")
+    html_dir = get_manual_path(args.manual, args.lang, 'html')
+    if html_dir is None or not (html_dir / 'lib').exists():
+        print(f"❌ No hay imágenes en el HTML de {args.manual} en {args.lang}")
+        sys.exit(1)
+
+    index = ImageIndex()
+    before = after = count = 0
+    start = time.perf_counter()
+    for img_path in sorted((html_dir / 'lib').iterdir()):
+        if img_path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        info = index.get(html_dir, img_path.relative_to(html_dir))
+        # Mismo tamaño con el que la conversión DOCX las muestra
+        if info and info['class'] == 'inline':
+            variant = optimized_image(img_path, height_in=0.2)
+        else:
+            variant = optimized_image(img_path, width_in=4)
+        before += img_path.stat().st_size
+        after += variant.stat().st_size
+        count += 1
+    elapsed = time.perf_counter() - start
+    index.save()
+
+    print(f"🖼️ {args.manual} [{args.lang}]: {count} imágenes a {IMAGE_OPTIMIZATION_CONFIG['dpi']} DPI en {elapsed:.2f}s")
+    print(f"📦 {before / 1024 / 1024:.1f} MB → {after / 1024 / 1024:.1f} MB ({(1 - after / max(before, 1)) * 100:.0f}% menos)")
+
+
+if __name__ == "__main__":
+    main()
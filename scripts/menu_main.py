@@ -640,6 +640,7 @@ class MainMenu:
         print("┌─────────────────────────────────────────┐")
         print("│ [1] Limpiar solo traducciones corruptas │")
         print("│ [2] ⚠️  ELIMINAR TODO EL CACHÉ ⚠️        │")
+        print("│ [3] Ver reporte del caché               │")
         print("│ [0] Cancelar                            │")
         print("└─────────────────────────────────────────┘")
 
@@ -669,6 +670,9 @@ class MainMenu:
             # ELIMINAR TODO EL CACHÉ - SUPER CONFIRMACIÓN
             self._delete_entire_cache_with_super_confirmation()
 
+        elif choice == 3:
+            self._show_cache_report()
+
         elif choice == 0:
             print("❌ Operación cancelada")
 
@@ -743,6 +747,8 @@ class MainMenu:
                 print(f"Archivos procesados: {data.get('files_processed', 0)}")
                 print(f"Cache hits: {data.get('cache_hits', 0)}")
                 print(f"API calls: {data.get('api_calls', 0)}")
+                if data.get('coalesced'):
+                    print(f"Llamadas coalescidas: {data['coalesced']}")
                 print(f"Total elementos: {data.get('total_elements', 0)}")
 
                 if data.get('errors'):
@@ -865,6 +871,27 @@ class MainMenu:
         except Exception as e:
             print(f"❌ Error inesperado: {e}")
 
+    def _show_cache_report(self):
+        """Muestra el reporte del caché usando el índice de estadísticas"""
+        from cache_stats import read_cache_stats, print_cache_stats_report
+
+        if not CACHE_FILE.exists():
+            print("ℹ️ No hay caché para analizar")
+            return
+
+        print()
+        stats, up_to_date = read_cache_stats()
+        if stats and up_to_date:
+            print_cache_stats_report(stats)
+            return
+
+        # Índice inexistente o desactualizado: el traductor lo reconstruye al cargar el caché
+        from html_translator import HTMLTranslator
+        translator = HTMLTranslator()
+        if translator.cache_stats:
+            translator.cache_stats.save()
+        translator.print_cache_report()
+
     def _delete_entire_cache_with_super_confirmation(self):
         """Elimina todo el caché con múltiples confirmaciones y avisos de costo"""
 
@@ -875,14 +902,23 @@ class MainMenu:
 
         # Analizar el caché actual
         try:
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+            from cache_stats import read_cache_stats
 
-            cache_count = len(cache_data)
             cache_size_mb = CACHE_FILE.stat().st_size / (1024 * 1024)
+            stats, up_to_date = read_cache_stats()
+
+            if stats and up_to_date:
+                # Conteo y costo reales desde el índice, sin cargar el caché
+                cache_count = stats['total_entries']
+                estimated_cost = stats['total_cost']
+            else:
+                with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                    cache_data = json.load(f)
+
+                cache_count = len(cache_data)
 
-            # Estimar costo (aproximado: $0.01 por traducción)
-            estimated_cost = cache_count * 0.01
+                # Estimar costo (aproximado: $0.01 por traducción)
+                estimated_cost = cache_count * 0.01
 
         except Exception as e:
             print(f"⚠️ Error analizando caché: {e}")
@@ -939,6 +975,8 @@ class MainMenu:
         # ELIMINACIÓN FINAL
         try:
             CACHE_FILE.unlink()
+            if CACHE_STATS_FILE.exists():
+                CACHE_STATS_FILE.unlink()
             print("\n💥 CACHÉ COMPLETAMENTE ELIMINADO")
             print(f"📊 {cache_count} traducciones eliminadas")
             print(f"💰 ~${estimated_cost:.2f} USD en traducciones perdidas" if isinstance(estimated_cost, float) else f"💰 Valor perdido: {estimated_cost}")
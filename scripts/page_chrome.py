@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Marco común de las páginas de tema exportadas por HelpNDoc
+Cabecera, pestañas de navegación, buscador, modal y pie se repiten idénticos
+alrededor de div#topic-content en todas las páginas de un manual. Se detectan
+una vez por manual comparando las páginas entre sí, se traducen una sola vez
+por idioma y en cada archivo solo se procesan los segmentos propios de la página.
+
+Un segmento es del marco si está fuera de div#topic-content y el mismo
+(tipo, texto) aparece fuera de esa región en al menos 'min_share' de las páginas.
+Lo que varía entre páginas fuera de la región (<title>, og:title, etc.) se
+sigue traduciendo página por página.
+
+Uso:
+    python3 scripts/page_chrome.py open_aula_back   # muestra el marco detectado
+"""
+
+import sys
+import math
+from collections import Counter
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import PAGE_CHROME_CONFIG, get_manual_path
+from html_splice import iter_segments
+
+
+def chrome_key(element):
+    """Identidad de un segmento del marco: (tipo, texto)"""
+    return (element['type'], element['text'])
+
+
+class PageChrome:
+    """Segmentos del marco de un manual y sus traducciones para un idioma"""
+
+    def __init__(self, keys=(), pages=0):
+        self.keys = frozenset(keys)
+        self.pages = pages
+        self.translations = {}       # {(tipo, texto): traducción}
+
+    @classmethod
+    def from_pages(cls, pages, min_share=None):
+        """
+        Detecta el marco comparando los segmentos de todas las páginas
+
+        Args:
+            pages: Lista con los segmentos de cada página (con 'in_content')
+            min_share: Fracción mínima de páginas en las que debe repetirse
+        """
+        if min_share is None:
+            min_share = PAGE_CHROME_CONFIG['min_share']
+
+        counts = Counter()
+        for segments in pages:
+            counts.update({chrome_key(segment) for segment in segments if not segment['in_content']})
+
+        # Con una sola página no hay nada que comparar
+        threshold = max(2, math.ceil(len(pages) * min_share))
+        return cls((key for key, count in counts.items() if count >= threshold), len(pages))
+
+    @classmethod
+    def detect(cls, html_files, min_share=None):
+        """Detecta el marco leyendo los archivos en streaming"""
+        return cls.from_pages([list(iter_segments(path=html_file)) for html_file in html_files], min_share)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def is_chrome(self, element):
+        return not element.get('in_content', True) and chrome_key(element) in self.keys
+
+    def split(self, elements):
+        """
+        Separa los elementos de una página
+
+        Returns:
+            tuple: (elementos propios de la página, elementos del marco)
+        """
+        page, chrome = [], []
+        for element in elements:
+            (chrome if self.is_chrome(element) else page).append(element)
+        return page, chrome
+
+    def translation_for(self, element):
+        return self.translations.get(chrome_key(element))
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Detección del marco común de las páginas')
+    parser.add_argument('manual', help='Nombre del manual (ej: open_aula_back)')
+
+    args = parser.parse_args()
+
+    html_dir = get_manual_path(args.manual) / 'html'
+    html_files = sorted(html_dir.glob('*.html'))
+    if not html_files:
+        print(f"❌ No se encontraron archivos HTML en {html_dir}")
+        sys.exit(1)
+
+    pages = [list(iter_segments(path=html_file)) for html_file in html_files]
+    chrome = PageChrome.from_pages(pages)
+    total = sum(len(segments) for segments in pages)
+    in_chrome = sum(1 for segments in pages for segment in segments if chrome.is_chrome(segment))
+
+    print(f"🧩 Marco de {args.manual}: {len(chrome)} segmentos comunes en {len(pages)} páginas")
+    for segment_type, text in sorted(chrome.keys):
+        print(f"   [{segment_type}] {text}")
+    print(f"📊 Segmentos totales: {total}, del marco: {in_chrome} ({in_chrome / total * 100:.1f}%)")
+    print(f"📄 Por página: {total / len(pages):.1f} → {(total - in_chrome) / len(pages):.1f}")
+
+
+if __name__ == "__main__":
+    main()
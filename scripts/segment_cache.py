@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Caché de segmentos de los HTML fuente, compartido entre idiomas destino
+Al traducir un manual a varios idiomas cada corrida volvía a parsear los mismos
+HTML en español. Aquí se guarda, por archivo fuente, el resultado del parseo
+(segmentos con sus posiciones, lang de <html>, enlaces y bloques <script>)
+bajo la clave del contenido: mientras el archivo no cambie, los demás idiomas
+reconstruyen el documento sin parsear.
+
+Archivos: CACHE_DIR/segments/<md5 del contenido y modo>.json
+
+Uso:
+    python3 scripts/segment_cache.py warm open_aula_back   # pre-carga un manual
+    python3 scripts/segment_cache.py stats
+    python3 scripts/segment_cache.py clear
+"""
+
+import sys
+import json
+import hashlib
+import os
+import time
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import SEGMENT_CACHE_CONFIG, get_manual_path
+from html_splice import SplicedDocument
+
+# Cambiar al modificar el recorrido de html_splice (invalida las entradas anteriores)
+SEGMENT_CACHE_VERSION = 1
+
+
+def source_digest(source, blocks=False):
+    """Clave de un archivo fuente: contenido + modo de segmentación + versión"""
+    content = f"{SEGMENT_CACHE_VERSION}:{int(blocks)}:{source}"
+    return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+
+class SegmentCache:
+    """Segmentos parseados por archivo fuente, en disco y en memoria"""
+
+    def __init__(self, cache_dir=None, enabled=None):
+        self.cache_dir = Path(cache_dir or SEGMENT_CACHE_CONFIG['cache_dir'])
+        self.enabled = SEGMENT_CACHE_CONFIG['enabled'] if enabled is None else enabled
+        self._memory = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_file(self, digest):
+        return self.cache_dir / f"{digest}.json"
+
+    def _load(self, digest):
+        parsed = self._memory.get(digest)
+        if parsed is not None:
+            return parsed
+        try:
+            with open(self._entry_file(digest), 'r', encoding='utf-8') as f:
+                parsed = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._memory[digest] = parsed
+        return parsed
+
+    def _store(self, digest, parsed):
+        self._memory[digest] = parsed
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entry_file = self._entry_file(digest)
+            tmp_file = entry_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(parsed, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_file, entry_file)
+        except OSError as e:
+            print(f"⚠️ Error guardando segmentos en caché: {e}")
+
+    def document(self, source, blocks=False):
+        """Retorna el SplicedDocument de una fuente, parseando solo si no está en caché"""
+        if not self.enabled:
+            return SplicedDocument(source, blocks)
+
+        digest = source_digest(source, blocks)
+        parsed = self._load(digest)
+        if parsed is not None:
+            self.hits += 1
+            return SplicedDocument(source, parsed=parsed)
+
+        self.misses += 1
+        document = SplicedDocument(source, blocks)
+        self._store(digest, document.parsed())
+        return document
+
+    def segments(self, path, blocks=False):
+        """Segmentos de un archivo fuente"""
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        return self.document(source, blocks).segments
+
+    def entries(self):
+        return sorted(self.cache_dir.glob('*.json')) if self.cache_dir.exists() else []
+
+    def clear(self):
+        """Elimina todas las entradas"""
+        entries = self.entries()
+        for entry_file in entries:
+            entry_file.unlink()
+        self._memory.clear()
+        return len(entries)
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Caché de segmentos de los HTML fuente')
+    parser.add_argument('action', choices=['warm', 'stats', 'clear'], help='Acción a ejecutar')
+    parser.add_argument('manual', nargs='?', help='Nombre del manual (warm)')
+    parser.add_argument('--blocks', action='store_true', help='Segmentación por bloques')
+
+    args = parser.parse_args()
+    cache = SegmentCache(enabled=True)
+
+    if args.action == 'warm':
+        if not args.manual:
+            parser.error("warm requiere el nombre del manual")
+        html_files = sorted((get_manual_path(args.manual) / 'html').glob('*.html'))
+        for label in ('primera pasada', 'segunda pasada (desde disco)'):
+            cache._memory.clear()
+            start = time.perf_counter()
+            for html_file in html_files:
+                cache.segments(html_file, args.blocks)
+            print(f"⏱️ {label}: {len(html_files)} archivos en {time.perf_counter() - start:.2f}s")
+        print(f"📦 {cache.misses} archivos parseados, {cache.hits} desde caché")
+    elif args.action == 'stats':
+        entries = cache.entries()
+        size = sum(entry_file.stat().st_size for entry_file in entries)
+        print(f"📦 Caché de segmentos: {len(entries)} archivos fuente, {size / 1024:.0f} KB en {cache.cache_dir}")
+    elif args.action == 'clear':
+        print(f"🗑️ {cache.clear()} entradas eliminadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Clasificador de segmentos que no necesitan traducción
+Detecta con reglas precompiladas los textos que la API devolvería iguales
+(URLs, emails, versiones, números con unidades, fechas, nombres de archivo,
+textos sin letras y términos de producto de la lista configurada) para
+usarlos como traducción identidad sin llamar a la API.
+
+Las rutas de menú ("Inicio > Aulas") solo se omiten si todos sus componentes
+son términos de la lista: la interfaz del campus también se traduce.
+
+Uso:
+    python3 scripts/segment_classifier.py open_aula_back   # segmentos omitidos por regla
+    python3 scripts/segment_classifier.py --text "v2.3.1"
+    python3 scripts/segment_classifier.py --check          # casos de verificación
+"""
+
+import sys
+import re
+from collections import Counter
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+from system_config import SEGMENT_CLASSIFIER_CONFIG, get_manual_path
+
+RULES = (
+    ('url', re.compile(r'(?:https?://|ftp://|www\.)\S+', re.IGNORECASE)),
+    ('email', re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')),
+    ('version', re.compile(r'(?:v|version\s*)?\d+(?:\.\d+)+[a-z]?', re.IGNORECASE)),
+    ('number', re.compile(r'[-+]?\d[\d.,]*\s*(?:%|px|pt|em|cm|mm|kb|mb|gb|tb|ms|s|x|°)?', re.IGNORECASE)),
+    ('date', re.compile(r'\d{1,4}[/.-]\d{1,2}[/.-]\d{1,4}(?:\s+\d{1,2}:\d{2}(?::\d{2})?)?')),
+    ('file', re.compile(r'[\w.-]+\.(?:html?|pdf|docx?|xlsx?|pptx?|csv|txt|zip|rar|jpe?g|png|gif|svg|mp[34]|json|xml|js|css)',
+                        re.IGNORECASE)),
+)
+# Sin ninguna letra (símbolos, puntuación, números sueltos)
+NO_LETTERS = re.compile(r'[^\W\d_]')
+# Separadores permitidos entre términos de la lista (rutas de menú, enumeraciones)
+TERM_SEPARATORS = re.compile(r'\s*(?:>|»|/|\||,|-|–|:)\s*|\s+')
+# Casos de --check: (texto, se deja igual); incluye términos con guión y espacios
+CHECK_CASES = (
+    ('e-ducativa', True),
+    ('E-ducativa', True),
+    ('Open Aula', True),
+    ('Open Aula > e-ducativa', True),
+    ('Moodle - Zoom', True),
+    ('https://www.e-ducativa.com', True),
+    ('v2.3.1', True),
+    ('Inicio > Aulas', False),
+    ('Manual de e-ducativa', False),
+    ('ducativa', False),
+)
+
+
+class SegmentClassifier:
+    """Decide si un segmento se puede usar tal cual como traducción"""
+
+    def __init__(self, keep_terms=None):
+        if keep_terms is None:
+            keep_terms = SEGMENT_CLASSIFIER_CONFIG['keep_terms']
+        self.keep_terms = frozenset(term.casefold() for term in keep_terms)
+        # Cada término se reconoce como palabra completa antes de separar: los que llevan
+        # espacios o separadores ('Open Aula', 'e-ducativa') no se parten
+        terms = sorted(keep_terms, key=len, reverse=True)
+        self._terms = re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, terms)) + r')(?!\w)',
+                                 re.IGNORECASE) if terms else None
+        self.reset()
+
+    def reset(self):
+        """Reinicia los contadores (se llevan por manual e idioma)"""
+        self.stats = Counter()       # Segmentos omitidos por regla
+        self.saved_calls = 0         # Omitidos que no estaban en caché: llamadas a la API evitadas
+
+    def classify(self, text):
+        """
+        Returns:
+            str: Regla que hace innecesaria la traducción, o None si hay que traducir
+        """
+        text = text.strip()
+        if not NO_LETTERS.search(text):
+            return 'no_letters'
+        for name, pattern in RULES:
+            if pattern.fullmatch(text):
+                return name
+        if self.keep_terms and self._only_keep_terms(text):
+            return 'keep_term'
+        return None
+
+    def _only_keep_terms(self, text):
+        # Lo que queda sin los términos solo puede tener separadores, números o símbolos
+        words = TERM_SEPARATORS.split(self._terms.sub(' ', text))
+        return not any(NO_LETTERS.search(word) for word in words)
+
+    def is_identity(self, text, cached=True):
+        """
+        Indica si el texto se deja igual, contando la regla aplicada
+
+        Args:
+            cached: Si el texto ya tenía traducción en caché (si no, se ahorra una llamada)
+        """
+        rule = self.classify(text)
+        if rule:
+            self.stats[rule] += 1
+            if not cached:
+                self.saved_calls += 1
+        return rule is not None
+
+    def summary(self):
+        """Resumen de una línea para los reportes del traductor"""
+        rules = ', '.join(f"{rule}: {count}" for rule, count in self.stats.most_common())
+        return f"{sum(self.stats.values())} segmentos ({rules}), {self.saved_calls} llamadas a la API ahorradas"
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+    from html_splice import iter_segments
+
+    parser = argparse.ArgumentParser(description='Clasificador de segmentos no traducibles')
+    parser.add_argument('manual', nargs='?', help='Nombre del manual (ej: open_aula_back)')
+    parser.add_argument('--text', help='Clasificar un texto suelto')
+    parser.add_argument('--check', action='store_true', help='Verificar los casos de CHECK_CASES')
+
+    args = parser.parse_args()
+    classifier = SegmentClassifier()
+
+    if args.check:
+        failures = 0
+        for text, identity in CHECK_CASES:
+            rule = classifier.classify(text)
+            ok = (rule is not None) == identity
+            failures += not ok
+            print(f"   {'✅' if ok else '❌'} {text!r}: {rule or 'se traduce'}")
+        print(f"🔍 {len(CHECK_CASES) - failures}/{len(CHECK_CASES)} casos correctos")
+        sys.exit(1 if failures else 0)
+
+    if args.text is not None:
+        rule = classifier.classify(args.text)
+        print(f"🚫 No se traduce ({rule})" if rule else "🌐 Se traduce")
+        return
+    if not args.manual:
+        parser.error("indica un manual o --text")
+
+    html_dir = get_manual_path(args.manual) / 'html'
+    total = 0
+    examples = {}
+    for html_file in sorted(html_dir.glob('*.html')):
+        for segment in iter_segments(path=html_file):
+            total += 1
+            rule = classifier.classify(segment['text'])
+            if rule:
+                classifier.stats[rule] += 1
+                examples.setdefault(rule, set()).add(segment['text'])
+
+    skipped = sum(classifier.stats.values())
+    print(f"🔍 {args.manual}: {total} segmentos, {skipped} no necesitan traducción ({skipped / max(total, 1) * 100:.1f}%)")
+    for rule, count in classifier.stats.most_common():
+        sample = ', '.join(sorted(examples[rule])[:5])
+        print(f"   {rule:<10} {count:>5}  ej: {sample}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,7 @@ SCRIPTS_DIR = BASE_DIR / "scripts"
 
 # Archivos de configuración
 CACHE_FILE = CACHE_DIR / "translations.json"
+CACHE_STATS_FILE = CACHE_DIR / "translations.stats.json"  # Índice de estadísticas del caché
 CONFIG_FILE = BASE_DIR / "config" / ".env"
 
 # Configuración de traducción
@@ -30,6 +31,79 @@ TRANSLATION_CONFIG = {
     'auto_confirm_under': 1.0       # USD
 }
 
+# Traducción por lotes de _toc.json y _keywords.json (varios textos por llamada)
+JSON_BATCH_CONFIG = {
+    'enabled': True,
+    'max_items': 60,                 # Textos por llamada
+    'max_chars': 2500                # Caracteres de texto original por llamada
+}
+
+# Servicio de caché compartido (scripts/cache_daemon.py)
+CACHE_DAEMON_CONFIG = {
+    'enabled': True,                 # Usar el servicio si está corriendo
+    'socket_path': CACHE_DIR / "translations.sock",
+    'autosave_every': 50,            # Guardar JSON cada N entradas nuevas
+    'claim_timeout': 120,            # Segundos de espera por una traducción en curso
+    'connect_timeout': 2.0
+}
+
+# Snapshot binario del caché (scripts/cache_snapshot.py)
+CACHE_SNAPSHOT_CONFIG = {
+    'enabled': True,                 # Cargar desde el snapshot si está al día con el JSON
+    'snapshot_file': CACHE_DIR / "translations.snapshot",
+    'compress_level': 1              # zlib: 1 prioriza velocidad de guardado
+}
+
+# Imagen mmap de solo lectura del caché para procesos trabajadores (scripts/cache_image.py)
+CACHE_IMAGE_CONFIG = {
+    'enabled': False,                # Regenerar la imagen junto con el snapshot (si no, ensure_image al repartir trabajo)
+    'image_file': CACHE_DIR / "translations.img"
+}
+
+# Backend de parseo HTML (scripts/html_backend.py)
+HTML_BACKEND_CONFIG = {
+    'parser': 'lxml'                 # 'lxml' o 'html.parser' (fallback si lxml no está instalado)
+}
+
+# Escritura de los HTML traducidos
+HTML_RENDER_CONFIG = {
+    'renderer': 'splice'             # 'splice': empalma traducciones en la fuente; 'prettify': re-serializa el árbol
+}
+
+# Caché de segmentos por archivo fuente, compartido entre idiomas (scripts/segment_cache.py)
+SEGMENT_CACHE_CONFIG = {
+    'enabled': True,
+    'cache_dir': CACHE_DIR / "segments"
+}
+
+# Segmentación de los HTML para traducir (solo con el renderer 'splice')
+SEGMENTATION_CONFIG = {
+    'mode': 'node'                   # 'node': cada texto por separado; 'block': p/li/td/títulos como una unidad
+}                                    # con marcadores <1>...</1> en lugar de las etiquetas en línea
+
+# Segmentos que se dejan sin traducir sin llamar a la API (scripts/segment_classifier.py)
+SEGMENT_CLASSIFIER_CONFIG = {
+    'enabled': True,
+    'keep_terms': [                  # Marcas y productos que no se traducen
+        'e-ducativa', 'Open Aula', 'OpenAula', 'HelpNDoc', 'SCORM', 'Moodle', 'Zoom',
+        'Google Meet', 'Google Drive', 'YouTube', 'Vimeo', 'PDF', 'HTML', 'URL', 'LTI',
+        'SSO', 'LDAP', 'API', 'CSV', 'Excel', 'Word', 'PowerPoint', 'Mercado Pago', 'PayPal'
+    ]
+}
+
+# Marco común de las páginas de HelpNDoc (scripts/page_chrome.py)
+PAGE_CHROME_CONFIG = {
+    'enabled': True,                 # Traducir el marco una vez por manual e idioma
+    'min_share': 0.9                 # Fracción de páginas en que debe repetirse un segmento
+}
+
+# Recursos compartidos entre idiomas (scripts/asset_sync.py)
+ASSET_STORE_CONFIG = {
+    'enabled': False,                # Guardar vendors/css/js/imágenes una vez y enlazarlos en cada idioma
+    'store_dir': CACHE_DIR / "assets",  # Debe estar en el mismo sistema de archivos que output/
+    'link': 'hardlink'               # 'hardlink' o 'reflink' (copy-on-write, btrfs/xfs/APFS); si falla, se copia
+}
+
 # Configuración de conversión DOCX
 DOCX_CONFIG = {
     'title_page_title': {
@@ -48,6 +122,54 @@ DOCX_CONFIG = {
     }
 }
 
+# Índice de metadatos de imágenes para la conversión DOCX (scripts/image_index.py)
+IMAGE_INDEX_CONFIG = {
+    'enabled': True,
+    'index_file': CACHE_DIR / "images.json",
+    'workers': 0                     # Hilos del escaneo (0: automático)
+}
+
+# Optimización de imágenes para DOCX/PDF (scripts/image_optimizer.py)
+IMAGE_OPTIMIZATION_CONFIG = {
+    'enabled': False,                # Reducir las imágenes al tamaño en que se muestran
+    'dpi': 150,                      # Resolución objetivo del tamaño mostrado
+    'jpeg_quality': 85,
+    'cache_dir': CACHE_DIR / "images" / "optimized"
+}
+
+# Estilos de carácter compilados desde las clases rvts del CSS (scripts/docx_styles.py)
+DOCX_STYLES_CONFIG = {
+    'enabled': True,                 # Los runs referencian estilos en lugar de formato directo
+    'cache_dir': CACHE_DIR / "docx_styles"
+}
+
+# Conversión DOCX por fragmentos en paralelo (scripts/docx_fragments.py)
+DOCX_PARALLEL_CONFIG = {
+    'enabled': True,                 # Cada HTML se convierte por separado y se une en orden del TOC
+    'workers': 0,                    # Procesos del pool (0: uno por núcleo)
+    'min_files': 20                  # Con menos archivos no se levanta el pool
+}
+
+# Esqueleto DOCX por manual compartido entre idiomas (scripts/docx_skeleton.py)
+# Solo se usa con la conversión por fragmentos
+DOCX_SKELETON_CONFIG = {
+    'enabled': True,                 # Partir del paquete con las imágenes ya registradas
+    'cache_dir': CACHE_DIR / "docx_skeletons"
+}
+
+# Caché de fragmentos DOCX por tema (scripts/docx_fragment_cache.py)
+# Solo se usa con la conversión por fragmentos
+DOCX_FRAGMENT_CACHE_CONFIG = {
+    'enabled': True,                 # Regenerar solo los temas cuyo HTML (o imágenes) cambió
+    'cache_dir': CACHE_DIR / "docx_fragments"
+}
+
+# Escritura de word/document.xml en streaming (scripts/docx_stream.py)
+# Solo se usa con la conversión por fragmentos
+DOCX_STREAM_CONFIG = {
+    'enabled': True                  # Cada tema se escribe en el zip y se quita del árbol
+}
+
 # Patrones de archivos
 FILE_PATTERNS = {
     'html': '*.html',
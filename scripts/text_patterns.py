@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Expresiones regulares precompiladas del traductor
+Protección de emails, limpieza de respuestas de la API, detección de traducciones
+corruptas y enlaces al PDF del manual. Se compilan una sola vez al importar el
+módulo y las listas de patrones se combinan en una sola expresión, de modo que
+cada texto se recorre una vez en lugar de una por patrón.
+
+Uso:
+    python3 scripts/text_patterns.py benchmark   # costo por segmento antes/después
+"""
+
+import sys
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+
+# Agregar directorios al path
+sys.path.append(str(Path(__file__).parent))
+
+# --- Emails ---
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+EMAIL_PLACEHOLDER = "__EMAIL_PLACEHOLDER_{}__"
+
+# --- Traducciones corruptas (explicaciones en lugar de traducción) ---
+
+CORRUPTION_PATTERNS = (
+    r'Tradução em \w+:',           # "Tradução em galego:"
+    r'Traducción al \w+:',         # "Traducción al Catalan:"
+    r'Translation to \w+:',        # "Translation to English:"
+    r'Traduction en \w+:',         # "Traduction en français:"
+    r'Traduzione in \w+:',         # "Traduzione in italiano:"
+    r'Übersetzung ins \w+:',       # "Übersetzung ins Deutsche:"
+    r'"[^"]*"\s*\n\s*\n\s*\w+.*:', # Patrón general: "texto"\n\nIdioma:
+    r'^".*"\s*\n.*:.*".*"$',       # Formato explicativo con comillas
+)
+CORRUPTION_PATTERN = re.compile(
+    '|'.join(f'(?P<p{i}>{pattern})' for i, pattern in enumerate(CORRUPTION_PATTERNS)),
+    re.MULTILINE | re.IGNORECASE
+)
+
+# --- Limpieza de respuestas ---
+
+EXTRA_HTML_PATTERN = re.compile(
+    r'</?html[^>]*>|</?head[^>]*>|</?body[^>]*>|</?title[^>]*>|<!DOCTYPE[^>]*>',
+    re.IGNORECASE
+)
+EXPLANATION_PREFIX_PATTERN = re.compile(
+    r"^(?:(?:Here's the|This is the|The) translation.*?:\s*"
+    r"|(?:Aquí está la|Esta es la) traducción.*?:\s*"
+    r"|Traducción:\s*"
+    r"|Translation:\s*"
+    r"|Ecco la traduzione.*?:\s*"
+    r"|La traduzione.*?:\s*)+",
+    re.IGNORECASE | re.MULTILINE
+)
+EXTRA_BLANK_LINES = re.compile(r'\n\s*\n\s*\n')
+HORIZONTAL_SPACE = re.compile(r'[ \t]+')
+STRUCTURAL_HTML = ('<html', '<head', '<body', '<!doctype')
+
+
+def protect_email_addresses(text):
+    """
+    Reemplaza las direcciones de email por marcadores numerados
+
+    Returns:
+        tuple: (texto protegido, lista de emails en orden)
+    """
+    if '@' not in text:
+        return text, []
+
+    emails_found = []
+
+    def replace_email(match):
+        emails_found.append(match.group(0))
+        return EMAIL_PLACEHOLDER.format(len(emails_found) - 1)
+
+    return EMAIL_PATTERN.sub(replace_email, text), emails_found
+
+
+def restore_email_addresses(text, emails_list):
+    """Restaura las direcciones de email protegidas"""
+    for i, email in enumerate(emails_list):
+        text = text.replace(EMAIL_PLACEHOLDER.format(i), email)
+    return text
+
+
+def find_corruption(text):
+    """
+    Busca explicaciones o instrucciones en una traducción
+
+    Returns:
+        str: Patrón detectado, o None si la traducción está limpia
+    """
+    # Todos los patrones terminan en ':' o lo contienen
+    if ':' not in text:
+        return None
+    match = CORRUPTION_PATTERN.search(text)
+    if match is None:
+        return None
+    return CORRUPTION_PATTERNS[int(match.lastgroup[1:])]
+
+
+def remove_extra_html(text):
+    """
+    Quita etiquetas de documento (html, head, body, title, DOCTYPE) sueltas
+
+    Returns:
+        tuple: (texto limpio, etiquetas quitadas)
+    """
+    if '<' not in text:
+        return text, []
+    removed = EXTRA_HTML_PATTERN.findall(text)
+    if removed:
+        text = EXTRA_HTML_PATTERN.sub('', text)
+    return text, removed
+
+
+def remove_explanation_prefixes(text):
+    """Quita prefijos como 'Translation:' o 'Aquí está la traducción:' al inicio de las líneas"""
+    return EXPLANATION_PREFIX_PATTERN.sub('', text)
+
+
+def normalize_spacing(text):
+    """Reduce líneas en blanco repetidas y espacios/tabulaciones múltiples"""
+    if '\n' in text:
+        text = EXTRA_BLANK_LINES.sub('\n\n', text)
+    if '  ' in text or '\t' in text:
+        text = HORIZONTAL_SPACE.sub(' ', text)
+    return text
+
+
+def has_structural_html(text):
+    lowered = text.lower()
+    return any(tag in lowered for tag in STRUCTURAL_HTML)
+
+
+# --- Enlaces al PDF del manual ---
+
+@lru_cache(maxsize=None)
+def pdf_link_pattern(manual_name, target_lang):
+    """
+    Patrón compilado del PDF español del manual y su reemplazo para el idioma destino
+
+    Returns:
+        tuple: (re.Pattern, reemplazo)
+    """
+    if 'front' in manual_name:
+        manual_suffix = 'front'
+    elif 'back' in manual_name:
+        manual_suffix = 'back'
+    else:
+        manual_suffix = 'front'  # default
+
+    return (re.compile(f'manual_aula_{manual_suffix}_es\\.pdf'),
+            f'manual_aula_{manual_suffix}_{target_lang}.pdf')
+
+
+def replace_pdf_links(text, manual_name, target_lang):
+    """
+    Reemplaza las referencias al PDF español en un texto
+
+    Returns:
+        str: Texto nuevo, o None si no había referencias
+    """
+    if 'manual_aula_' not in text:
+        return None
+    pattern, replacement = pdf_link_pattern(manual_name, target_lang)
+    new_text, count = pattern.subn(replacement, text)
+    return new_text if count else None
+
+
+# --- Benchmark ---
+
+def _legacy_postprocess(original, response):
+    """Post-proceso como se hacía antes: patrones compilados (vía caché de re) en cada llamada"""
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    emails_found = []
+
+    def replace_email(match):
+        placeholder = f"__EMAIL_PLACEHOLDER_{len(emails_found)}__"
+        emails_found.append(match.group(0))
+        return placeholder
+
+    re.sub(email_pattern, replace_email, original)
+
+    cleaned = response.strip()
+    for pattern in [r'</?html[^>]*>', r'</?head[^>]*>', r'</?body[^>]*>', r'</?title[^>]*>', r'<!DOCTYPE[^>]*>']:
+        if re.search(pattern, cleaned, re.IGNORECASE):
+            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+    for prefix in [r"^(?:Here's the|This is the|The) translation.*?:\s*", r"^(?:Aquí está la|Esta es la) traducción.*?:\s*",
+                   r"^Traducción:\s*", r"^Translation:\s*", r"^Ecco la traduzione.*?:\s*", r"^La traduzione.*?:\s*"]:
+        cleaned = re.sub(prefix, '', cleaned, flags=re.IGNORECASE | re.MULTILINE)
+    cleaned = re.sub(r'\n\s*\n\s*\n', '\n\n', cleaned)
+    cleaned = re.sub(r'[ \t]+', ' ', cleaned).strip()
+
+    for i, email in enumerate(emails_found):
+        cleaned = cleaned.replace(f"__EMAIL_PLACEHOLDER_{i}__", email)
+    for pattern in CORRUPTION_PATTERNS:
+        if re.search(pattern, cleaned, re.MULTILINE | re.IGNORECASE):
+            break
+    return cleaned
+
+
+def _postprocess(original, response):
+    """Post-proceso con este módulo (mismos pasos que HTMLTranslator)"""
+    _, emails_found = protect_email_addresses(original)
+    cleaned, _ = remove_extra_html(response.strip())
+    cleaned = normalize_spacing(remove_explanation_prefixes(cleaned)).strip()
+    cleaned = restore_email_addresses(cleaned, emails_found)
+    find_corruption(cleaned)
+    return cleaned
+
+
+def run_benchmark(rounds=5):
+    """Mide el post-proceso por segmento sobre los textos de los manuales originales"""
+    from system_config import ORIGINAL_DIR
+    from html_splice import iter_segments
+
+    texts = [segment['text'] for html_file in sorted(ORIGINAL_DIR.glob('*_es/html/*.html'))
+             for segment in iter_segments(path=html_file)]
+    if not texts:
+        print("❌ No se encontraron manuales originales")
+        return False
+
+    mismatches = sum(1 for text in texts if _legacy_postprocess(text, text) != _postprocess(text, text))
+
+    timings = {}
+    for name, function in (('antes', _legacy_postprocess), ('después', _postprocess)):
+        best = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for text in texts:
+                function(text, text)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best / len(texts)
+
+    cache_texts = texts * 10
+    start = time.perf_counter()
+    for text in cache_texts:
+        for pattern in CORRUPTION_PATTERNS:
+            if re.search(pattern, text, re.MULTILINE | re.IGNORECASE):
+                break
+    legacy_scan = time.perf_counter() - start
+    start = time.perf_counter()
+    for text in cache_texts:
+        find_corruption(text)
+    scan = time.perf_counter() - start
+
+    print("⏱️ BENCHMARK DE POST-PROCESO DE TRADUCCIONES")
+    print("=" * 50)
+    print(f"📝 Segmentos: {len(texts)}")
+    print(f"🐢 Antes:   {timings['antes'] * 1e6:.1f} µs por segmento")
+    print(f"🚀 Después: {timings['después'] * 1e6:.1f} µs por segmento ({timings['antes'] / timings['después']:.1f}x)")
+    print(f"🧹 Validación de caché ({len(cache_texts)} entradas): {legacy_scan * 1000:.0f} ms → {scan * 1000:.0f} ms")
+    if mismatches:
+        print(f"❌ {mismatches} segmentos con resultado distinto")
+        return False
+    print("✅ Resultados idénticos")
+    return True
+
+
+def main():
+    """Función principal para usar desde línea de comandos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Patrones precompilados del traductor')
+    parser.add_argument('action', choices=['benchmark'], help='Acción a ejecutar')
+
+    args = parser.parse_args()
+
+    if args.action == 'benchmark':
+        sys.exit(0 if run_benchmark() else 1)
+
+
+if __name__ == "__main__":
+    main()